@@ -5,7 +5,6 @@ from uuid import uuid4
 from bcrypt import gensalt, hashpw
 from boto.s3.connection import S3Connection
 from boto.s3.key import Key
-from celery import current_app
 from django.apps import apps
 from django.conf import settings
 from django.contrib import messages
@@ -29,7 +28,7 @@ from social.apps.django_app.default.admin import UserSocialAuthOption
 from social.apps.django_app.default.models import UserSocialAuth
 from ujson import loads
 
-from api import models
+from api import broker, models, search
 
 BaseGeometryWidget.display_raw = True
 
@@ -78,6 +77,25 @@ def delete_selected(modeladmin, request, queryset):
 delete_selected.short_description = ugettext_lazy('Delete selected %(verbose_name_plural)s')
 
 
+def verify(modeladmin, request, queryset):
+    ids = list(queryset.filter(is_verified=False).values_list('id', flat=True))
+    for index in range(0, len(ids), 500):
+        broker.send_task(
+            'api.tasks.email_notifications_batch',
+            ([(id, 'verify',) for id in ids[index:index + 500]],),
+            queue='api.tasks.email_notifications',
+            routing_key='api.tasks.email_notifications',
+            serializer='json',
+        )
+    modeladmin.message_user(
+        request,
+        _(u'Successfully queued {count:d} emails.').format(count=len(ids)),
+        messages.SUCCESS,
+    )
+
+verify.short_description = ugettext_lazy('Send verification emails to selected %(verbose_name_plural)s')
+
+
 def delete_view(self, request, object_id, extra_context=None):
     to_field = request.POST.get(TO_FIELD_VAR, request.GET.get(TO_FIELD_VAR))
     if to_field and not self.to_field_allowed(request, to_field):
@@ -451,9 +469,13 @@ class MasterTell(ModelAdmin):
     list_per_page = 10
     search_fields = (
         'contents',
-        'description',
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search.get_master_tells(queryset, search_term), False
+
 MasterTell.delete_view = delete_view
 
 
@@ -745,6 +767,41 @@ class RecommendedTell(ModelAdmin):
 RecommendedTell.delete_view = delete_view
 
 
+class Rendition(ModelAdmin):
+
+    actions = [delete_selected]
+    fields = (
+        'source',
+        'name',
+        'prefix',
+        'format',
+        'bytes',
+    )
+    list_display = (
+        'id',
+        'source',
+        'name',
+        'prefix',
+        'format',
+        'bytes',
+        'inserted_at',
+        'updated_at',
+    )
+    list_filter = (
+        'prefix',
+        'format',
+        'inserted_at',
+        'updated_at',
+    )
+    list_per_page = 10
+    search_fields = (
+        'source',
+        'name',
+    )
+
+Rendition.delete_view = delete_view
+
+
 class Report(ModelAdmin):
 
     actions = [delete_selected]
@@ -926,14 +983,13 @@ class Tellzone(ModelAdmin):
     list_per_page = 10
     search_fields = (
         'name',
-        'description',
-        'photo',
-        'location',
-        'phone',
-        'url',
-        'hours',
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search.get_tellzones(queryset, search_term), False
+
     def name_(self, instance):
         return u'<a href="{photo:s}" target="_blank">{name:s}</a>'.format(photo=instance.photo, name=instance.name)
 
@@ -1010,7 +1066,7 @@ TellzoneType.delete_view = delete_view
 
 class User(ModelAdmin):
 
-    actions = [delete_selected]
+    actions = [delete_selected, verify]
     fields = (
         'tellzone',
         'type',
@@ -1059,26 +1115,22 @@ class User(ModelAdmin):
     list_per_page = 10
     search_fields = (
         'email',
-        'photo_original',
-        'photo_preview',
         'first_name',
         'last_name',
-        'date_of_birth',
-        'gender',
-        'location',
-        'description',
-        'phone',
-        'access_code',
-        'source',
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search.get_users(queryset, search_term), False
+
     def save_model(self, request, user, form, change):
         if 'password' in form.changed_data:
             if user.password:
                 user.password = hashpw(user.password.encode('utf-8'), gensalt(10))
         user.save()
         if not user.is_verified:
-            current_app.send_task(
+            broker.send_task(
                 'api.tasks.email_notifications',
                 (user.id, 'verify',),
                 queue='api.tasks.email_notifications',
@@ -1325,6 +1377,7 @@ site.register(models.Post, Post)
 site.register(models.PostAttachment, PostAttachment)
 site.register(models.PostTellzone, PostTellzone)
 site.register(models.RecommendedTell, RecommendedTell)
+site.register(models.Rendition, Rendition)
 site.register(models.Report, Report)
 site.register(models.ShareUser, ShareUser)
 site.register(models.SlaveTell, SlaveTell)
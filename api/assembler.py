@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+from ujson import loads
+
+CATEGORIES = ('id', 'name', 'photo', 'display_type', 'description', 'position',)
+
+MASTER_TELLS = ('id', 'contents', 'description', 'position', 'is_visible', 'inserted_at', 'updated_at',)
+
+SLAVE_TELLS = (
+    'id',
+    'created_by_id',
+    'owned_by_id',
+    'photo',
+    'first_name',
+    'last_name',
+    'type',
+    'contents_original',
+    'contents_preview',
+    'description',
+    'position',
+    'is_editable',
+    'inserted_at',
+    'updated_at',
+)
+
+TELLZONES_STATUSES = ('id', 'name', 'title', 'icon', 'description', 'position',)
+
+TELLZONES_TYPES = ('id', 'name', 'title', 'icon', 'description', 'position',)
+
+USERS = ('id', 'photo_original', 'photo_preview', 'first_name', 'last_name', 'description',)
+
+
+class Node(object):
+
+    '''
+    Declarative description of one entity inside a flat (JOINed) result set.
+
+    + prefix: the column prefix of the entity (e.g. 'master_tells_created_by_')
+    + fields: field names (column = prefix + name) or (name, function) tuples
+    + key: the field used to deduplicate the entity across rows (rows where it is NULL are skipped)
+    + many: a list of entities (in row order, or ordered by `order` if set) instead of a single entity
+    + default: a callable returning the value to use when a single entity is absent (absent key if None)
+    + privacy: a (column, masks) tuple; each (field, bit) in masks is set to None unless the bit is set in the column
+    + nodes: (name, Node) tuples for the nested entities
+    '''
+
+    def __init__(self, prefix, fields, key='id', many=False, order=None, default=None, privacy=None, nodes=()):
+        self.prefix = prefix
+        self.fields = fields
+        self.key = key
+        self.many = many
+        self.order = order
+        self.default = default
+        self.privacy = privacy
+        self.nodes = nodes
+
+    def get_plan(self, indexes):
+        fields = []
+        for field in self.fields:
+            name, function = field if isinstance(field, tuple) else (field, None,)
+            fields.append((name, indexes[self.prefix + name], function,))
+        return {
+            'node': self,
+            'key': indexes[self.prefix + self.key],
+            'fields': fields,
+            'privacy': (indexes[self.prefix + self.privacy[0]], self.privacy[1],) if self.privacy else None,
+            'nodes': [(name, node.get_plan(indexes),) for name, node in self.nodes],
+        }
+
+
+def assemble(node, columns, records):
+    plan = node.get_plan(dict((column, index) for index, column in enumerate(columns)))
+    cache = {}
+    items = ([], set(),)
+    for record in records:
+        key, item = get_object(plan, record, cache)
+        if key is not None:
+            set_item(items, key, item)
+    return get_list(plan, items[0], set())
+
+
+def get_coordinates(value):
+    coordinates = loads(value)['coordinates']
+    return {
+        'latitude': str(coordinates[1]),
+        'longitude': str(coordinates[0]),
+    }
+
+
+def get_isoformat(value):
+    return value.isoformat() if value else None
+
+
+def get_loads(default):
+    def function(value):
+        if not value:
+            return default()
+        try:
+            return loads(value)
+        except Exception:
+            return default()
+    return function
+
+
+def get_object(plan, record, cache):
+    key = record[plan['key']]
+    if key is None:
+        return None, None
+    objects = cache.setdefault(id(plan['node']), {})
+    object = objects.get(key)
+    if object is None:
+        object = {}
+        for name, index, function in plan['fields']:
+            object[name] = function(record[index]) if function else record[index]
+        if plan['privacy'] is not None:
+            set_privacy(object, record[plan['privacy'][0]] or 0, plan['privacy'][1])
+        for name, child in plan['nodes']:
+            if child['node'].many:
+                object[name] = ([], set(),)
+        objects[key] = object
+    for name, child in plan['nodes']:
+        k, o = get_object(child, record, cache)
+        if k is None:
+            continue
+        if child['node'].many:
+            set_item(object[name], k, o)
+        elif name not in object:
+            object[name] = o
+    return key, object
+
+
+def get_list(plan, objects, done):
+    for object in objects:
+        set_lists(plan, object, done)
+    if plan['node'].order:
+        return sorted(objects, key=lambda item: item[plan['node'].order])
+    return list(objects)
+
+
+def set_item(items, key, item):
+    if key not in items[1]:
+        items[1].add(key)
+        items[0].append(item)
+
+
+def set_lists(plan, object, done):
+    if id(object) in done:
+        return
+    done.add(id(object))
+    for name, child in plan['nodes']:
+        if child['node'].many:
+            object[name] = get_list(child, object[name][0], done)
+            continue
+        if name in object:
+            set_lists(child, object[name], done)
+            continue
+        if child['node'].default is not None:
+            object[name] = child['node'].default()
+
+
+def set_privacy(object, settings, masks):
+    for name, mask in masks:
+        if name in object and not settings & mask:
+            object[name] = None
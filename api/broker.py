@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+from celery import Celery
+from django.conf import settings
+from django.db import connection, transaction
+
+app = Celery('api.broker', broker=settings.BROKER, set_as_current=False)
+app.conf.update(
+    CELERY_ACCEPT_CONTENT=[
+        'json',
+    ],
+    CELERY_IGNORE_RESULT=True,
+    CELERY_TASK_SERIALIZER='json',
+)
+
+send_task = app.send_task
+
+
+def get_messages(queue):
+    messages = []
+    with app.connection() as connection:
+        channel = connection.default_channel
+        while True:
+            message = channel.basic_get(queue, no_ack=True)
+            if not message:
+                break
+            messages.append(message.body)
+    return messages
+
+
+def get_size(queue):
+    with app.connection() as connection:
+        try:
+            _, size, _ = connection.default_channel.queue_declare(queue=queue, passive=True)
+        except Exception:
+            return 0
+    return size
+
+
+def is_memory():
+    return settings.BROKER.startswith('memory://')
+
+
+def send_task_on_commit(*args, **kwargs):
+    if hasattr(transaction, 'on_commit'):
+        transaction.on_commit(lambda: send_task(*args, **kwargs))
+        return
+    if connection.in_atomic_block:
+        kwargs.setdefault('countdown', 1)
+    send_task(*args, **kwargs)
+
+
+def purge(queue):
+    with app.connection() as connection:
+        try:
+            connection.default_channel.queue_purge(queue)
+        except Exception:
+            pass
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from hashlib import md5
+from time import time
+from uuid import uuid4
+
+from django.core.cache import cache
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+from ujson import loads
+
+HOME = 60
+TIMEOUT = 3600
+
+
+class CachedResponse(Response):
+
+    def __init__(self, contents, etag):
+        super(CachedResponse, self).__init__(status=HTTP_200_OK)
+        self.contents = contents
+        self['ETag'] = etag
+
+    @property
+    def data(self):
+        return loads(self.contents)
+
+    @data.setter
+    def data(self, value):
+        pass
+
+    @property
+    def rendered_content(self):
+        self['Content-Type'] = api_settings.DEFAULT_RENDERER_CLASSES[0].media_type
+        return self.contents
+
+
+def get_etag(request, *names, **kwargs):
+    values = [request.get_full_path(), str(request.user.id)]
+    values.extend(get_versions([name.format(user_id=request.user.id) for name in names]))
+    if kwargs.get('seconds', None):
+        values.append(str(int(time() // kwargs['seconds'])))
+    return '"{etag:s}"'.format(etag=md5(':'.join(values).encode('utf-8')).hexdigest())
+
+
+def get_etags(request):
+    etags = []
+    for etag in request.META.get('HTTP_IF_NONE_MATCH', '').split(','):
+        etag = etag.strip()
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        if etag:
+            etags.append(etag)
+    return etags
+
+
+def get_response(request, name, function, *args):
+    if not is_cacheable(request):
+        return Response(data=function(*args), status=HTTP_200_OK)
+    key = 'responses:{name:s}:{args:s}'.format(name=name, args=':'.join(str(arg) for arg in args))
+    items = cache.get_many([key, 'versions:{name:s}'.format(name=name)])
+    version = items.get('versions:{name:s}'.format(name=name)) or get_version(name)
+    item = items.get(key)
+    if item is None or item[0] != version:
+        contents = api_settings.DEFAULT_RENDERER_CLASSES[0]().render(function(*args))
+        item = (version, '"{etag:s}"'.format(etag=md5(contents).hexdigest()), contents,)
+        cache.set(key, item, TIMEOUT)
+    _, etag, contents = item
+    response = get_not_modified(request, etag)
+    if response:
+        return response
+    return CachedResponse(contents, etag)
+
+
+def get_not_modified(request, etag):
+    etags = get_etags(request)
+    if etag in etags or '*' in etags:
+        response = Response(status=HTTP_304_NOT_MODIFIED)
+        response['ETag'] = etag
+        return response
+    return None
+
+
+def is_cacheable(request):
+    renderer = getattr(request, 'accepted_renderer', None)
+    if type(renderer) is not api_settings.DEFAULT_RENDERER_CLASSES[0]:
+        return False
+    return not renderer.get_indent(getattr(request, 'accepted_media_type', None), {})
+
+
+def get_version(name):
+    return get_versions([name])[0]
+
+
+def get_versions(names):
+    keys = ['versions:{name:s}'.format(name=name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = uuid4().hex
+            if not cache.add(key, version, None):
+                version = cache.get(key) or version
+            versions[key] = version
+    return [versions[key] for key in keys]
+
+
+def set_version(name):
+    set_versions(name)
+
+
+def set_versions(*names):
+    cache.set_many(dict(('versions:{name:s}'.format(name=name), uuid4().hex,) for name in names), None)
@@ -0,0 +1,541 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import closing
+from datetime import datetime
+from gc import collect, get_objects
+from hashlib import md5
+from io import BytesIO
+from multiprocessing import cpu_count, Pool
+from os import listdir, remove
+from os.path import basename, getsize, join
+from tempfile import mkstemp
+from time import sleep, time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from PIL import Image
+from pilkit.processors import ProcessorPipeline, ResizeToFit, Transpose
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from tornado.ioloop import IOLoop
+from tornado.websocket import WebSocketHandler
+from ujson import dumps, loads
+
+from api import assembler, broker, models, parsers, renderers, search, tasks
+from api.management.commands import websockets
+
+
+QUEUES = (
+    'api.management.commands.websockets',
+    'api.tasks.email_notifications',
+    'api.tasks.push_notifications',
+    'api.tasks.reports',
+    'api.tasks.thumbnails',
+)
+
+
+class Bucket(object):
+
+    def __init__(self, latency):
+        self.keys = {}
+        self.latency = latency
+        self.name = 'benchmarks'
+
+    def copy_key(self, new_key_name, src_bucket_name, src_key_name):
+        sleep(self.latency)
+        self.keys[new_key_name] = self.keys[src_key_name]
+
+    def get_key(self, name):
+        sleep(self.latency)
+        if name not in self.keys:
+            return
+        return self.new_key(name)
+
+    def new_key(self, name):
+        return Key(self, name)
+
+
+class Connection(object):
+
+    def __init__(self):
+        self.bytes = 0
+        self.messages = 0
+
+    def write_message(self, message, binary=False):
+        self.bytes += len(message)
+        self.messages += 1
+
+
+class Rollback(Exception):
+    pass
+
+
+class Loads(object):
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, value):
+        self.count += 1
+        return loads(value)
+
+
+class Key(object):
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.etag = None
+        self.size = None
+        if name in bucket.keys:
+            self.etag = '"{etag:s}"'.format(etag=md5(bucket.keys[name]).hexdigest())
+            self.size = len(bucket.keys[name])
+
+    def get_contents_to_file(self, file):
+        sleep(self.bucket.latency)
+        file.write(self.bucket.keys[self.name])
+
+    def set_contents_from_file(self, file):
+        sleep(self.bucket.latency)
+        self.bucket.keys[self.name] = file.read()
+
+
+class Command(BaseCommand):
+
+    help = 'Benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'name',
+            choices=(
+                'assembler_rows',
+                'pipeline',
+                'posts_search',
+                'renderers_json',
+                'thumbnails_quality',
+                'thumbnails_throughput',
+                'websockets_broadcast',
+            ),
+        )
+        parser.add_argument('--bytes', default=524288, type=int)
+        parser.add_argument('--count', default=10000, type=int)
+        parser.add_argument('--keywords', default='word42', help='Keywords for posts_search')
+        parser.add_argument('--latency', default=0.05, help='Seconds per (fake) S3 request', type=float)
+        parser.add_argument('--path', default='.', help='Directory with sample images')
+        parser.add_argument('--processes', default=cpu_count(), type=int)
+        parser.add_argument(
+            '--tasks',
+            action='store_true',
+            default=False,
+            help='pipeline: execute drained Celery tasks in-process (sends real emails/push notifications)',
+        )
+        parser.add_argument('--threads', default=tasks.THREADS, type=int)
+        parser.add_argument('--width', default=685, type=int)
+
+    def handle(self, *args, **kwargs):
+        getattr(self, kwargs['name'])(kwargs)
+
+    def assembler_rows(self, kwargs):
+        for key, function, settings in [
+            ('Before', get_master_tells_1, dumps({'show_last_name': 'True', 'show_photo': 'False'}),),
+            ('After', get_master_tells_2, models.SETTINGS['show_last_name'],),
+        ]:
+            columns, records = get_records(kwargs['count'], settings)
+            counter = Loads()
+            collect()
+            objects = len(get_objects())
+            start = time()
+            master_tells = function(columns, records, counter)
+            seconds = time() - start
+            objects = len(get_objects()) - objects
+            self.stdout.write(
+                '{name:>6s}: {seconds:>9.4f} seconds, {count:d} rows, {master_tells:d} master tells, '
+                '{microseconds:.2f} us/row, {loads:.4f} loads/row, {objects:.4f} objects/row'.format(
+                    name=key,
+                    seconds=seconds,
+                    count=len(records),
+                    master_tells=len(master_tells),
+                    microseconds=seconds * 1000000 / len(records),
+                    loads=counter.count * 1.0 / len(records),
+                    objects=objects * 1.0 / len(records),
+                )
+            )
+            del master_tells
+
+    def pipeline(self, kwargs):
+        if not broker.is_memory():
+            self.stderr.write('pipeline requires BROKER = \'memory://\' in settings.py')
+            return
+        websockets.logger.disabled = True
+        websockets.set_io_loop(0.0)
+        consumer = websockets.Memory.__new__(websockets.Memory)
+        for queue in QUEUES:
+            broker.purge(queue)
+        try:
+            with transaction.atomic():
+                user_source = models.User.objects.create(email='benchmarks-1@tellecast.com')
+                user_destination = models.User.objects.create(email='benchmarks-2@tellecast.com')
+                for queue in QUEUES:
+                    broker.purge(queue)
+
+                start = time()
+                for index in range(kwargs['count']):
+                    models.Message.objects.create(
+                        user_source=user_source,
+                        user_destination=user_destination,
+                        type='Message',
+                        contents='Message #{index:d}'.format(index=index),
+                    )
+                seconds = time() - start
+                self.stdout.write('{name:>8s}: {seconds:>9.4f} seconds, {count:d} messages'.format(
+                    name='Publish', seconds=seconds, count=kwargs['count'],
+                ))
+
+                start = time()
+                counts = {}
+                for queue in QUEUES:
+                    for body in broker.get_messages(queue):
+                        message = loads(body)
+                        counts[message['task']] = counts.get(message['task'], 0) + 1
+                        if queue == 'api.management.commands.websockets':
+                            IOLoop.current().run_sync(lambda: consumer.on_message(body))
+                            continue
+                        if kwargs['tasks']:
+                            getattr(tasks, message['task'].split('.')[-1]).apply(
+                                args=message['args'], kwargs=message['kwargs'],
+                            )
+                seconds = time() - start
+                self.stdout.write('{name:>8s}: {seconds:>9.4f} seconds, {count:d} tasks'.format(
+                    name='Dispatch', seconds=seconds, count=sum(counts.values()),
+                ))
+                for name, count in sorted(counts.items()):
+                    self.stdout.write('{name:>8s}  {count:>9d} x {task:s}'.format(name='', count=count, task=name))
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def posts_search(self, kwargs):
+        user = models.User.objects.get_queryset().order_by('id').first()
+        if not user:
+            self.stdout.write('posts_search needs at least one user')
+            return
+        try:
+            with transaction.atomic():
+                start = time()
+                with closing(connection.cursor()) as cursor:
+                    cursor.execute(
+                        '''
+                        INSERT INTO api_posts (user_id, title, contents, inserted_at, updated_at, expired_at)
+                        SELECT
+                            %s,
+                            'Post ' || i,
+                            array_to_string(
+                                ARRAY(
+                                    SELECT 'word' || ((i * 7919 + j * 104729) %% 10000)
+                                    FROM generate_series(1, 50) AS j
+                                ),
+                                ' '
+                            ),
+                            NOW(),
+                            NOW(),
+                            NOW()
+                        FROM generate_series(1, %s) AS i
+                        ''',
+                        (user.id, kwargs['count'],)
+                    )
+                    cursor.execute('ANALYZE api_posts')
+                self.stdout.write('{name:>6s}: {seconds:>9.4f} seconds, {count:d} posts'.format(
+                    name='Insert', seconds=time() - start, count=kwargs['count'],
+                ))
+                queryset = models.Post.objects.get_queryset()
+                for key, posts in [
+                    (
+                        'Before',
+                        queryset.filter(
+                            Q(title__icontains=kwargs['keywords']) | Q(contents__icontains=kwargs['keywords']),
+                        ).order_by(
+                            '-id',
+                        ),
+                    ),
+                    ('After', search.get_posts(queryset, kwargs['keywords']),),
+                ]:
+                    start = time()
+                    posts = list(posts[:100])
+                    self.stdout.write('{name:>6s}: {seconds:>9.4f} seconds, {count:d} posts'.format(
+                        name=key, seconds=time() - start, count=len(posts),
+                    ))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def renderers_json(self, kwargs):
+        columns, records = get_records(kwargs['count'], models.SETTINGS['show_last_name'])
+        master_tells = get_master_tells_2(columns, records, loads)
+        for key, renderer, parser in [
+            ('Before', JSONRenderer(), JSONParser(),),
+            ('After', renderers.Renderer(), parsers.Parser(),),
+        ]:
+            start = time()
+            contents = renderer.render(master_tells)
+            render = time() - start
+            start = time()
+            parser.parse(BytesIO(contents))
+            parse = time() - start
+            self.stdout.write(
+                '{name:>6s}: {render:>9.4f} seconds (render), {parse:>9.4f} seconds (parse), '
+                '{master_tells:d} master tells, {bytes:d} bytes'.format(
+                    name=key, render=render, parse=parse, master_tells=len(master_tells), bytes=len(contents),
+                )
+            )
+
+    def thumbnails_quality(self, kwargs):
+        names = self.get_names(kwargs['path'])
+        seconds = {
+            'Before': 0.0,
+            'After': 0.0,
+        }
+        bytes = {
+            'Before': 0,
+            'After': 0,
+        }
+        for name in names:
+            format = tasks.get_format(name, 'image/*')
+
+            start = time()
+            _, destination = mkstemp()
+            quality = 75
+            while True:
+                try:
+                    ProcessorPipeline([
+                        Transpose(),
+                        ResizeToFit(width=kwargs['width'], upscale=False),
+                    ]).process(
+                        Image.open(name),
+                    ).save(
+                        destination, format=format, optimize=True, quality=quality,
+                    )
+                except IOError:
+                    break
+                if getsize(destination) <= kwargs['bytes']:
+                    break
+                if quality <= 5:
+                    break
+                quality = quality - 5
+            seconds['Before'] += time() - start
+            bytes['Before'] += getsize(destination)
+            remove(destination)
+
+            start = time()
+            contents = tasks.get_contents(
+                ProcessorPipeline([
+                    Transpose(),
+                    ResizeToFit(width=kwargs['width'], upscale=False),
+                ]).process(
+                    Image.open(name),
+                ),
+                format,
+                kwargs['bytes'],
+            )
+            seconds['After'] += time() - start
+            bytes['After'] += len(contents)
+        for key in ['Before', 'After']:
+            self.stdout.write('{name:>6s}: {seconds:>9.4f} seconds, {count:d} images, {bytes:d} bytes'.format(
+                name=key, seconds=seconds[key], count=len(names), bytes=bytes[key],
+            ))
+
+    def thumbnails_throughput(self, kwargs):
+        names = self.get_names(kwargs['path'])
+        bucket = Bucket(kwargs['latency'])
+        for name in names:
+            with open(name, 'rb') as resource:
+                bucket.keys[basename(name)] = resource.read()
+        tasks.get_bucket = lambda: bucket
+        tasks.logger.disabled = True
+        for key, processes, threads in [
+            ('Before', 1, 1,),
+            ('After', kwargs['processes'], kwargs['threads'],),
+        ]:
+            tasks.THREADS = threads
+            start = time()
+            pool = Pool(processes)
+            pool.map(thumbnails, [basename(name) for name in names])
+            pool.close()
+            pool.join()
+            seconds = time() - start
+            self.stdout.write(
+                '{name:>6s}: {seconds:>9.4f} seconds, {count:d} images, {throughput:.2f} images/second'.format(
+                    name=key, seconds=seconds, count=len(names), throughput=len(names) / seconds,
+                )
+            )
+
+    def websockets_broadcast(self, kwargs):
+        websockets.logger.disabled = True
+        users = []
+        for _ in range(kwargs['count']):
+            user = websockets.WebSocket.__new__(websockets.WebSocket)
+            user.ws_connection = Connection()
+            users.append(user)
+        IOLoop.current().clients = {user: index for index, user in enumerate(users)}
+        message = {
+            'subject': 'master_tells',
+            'user_ids': range(kwargs['count']),
+            'body': {
+                'type': 'tellzones',
+                'id': 1,
+            },
+        }
+
+        start = time()
+        user_ids = message['user_ids']
+        body = {
+            'subject': message['subject'],
+            'body': message['body'],
+        }
+        for user in [key for key, value in IOLoop.current().clients.items() if value in user_ids]:
+            WebSocketHandler.write_message(user, loads(dumps(body)))
+        self.report('Before', users, time() - start)
+
+        start = time()
+        user_ids = set(message['user_ids'])
+        websockets.broadcast([key for key, value in IOLoop.current().clients.items() if value in user_ids], body)
+        self.report('After', users, time() - start)
+
+    def get_names(self, path):
+        return sorted(
+            join(path, name) for name in listdir(path) if name.lower().endswith(('.jpeg', '.jpg', '.png',))
+        )
+
+    def report(self, name, users, seconds):
+        self.stdout.write('{name:>6s}: {seconds:>9.4f} seconds, {messages:d} messages, {bytes:d} bytes'.format(
+            name=name,
+            seconds=seconds,
+            messages=sum(user.ws_connection.messages for user in users),
+            bytes=sum(user.ws_connection.bytes for user in users),
+        ))
+        for user in users:
+            user.ws_connection.bytes = 0
+            user.ws_connection.messages = 0
+
+
+def thumbnails(name):
+    tasks.thumbnails_3(name, 'image/*', [('large', 1920, None,), ('small', 685, None,)])
+
+
+def get_master_tells_1(columns, records, loads):
+    master_tells = {}
+    for record in records:
+        record = dict(zip(columns, record))
+        if record['id'] not in master_tells:
+            master_tells[record['id']] = {}
+        for name in assembler.MASTER_TELLS + ('is_pinned',):
+            if name not in master_tells[record['id']]:
+                master_tells[record['id']][name] = record[name]
+        if 'slave_tells' not in master_tells[record['id']]:
+            master_tells[record['id']]['slave_tells'] = {}
+        if record['slave_tell_id']:
+            if record['slave_tell_id'] not in master_tells[record['id']]['slave_tells']:
+                master_tells[record['id']]['slave_tells'][record['slave_tell_id']] = dict(
+                    (name, record['slave_tell_{name:s}'.format(name=name)],) for name in assembler.SLAVE_TELLS
+                )
+        for key in ['created_by', 'owned_by']:
+            if key not in master_tells[record['id']]:
+                master_tells[record['id']][key] = dict(
+                    (name, record['{key:s}_{name:s}'.format(key=key, name=name)],) for name in assembler.USERS
+                )
+                master_tells[record['id']][key]['settings'] = loads(record['{key:s}_settings'.format(key=key)])
+        if 'category' not in master_tells[record['id']]:
+            master_tells[record['id']]['category'] = dict(
+                (name, record['category_{name:s}'.format(name=name)],) for name in assembler.CATEGORIES
+            )
+        if 'tellzones' not in master_tells[record['id']]:
+            master_tells[record['id']]['tellzones'] = {}
+        if record['tellzone_id'] and record['tellzone_name']:
+            master_tells[record['id']]['tellzones'][record['tellzone_id']] = {
+                'id': record['tellzone_id'],
+                'name': record['tellzone_name'],
+            }
+    master_tells = sorted(master_tells.values(), key=lambda item: item['id'])
+    for master_tell in master_tells:
+        for key in ['created_by', 'owned_by']:
+            for name, setting in [
+                ('last_name', 'show_last_name',),
+                ('photo_original', 'show_photo',),
+                ('photo_preview', 'show_photo',),
+            ]:
+                if not master_tell[key]['settings'][setting] == 'True':
+                    master_tell[key][name] = None
+            del master_tell[key]['settings']
+        master_tell['slave_tells'] = sorted(master_tell['slave_tells'].values(), key=lambda item: item['position'])
+        master_tell['tellzones'] = sorted(master_tell['tellzones'].values(), key=lambda item: item['id'])
+    return master_tells
+
+
+def get_master_tells_2(columns, records, loads):
+    loads_ = assembler.loads
+    assembler.loads = loads
+    try:
+        return assembler.assemble(
+            assembler.Node(
+                '',
+                assembler.MASTER_TELLS + ('is_pinned',),
+                order='id',
+                nodes=(
+                    (
+                        'slave_tells',
+                        assembler.Node('slave_tell_', assembler.SLAVE_TELLS, many=True, order='position'),
+                    ),
+                    (
+                        'created_by',
+                        assembler.Node('created_by_', assembler.USERS, privacy=('settings', models.PRIVACY,)),
+                    ),
+                    (
+                        'owned_by',
+                        assembler.Node('owned_by_', assembler.USERS, privacy=('settings', models.PRIVACY,)),
+                    ),
+                    ('category', assembler.Node('category_', assembler.CATEGORIES),),
+                    ('tellzones', assembler.Node('tellzone_', ('id', 'name',), many=True, order='id'),),
+                ),
+            ),
+            columns,
+            records,
+        )
+    finally:
+        assembler.loads = loads_
+
+
+def get_records(count, settings):
+    columns = list(assembler.MASTER_TELLS) + ['is_pinned']
+    columns += ['slave_tell_{name:s}'.format(name=name) for name in assembler.SLAVE_TELLS]
+    for key in ['created_by', 'owned_by']:
+        columns += ['{key:s}_{name:s}'.format(key=key, name=name) for name in assembler.USERS + ('settings',)]
+    columns += ['category_{name:s}'.format(name=name) for name in assembler.CATEGORIES]
+    columns += ['tellzone_id', 'tellzone_name']
+    now = datetime.now()
+    records = []
+    for id in range(1, max(count // 8, 1) + 1):
+        for slave_tell_id in range(1, 5):
+            for tellzone_id in range(1, 3):
+                record = [id, 'Contents', 'Description', id, True, now, now, True]
+                record += [
+                    id * 10 + slave_tell_id,
+                    id % 50,
+                    id % 50,
+                    'photo.jpg',
+                    'First Name',
+                    'Last Name',
+                    'text',
+                    'Contents',
+                    'Contents',
+                    'Description',
+                    slave_tell_id,
+                    True,
+                    now,
+                    now,
+                ]
+                for user_id in [id % 50, id % 50 + 1]:
+                    record += [user_id, 'photo.jpg', 'photo.jpg', 'First Name', 'Last Name', 'Description', settings]
+                record += [id % 10, 'Category', 'photo.jpg', 'Display Type', 'Description', id % 10]
+                record += [tellzone_id, 'Tellzone']
+                records.append(tuple(record))
+    return columns, records
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+from os.path import exists
+from time import sleep
+
+from django.core.management.base import BaseCommand, CommandError
+from ujson import dumps, loads
+
+from api import broker, models, tasks
+
+
+class Command(BaseCommand):
+
+    help = 'Thumbnails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables',
+            help='Any of {tables:s} (default: all)'.format(tables=', '.join(tasks.TABLES)),
+            metavar='table',
+            nargs='*',
+        )
+        parser.add_argument('--batch', default=500, dest='batch', type=int)
+        parser.add_argument(
+            '--concurrency',
+            default=1000,
+            dest='concurrency',
+            help='Maximum number of pending tasks in the thumbnails queue',
+            type=int,
+        )
+        parser.add_argument('--dry-run', action='store_true', default=False, dest='dry_run')
+        parser.add_argument('--progress', default='thumbnails.json', dest='progress')
+        parser.add_argument('--reset', action='store_true', default=False, dest='reset')
+
+    def handle(self, *args, **kwargs):
+        tables = kwargs['tables'] or list(tasks.TABLES)
+        for table in tables:
+            if table not in tasks.TABLES:
+                raise CommandError('Invalid table: {table:s}'.format(table=table))
+        progress = {}
+        if exists(kwargs['progress']) and not kwargs['reset']:
+            with open(kwargs['progress']) as resource:
+                progress = loads(resource.read())
+        keys = self.get_keys()
+        for table in tables:
+            counts = {
+                'instances': 0,
+                'renditions': 0,
+                'tasks': 0,
+            }
+            while True:
+                instances = list(
+                    getattr(models, table).objects.get_queryset().filter(
+                        id__gt=progress.get(table, 0),
+                    ).order_by('id')[:kwargs['batch']]
+                )
+                if not instances:
+                    break
+                if not kwargs['dry_run']:
+                    self.wait(kwargs['concurrency'])
+                for instance in instances:
+                    counts['instances'] += 1
+                    for name, type, items in tasks.get_thumbnails(table, instance):
+                        if not name or not name.split('/')[-1]:
+                            continue
+                        items = [
+                            item for item in items
+                            if '{prefix:s}_{suffix:s}'.format(prefix=item[0], suffix=name.split('/')[-1]) not in keys
+                        ]
+                        if not items:
+                            continue
+                        counts['renditions'] += len(items)
+                        counts['tasks'] += 1
+                        if kwargs['dry_run']:
+                            continue
+                        broker.send_task(
+                            'api.tasks.thumbnails_3',
+                            (name, type, items,),
+                            queue='api.tasks.thumbnails',
+                            routing_key='api.tasks.thumbnails',
+                            serializer='json',
+                        )
+                progress[table] = instances[-1].id
+                if not kwargs['dry_run']:
+                    with open(kwargs['progress'], 'w') as resource:
+                        resource.write(dumps(progress))
+            self.stdout.write(
+                '{table:s}: {instances:d} instances, {renditions:d} missing renditions, {tasks:d} tasks'.format(
+                    table=table, **counts
+                )
+            )
+
+    def get_keys(self):
+        keys = set()
+        bucket = tasks.get_bucket()
+        for prefix in ['large', 'small']:
+            keys.update(key.name for key in bucket.list(prefix='{prefix:s}_'.format(prefix=prefix)))
+        return keys
+
+    def wait(self, concurrency):
+        while broker.get_size('api.tasks.thumbnails') > concurrency:
+            sleep(1)
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 
+from bisect import bisect_left
 from contextlib import closing
 from copy import deepcopy
 from datetime import datetime
+from linecache import getline
 from logging import CRITICAL, DEBUG, Formatter, StreamHandler, getLogger
+from traceback import format_list
 
 from bcrypt import hashpw
-from celery import current_app
 from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.db import connection
@@ -15,12 +17,12 @@ from pika import TornadoConnection, URLParameters
 from raven import Client
 from tornado.gen import coroutine, Return
 from tornado.httpserver import HTTPServer
-from tornado.ioloop import IOLoop
-from tornado.web import Application
+from tornado.ioloop import IOLoop, PeriodicCallback
+from tornado.web import Application, RequestHandler
 from tornado.websocket import WebSocketHandler
 from ujson import dumps, loads
 
-from api import serializers
+from api import assembler, broker, caches, models, serializers
 
 formatter = Formatter('%(asctime)s [%(levelname)8s] %(message)s')
 
@@ -34,11 +36,14 @@ logger.addHandler(stream_handler)
 
 client = Client(settings.RAVEN_CONFIG['dsn'])
 
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0,)
+
 
 class RabbitMQ(object):
 
     @coroutine
     def __init__(self, *args, **kwargs):
+        self.lag = PeriodicCallback(self.on_lag, 5000)
         try:
             self.connection = TornadoConnection(
                 parameters=URLParameters(settings.BROKER),
@@ -64,18 +69,26 @@ class RabbitMQ(object):
 
     def on_connection_close(self, connection, reply_code, reply_text):
         try:
+            self.lag.stop()
             client.captureMessage(reply_text)
         except Exception:
             client.captureException()
 
     def on_channel_open(self, channel):
         try:
+            channel.add_on_close_callback(self.on_channel_close)
             self.channel.exchange_declare(
                 self.on_channel_exchange_declare, durable=True, exchange='api.management.commands.websockets',
             )
         except Exception:
             client.captureException()
 
+    def on_channel_close(self, channel, reply_code, reply_text):
+        try:
+            self.lag.stop()
+        except Exception:
+            client.captureException()
+
     def on_channel_exchange_declare(self, frame):
         try:
             self.channel.queue_declare(
@@ -101,12 +114,39 @@ class RabbitMQ(object):
             self.channel.basic_consume(
                 self.on_channel_basic_consume, queue='api.management.commands.websockets', no_ack=False,
             )
+            if not self.lag.is_running():
+                self.lag.start()
+        except Exception:
+            client.captureException()
+
+    def on_lag(self):
+        try:
+            if self.channel.is_open:
+                self.channel.queue_declare(
+                    self.on_lag_queue_declare, passive=True, queue='api.management.commands.websockets',
+                )
+        except Exception:
+            client.captureException()
+
+    def on_lag_queue_declare(self, frame):
+        try:
+            IOLoop.current().metrics['lag'] = {
+                'consumers': frame.method.consumer_count,
+                'messages': frame.method.message_count,
+                'timestamp': datetime.now().isoformat(' '),
+            }
         except Exception:
             client.captureException()
 
     @coroutine
     def on_channel_basic_consume(self, channel, method, properties, body):
         self.channel.basic_ack(delivery_tag=method.delivery_tag)
+        yield self.on_message(body)
+        raise Return(None)
+
+    @coroutine
+    def on_message(self, body):
+        message = None
         try:
             message = loads(body)['args'][0]
         except Exception:
@@ -121,38 +161,40 @@ class RabbitMQ(object):
             if message['subject'] == 'blocks':
                 yield self.blocks(message['body'])
             elif message['subject'] == 'master_tells':
-                user_ids = message['user_ids']
+                user_ids = set(message['user_ids'])
                 del message['user_ids']
-                for user in [key for key, value in IOLoop.current().clients.items() if value in user_ids]:
-                    user.write_message(dumps(message))
+                broadcast([key for key, value in IOLoop.current().clients.items() if value in user_ids], message)
             elif message['subject'] == 'messages':
                 if 'users' in message:
-                    for user in [key for key, value in IOLoop.current().clients.items() if value in message['users']]:
-                        user.write_message(dumps({
+                    user_ids = set(message['users'])
+                    broadcast(
+                        [key for key, value in IOLoop.current().clients.items() if value in user_ids],
+                        {
                             'subject': message['subject'],
                             'body': message['body'],
                             'action': message['action'],
-                        }))
+                        },
+                    )
                 else:
                     yield self.messages(message['body'])
             elif message['subject'] == 'notifications':
                 yield self.notifications(message['body'])
             elif message['subject'] == 'posts':
-                user_ids = message['user_ids']
+                user_ids = set(message['user_ids'])
                 del message['user_ids']
-                for user in [key for key, value in IOLoop.current().clients.items() if value in user_ids]:
-                    user.write_message(dumps(message))
+                broadcast([key for key, value in IOLoop.current().clients.items() if value in user_ids], message)
             elif message['subject'] == 'profile':
                 yield self.profile(message['body'])
             elif message['subject'] == 'tellzones':
-                for key, value in IOLoop.current().clients.items():
-                    key.write_message(dumps(message))
+                broadcast(IOLoop.current().clients.keys(), message)
             elif message['subject'] == 'users_locations':
                 yield self.users_locations(message['body'])
+            seconds = (datetime.now() - start).total_seconds()
+            set_event('RabbitMQ', message['subject'], seconds)
             logger.log(DEBUG, u'[{clients:>3d}] [{source:>9s}] [IN ] [{seconds:>9.2f}] {subject:s}'.format(
                 clients=len(IOLoop.current().clients.values()),
                 source='RabbitMQ',
-                seconds=(datetime.now() - start).total_seconds(),
+                seconds=seconds,
                 subject=message['subject'],
             ))
         except Exception:
@@ -182,66 +224,20 @@ class RabbitMQ(object):
         if not message:
             raise Return(None)
         try:
-            for user in [
-                key for key, value in IOLoop.current().clients.items() if value == message['user_source_id']
-            ]:
-                body = deepcopy(message)
-                body['user_destination']['email'] = (
-                    body['user_destination']['email']
-                    if body['user_destination']['settings']['show_email'] == 'True' else None
-                )
-                body['user_destination']['last_name'] = (
-                    body['user_destination']['last_name']
-                    if body['user_destination']['settings']['show_last_name'] == 'True' else None
-                )
-                body['user_destination']['phone'] = (
-                    body['user_destination']['phone']
-                    if body['user_destination']['settings']['show_phone'] == 'True' else None
-                )
-                body['user_destination']['photo_original'] = (
-                    body['user_destination']['photo_original']
-                    if body['user_destination']['settings']['show_photo'] == 'True' else None
-                )
-                body['user_destination']['photo_preview'] = (
-                    body['user_destination']['photo_preview']
-                    if body['user_destination']['settings']['show_photo'] == 'True' else None
-                )
-                del body['user_source']['settings']
-                del body['user_destination']['settings']
-                user.write_message(dumps({
+            users = [key for key, value in IOLoop.current().clients.items() if value == message['user_source_id']]
+            if users:
+                broadcast(users, {
                     'subject': 'messages',
-                    'body': body,
-                }))
-            for user in [
+                    'body': get_message(message, 'user_destination'),
+                })
+            users = [
                 key for key, value in IOLoop.current().clients.items() if value == message['user_destination_id']
-            ]:
-                body = deepcopy(message)
-                body['user_source']['email'] = (
-                    body['user_source']['email']
-                    if body['user_source']['settings']['show_email'] == 'True' else None
-                )
-                body['user_source']['last_name'] = (
-                    body['user_source']['last_name']
-                    if body['user_source']['settings']['show_last_name'] == 'True' else None
-                )
-                body['user_source']['phone'] = (
-                    body['user_source']['phone']
-                    if body['user_source']['settings']['show_phone'] == 'True' else None
-                )
-                body['user_source']['photo_original'] = (
-                    body['user_source']['photo_original']
-                    if body['user_source']['settings']['show_photo'] == 'True' else None
-                )
-                body['user_source']['photo_preview'] = (
-                    body['user_source']['photo_preview']
-                    if body['user_source']['settings']['show_photo'] == 'True' else None
-                )
-                del body['user_source']['settings']
-                del body['user_destination']['settings']
-                user.write_message(dumps({
+            ]
+            if users:
+                broadcast(users, {
                     'subject': 'messages',
-                    'body': body,
-                }))
+                    'body': get_message(message, 'user_source'),
+                })
         except Exception:
             client.captureException()
         raise Return(None)
@@ -311,23 +307,7 @@ class RabbitMQ(object):
                 'networks': {},
                 'tellzones': {},
             }
-            blocks = {}
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(
-                    '''
-                    SELECT user_source_id, user_destination_id
-                    FROM api_blocks
-                    WHERE user_source_id = %s OR user_destination_id = %s
-                    ''',
-                    (users_locations[0]['user_id'], users_locations[0]['user_id'],)
-                )
-                for record in cursor.fetchall():
-                    if not record[0] in blocks:
-                        blocks[record[0]] = []
-                    blocks[record[0]].append(record[1])
-                    if not record[1] in blocks:
-                        blocks[record[1]] = []
-                    blocks[record[1]].append(record[0])
+            blocked_ids = models.get_blocked_ids(users_locations[0]['user_id'])
             with closing(connection.cursor()) as cursor:
                 cursor.execute(
                     '''
@@ -348,7 +328,7 @@ class RabbitMQ(object):
                     (users_locations[0]['user_id'],),
                 )
                 for record in cursor.fetchall():
-                    if record[0] not in blocks.get(users_locations[0]['user_id'], []):
+                    if record[0] not in blocked_ids:
                         point = loads(record[3])
                         if len(users_locations) == 1:
                             if not users_locations[0]['is_casting']:
@@ -403,7 +383,7 @@ class RabbitMQ(object):
                                         user_ids['tellzones'][record[2]] = []
                                     user_ids['tellzones'][record[2]].append(record[0])
             if user_ids['home']:
-                current_app.send_task(
+                broker.send_task(
                     'api.management.commands.websockets',
                     (
                         {
@@ -419,7 +399,7 @@ class RabbitMQ(object):
                     serializer='json',
                 )
             for network_id in user_ids['networks']:
-                current_app.send_task(
+                broker.send_task(
                     'api.management.commands.websockets',
                     (
                         {
@@ -436,7 +416,7 @@ class RabbitMQ(object):
                     serializer='json',
                 )
             for tellzone_id in user_ids['tellzones']:
-                current_app.send_task(
+                broker.send_task(
                     'api.management.commands.websockets',
                     (
                         {
@@ -492,6 +472,7 @@ class RabbitMQ(object):
                         api_messages.inserted_at AS message_inserted_at,
                         api_messages.updated_at AS message_updated_at,
                         api_messages.attachments AS message_attachments,
+                        api_users_source.id AS user_source_id,
                         api_users_source.email AS user_source_email,
                         api_users_source.photo_original AS user_source_photo_original,
                         api_users_source.photo_preview AS user_source_photo_preview,
@@ -503,6 +484,7 @@ class RabbitMQ(object):
                         api_users_source.description AS user_source_description,
                         api_users_source.phone AS user_source_phone,
                         api_users_source.settings AS user_source_settings,
+                        api_users_destination.id AS user_destination_id,
                         api_users_destination.email AS user_destination_email,
                         api_users_destination.photo_original AS user_destination_photo_original,
                         api_users_destination.photo_preview AS user_destination_photo_preview,
@@ -548,120 +530,85 @@ class RabbitMQ(object):
                     ''',
                     (id,),
                 )
-                columns = [column.name for column in cursor.description]
-                for record in cursor.fetchall():
-                    record = dict(zip(columns, record))
-                    if 'id' not in message:
-                        message['id'] = record['message_id']
-                    if 'user_source_id' not in message:
-                        message['user_source_id'] = record['message_user_source_id']
-                    if 'user_source_is_hidden' not in message:
-                        message['user_source_is_hidden'] = record['message_user_source_is_hidden']
-                    if 'user_destination_id' not in message:
-                        message['user_destination_id'] = record['message_user_destination_id']
-                    if 'user_destination_is_hidden' not in message:
-                        message['user_destination_is_hidden'] = record['message_user_destination_is_hidden']
-                    if 'post_id' not in message:
-                        message['post_id'] = record['message_post_id']
-                    if 'type' not in message:
-                        message['type'] = record['message_type']
-                    if 'contents' not in message:
-                        message['contents'] = record['message_contents']
-                    if 'status' not in message:
-                        message['status'] = record['message_status']
-                    if 'inserted_at' not in message:
-                        message['inserted_at'] = record['message_inserted_at'].isoformat()
-                    if 'updated_at' not in message:
-                        message['updated_at'] = record['message_updated_at'].isoformat()
-                    if 'attachments' not in message:
-                        message['attachments'] = []
-                        try:
-                            message['attachments'] = loads(record['message_attachments'])
-                        except Exception:
-                            pass
-                    if 'user_source' not in message:
-                        message['user_source'] = {
-                            'id': record['message_user_source_id'],
-                            'email': record['user_source_email'],
-                            'photo_original': record['user_source_photo_original'],
-                            'photo_preview': record['user_source_photo_preview'],
-                            'first_name': record['user_source_first_name'],
-                            'last_name': record['user_source_last_name'],
-                            'date_of_birth': record['user_source_date_of_birth'].isoformat()
-                            if record['user_source_date_of_birth'] else None,
-                            'gender': record['user_source_gender'],
-                            'location': record['user_source_location'],
-                            'description': record['user_source_description'],
-                            'phone': record['user_source_phone'],
-                            'settings': loads(record['user_source_settings']),
-                        }
-                    if 'user_destination' not in message:
-                        message['user_destination'] = {
-                            'id': record['message_user_destination_id'],
-                            'email': record['user_destination_email'],
-                            'photo_original': record['user_destination_photo_original'],
-                            'photo_preview': record['user_destination_photo_preview'],
-                            'first_name': record['user_destination_first_name'],
-                            'last_name': record['user_destination_last_name'],
-                            'date_of_birth': record['user_destination_date_of_birth'].isoformat()
-                            if record['user_destination_date_of_birth'] else None,
-                            'gender': record['user_destination_gender'],
-                            'location': record['user_destination_location'],
-                            'description': record['user_destination_description'],
-                            'phone': record['user_destination_phone'],
-                            'settings': loads(record['user_destination_settings']),
-                        }
-                    if 'master_tell' not in message:
-                        message['master_tell'] = {}
-                    if record['master_tell_id']:
-                        if 'id' not in message['master_tell']:
-                            message['master_tell']['id'] = record['master_tell_id']
-                        if 'created_by_id' not in message['master_tell']:
-                            message['master_tell']['created_by_id'] = record['master_tell_created_by_id']
-                        if 'owned_by_id' not in message['master_tell']:
-                            message['master_tell']['owned_by_id'] = record['master_tell_owned_by_id']
-                        if 'category_id' not in message['master_tell']:
-                            message['master_tell']['category_id'] = record['master_tell_category_id']
-                        if 'contents' not in message['master_tell']:
-                            message['master_tell']['contents'] = record['master_tell_contents']
-                        if 'description' not in message['master_tell']:
-                            message['master_tell']['description'] = record['master_tell_description']
-                        if 'position' not in message['master_tell']:
-                            message['master_tell']['position'] = record['master_tell_position']
-                        if 'is_visible' not in message['master_tell']:
-                            message['master_tell']['is_visible'] = record['master_tell_is_visible']
-                        if 'inserted_at' not in message['master_tell']:
-                            message['master_tell']['inserted_at'] = record['master_tell_inserted_at'].isoformat()
-                        if 'updated_at' not in message['master_tell']:
-                            message['master_tell']['updated_at'] = record['master_tell_updated_at'].isoformat()
-                    if 'user_status' not in message:
-                        message['user_status'] = {}
-                    if record['user_status_id']:
-                        if 'id' not in message['user_status']:
-                            message['user_status']['id'] = record['user_status_id']
-                        if 'string' not in message['user_status']:
-                            message['user_status']['string'] = record['user_status_string']
-                        if 'title' not in message['user_status']:
-                            message['user_status']['title'] = record['user_status_title']
-                        if 'url' not in message['user_status']:
-                            message['user_status']['url'] = record['user_status_url']
-                        if 'notes' not in message['user_status']:
-                            message['user_status']['notes'] = record['user_status_notes']
-                        if 'attachments' not in message['user_status']:
-                            message['user_status']['attachments'] = {}
-                        if record['user_status_attachment_id'] not in message['user_status']['attachments']:
-                            message['user_status']['attachments'][record['user_status_attachment_id']] = {
-                                'id': record['user_status_attachment_id'],
-                                'string_original': record['user_status_attachment_string_original'],
-                                'string_preview': record['user_status_attachment_string_preview'],
-                                'position': record['user_status_attachment_position'],
-                            }
-            if message:
-                if 'user_status' in message:
-                    if 'attachments' in message['user_status']:
-                        message['user_status']['attachments'] = sorted(
-                            message['user_status']['attachments'].values(), key=lambda item: item['position'],
-                        )
+                users = (
+                    'id',
+                    'email',
+                    'photo_original',
+                    'photo_preview',
+                    'first_name',
+                    'last_name',
+                    ('date_of_birth', assembler.get_isoformat,),
+                    'gender',
+                    'location',
+                    'description',
+                    'phone',
+                    'settings',
+                )
+                messages = assembler.assemble(
+                    assembler.Node(
+                        'message_',
+                        (
+                            'id',
+                            'user_source_id',
+                            'user_source_is_hidden',
+                            'user_destination_id',
+                            'user_destination_is_hidden',
+                            'post_id',
+                            'type',
+                            'contents',
+                            'status',
+                            ('inserted_at', assembler.get_isoformat,),
+                            ('updated_at', assembler.get_isoformat,),
+                            ('attachments', assembler.get_loads(list),),
+                        ),
+                        nodes=(
+                            ('user_source', assembler.Node('user_source_', users),),
+                            ('user_destination', assembler.Node('user_destination_', users),),
+                            (
+                                'master_tell',
+                                assembler.Node(
+                                    'master_tell_',
+                                    (
+                                        'id',
+                                        'created_by_id',
+                                        'owned_by_id',
+                                        'category_id',
+                                        'contents',
+                                        'description',
+                                        'position',
+                                        'is_visible',
+                                        ('inserted_at', assembler.get_isoformat,),
+                                        ('updated_at', assembler.get_isoformat,),
+                                    ),
+                                    default=dict,
+                                ),
+                            ),
+                            (
+                                'user_status',
+                                assembler.Node(
+                                    'user_status_',
+                                    ('id', 'string', 'title', 'url', 'notes',),
+                                    default=dict,
+                                    nodes=(
+                                        (
+                                            'attachments',
+                                            assembler.Node(
+                                                'user_status_attachment_',
+                                                ('id', 'string_original', 'string_preview', 'position',),
+                                                many=True,
+                                                order='position',
+                                            ),
+                                        ),
+                                    ),
+                                ),
+                            ),
+                        ),
+                    ),
+                    [column.name for column in cursor.description],
+                    cursor.fetchall(),
+                )
+                if messages:
+                    message = messages[0]
         except Exception:
             client.captureException()
         raise Return(message)
@@ -960,7 +907,7 @@ class RabbitMQ(object):
                     if 'photo_preview' not in users[record['id']]:
                         users[record['id']]['photo_preview'] = record['photo_preview']
                     if 'settings' not in users[record['id']]:
-                        users[record['id']]['settings'] = loads(record['settings'])
+                        users[record['id']]['settings'] = record['settings']
                     if 'point' not in users[record['id']]:
                         users[record['id']]['point'] = {
                             'latitude': record['point']['coordinates'][1],
@@ -976,29 +923,64 @@ class RabbitMQ(object):
         raise Return(users)
 
 
+class Memory(RabbitMQ):
+
+    @coroutine
+    def __init__(self, *args, **kwargs):
+        self.is_polling = False
+        try:
+            PeriodicCallback(self.on_poll, 10).start()
+        except Exception:
+            client.captureException()
+        raise Return(None)
+
+    @coroutine
+    def on_poll(self):
+        if self.is_polling:
+            raise Return(None)
+        self.is_polling = True
+        try:
+            bodies = broker.get_messages('api.management.commands.websockets')
+            IOLoop.current().metrics['lag'] = {
+                'consumers': 1,
+                'messages': len(bodies),
+                'timestamp': datetime.now().isoformat(' '),
+            }
+            for body in bodies:
+                yield self.on_message(body)
+        except Exception:
+            client.captureException()
+        finally:
+            self.is_polling = False
+        raise Return(None)
+
+
 class WebSocket(WebSocketHandler):
 
     def check_origin(self, origin):
         return True
 
     def open(self):
+        IOLoop.current().sockets.add(self)
         self.stream.set_nodelay(True)
 
-    def write_message(self, message, binary=False):
+    def write_message(self, message, binary=False, subject=None):
         try:
-            message = loads(message)
+            if subject is None:
+                subject = loads(message)['subject']
             logger.log(DEBUG, u'[{clients:>3d}] [{source:>9s}] [OUT] [         ] {subject:s}'.format(
-                clients=len(IOLoop.current().clients.values()), source='WebSocket', subject=message['subject'],
+                clients=len(IOLoop.current().clients.values()), source='WebSocket', subject=subject,
             ))
         except Exception:
             logger.log(CRITICAL, u'[{clients:>3d}] [{source:>9s}] [OUT] [         ] {subject:s}'.format(
-                clients=len(IOLoop.current().clients.values()), source='WebSocket', subject=message['subject'],
+                clients=len(IOLoop.current().clients.values()), source='WebSocket', subject='loads(message)',
             ))
             client.captureException()
         super(WebSocket, self).write_message(message, binary=binary)
 
     def on_close(self):
-        del IOLoop.current().clients[self]
+        IOLoop.current().sockets.discard(self)
+        IOLoop.current().clients.pop(self, None)
 
     @coroutine
     def on_message(self, message):
@@ -1029,10 +1011,12 @@ class WebSocket(WebSocketHandler):
                 yield self.users(message['body'])
             elif message['subject'] == 'users_locations_post':
                 yield self.users_locations_post(message['body'])
+            seconds = (datetime.now() - start).total_seconds()
+            set_event('WebSocket', message['subject'], seconds)
             logger.log(DEBUG, u'[{clients:>3d}] [{source:>9s}] [IN ] [{seconds:>9.2f}] {subject:s}'.format(
                 clients=len(IOLoop.current().clients.values()),
                 source='WebSocket',
-                seconds=(datetime.now() - start).total_seconds(),
+                seconds=seconds,
                 subject=message['subject'],
             ))
         except Exception:
@@ -1099,19 +1083,7 @@ class WebSocket(WebSocketHandler):
     def get_blocks(self, one, two):
         blocks = 0
         try:
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(
-                    '''
-                    SELECT COUNT(id)
-                    FROM api_blocks
-                    WHERE
-                        (user_source_id = %s AND user_destination_id = %s)
-                        OR
-                        (user_source_id = %s AND user_destination_id = %s)
-                    ''',
-                    (one, two, two, one,)
-                )
-                blocks = cursor.fetchone()[0]
+            blocks = int(two in models.get_blocked_ids(one))
         except Exception:
             client.captureException()
         raise Return(blocks)
@@ -1242,6 +1214,10 @@ class WebSocket(WebSocketHandler):
                 )
                 connection.commit()
                 message_id = cursor.fetchone()[0]
+                caches.set_versions(
+                    'messages:{id:d}'.format(id=user_id),
+                    'messages:{id:d}'.format(id=data['user_destination_id']),
+                )
                 if 'type' in data:
                     if data['type'] == 'Response - Blocked':
                         cursor.execute(
@@ -1254,7 +1230,11 @@ class WebSocket(WebSocketHandler):
                         )
                         connection.commit()
                         block_id = cursor.fetchone()[0]
-                        current_app.send_task(
+                        caches.set_versions(
+                            'blocks:{id:d}'.format(id=user_id),
+                            'blocks:{id:d}'.format(id=data['user_destination_id']),
+                        )
+                        broker.send_task(
                             'api.management.commands.websockets',
                             (
                                 {
@@ -1299,20 +1279,24 @@ class WebSocket(WebSocketHandler):
                                 )
                                 connection.commit()
                                 break
+                        caches.set_versions(
+                            'messages:{id:d}'.format(id=user_id),
+                            'messages:{id:d}'.format(id=data['user_destination_id']),
+                        )
                     notify = False
                     if data['type'] in ['Request', 'Response - Accepted']:
                         cursor.execute(
                             'SELECT settings AS settings FROM api_users WHERE id = %s',
                             (data['user_destination_id'],)
                         )
-                        if loads(cursor.fetchone()[0])['notifications_invitations'] == 'True':
+                        if cursor.fetchone()[0] & models.SETTINGS['notifications_invitations']:
                             notify = True
                     if data['type'] in ['Ask', 'Message']:
                         cursor.execute(
                             'SELECT settings AS settings FROM api_users WHERE id = %s',
                             (data['user_destination_id'],)
                         )
-                        if loads(cursor.fetchone()[0])['notifications_messages'] == 'True':
+                        if cursor.fetchone()[0] & models.SETTINGS['notifications_messages']:
                             notify = True
                     if notify:
                         badge = 0
@@ -1334,7 +1318,7 @@ class WebSocket(WebSocketHandler):
                             )
                         else:
                             body = data['contents']
-                        current_app.send_task(
+                        broker.send_task(
                             'api.tasks.push_notifications',
                             (
                                 data['user_destination_id'],
@@ -1356,7 +1340,7 @@ class WebSocket(WebSocketHandler):
                             routing_key='api.tasks.push_notifications',
                             serializer='json',
                         )
-                current_app.send_task(
+                broker.send_task(
                     'api.management.commands.websockets',
                     (
                         {
@@ -1514,7 +1498,7 @@ class WebSocket(WebSocketHandler):
                         )
                     )
                     id = cursor.fetchone()[0]
-                current_app.send_task(
+                broker.send_task(
                     'api.management.commands.websockets',
                     (
                         {
@@ -1545,15 +1529,187 @@ class WebSocket(WebSocketHandler):
         raise Return(None)
 
 
+class Metrics(RequestHandler):
+
+    def get(self):
+        self.set_header('Content-Type', 'application/json; charset=utf-8')
+        self.write(dumps(get_metrics()))
+
+
+def broadcast(users, message):
+    users = list(users)
+    if not users:
+        return
+    subject = message['subject']
+    message = dumps(message)
+    for user in users:
+        user.write_message(message, subject=subject)
+
+
+def get_message(message, key):
+    message = deepcopy(message)
+    for name, mask in models.PRIVACY:
+        if not message[key]['settings'] & mask:
+            message[key][name] = None
+    del message['user_source']['settings']
+    del message['user_destination']['settings']
+    return message
+
+
+def get_metrics():
+    metrics = IOLoop.current().metrics
+    buffers = [
+        getattr(socket.stream, '_write_buffer_size', 0)
+        for socket in IOLoop.current().sockets if getattr(socket, 'stream', None)
+    ]
+    events = {}
+    for source, subjects in metrics['events'].items():
+        events[source] = {}
+        for subject, event in subjects.items():
+            events[source][subject] = {
+                'count': event['count'],
+                'seconds': event['seconds'],
+                'histogram': dict(
+                    zip(['<={bucket:.3f}'.format(bucket=bucket) for bucket in BUCKETS] + ['+Inf'], event['histogram']),
+                ),
+            }
+    return {
+        'clients': len(IOLoop.current().sockets),
+        'users': {
+            'sockets': len(IOLoop.current().clients),
+            'ids': len(set(IOLoop.current().clients.values())),
+        },
+        'events': events,
+        'lag': metrics['lag'],
+        'buffers': {
+            'bytes': sum(buffers),
+            'maximum': max(buffers) if buffers else 0,
+        },
+        'stalls': metrics['stalls'],
+        'uptime': (datetime.now() - metrics['timestamp']).total_seconds(),
+    }
+
+
+def set_event(source, subject, seconds):
+    events = IOLoop.current().metrics['events']
+    if source not in events:
+        events[source] = {}
+    if subject not in events[source]:
+        events[source][subject] = {
+            'count': 0,
+            'seconds': 0.0,
+            'histogram': [0] * (len(BUCKETS) + 1),
+        }
+    events[source][subject]['count'] += 1
+    events[source][subject]['seconds'] += seconds
+    events[source][subject]['histogram'][bisect_left(BUCKETS, seconds)] += 1
+    if IOLoop.current().watchdog and seconds >= IOLoop.current().watchdog:
+        logger.log(CRITICAL, u'[{clients:>3d}] [{source:>9s}] [   ] [{seconds:>9.2f}] {subject:s}'.format(
+            clients=len(IOLoop.current().clients.values()), source=source, seconds=seconds, subject=subject,
+        ))
+        client.captureMessage('Slow handler', extra={
+            'source': source,
+            'subject': subject,
+            'seconds': seconds,
+        })
+
+
+def on_stall(signal, frame):
+    stack = []
+    while frame:
+        stack.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name,))
+        frame = frame.f_back
+    IOLoop.current().add_callback_from_signal(on_stall_report, stack[::-1])
+
+
+def on_stall_report(stack):
+    stack = ''.join(
+        format_list([
+            (filename, lineno, name, getline(filename, lineno).strip() or None,)
+            for filename, lineno, name in stack
+        ]),
+    )
+    logger.log(CRITICAL, u'[{clients:>3d}] [{source:>9s}] [   ] [{seconds:>9.2f}] {subject:s}\n{stack:s}'.format(
+        clients=len(IOLoop.current().clients.values()),
+        source='IOLoop',
+        seconds=IOLoop.current().watchdog,
+        subject='stall',
+        stack=stack,
+    ))
+    client.captureMessage('Stall', extra={
+        'seconds': IOLoop.current().watchdog,
+        'stack': stack,
+    })
+
+
+def set_stall():
+    metrics = IOLoop.current().metrics
+    now = datetime.now()
+    seconds = (now - metrics['tick']).total_seconds() - 1.0
+    metrics['tick'] = now
+    if seconds < 0.05:
+        return
+    metrics['stalls']['count'] += 1
+    metrics['stalls']['seconds'] += seconds
+    metrics['stalls']['maximum'] = max(metrics['stalls']['maximum'], seconds)
+
+
+def set_io_loop(watchdog):
+    IOLoop.current().clients = {}
+    IOLoop.current().sockets = set()
+    IOLoop.current().metrics = {
+        'events': {},
+        'lag': {},
+        'stalls': {
+            'count': 0,
+            'seconds': 0.0,
+            'maximum': 0.0,
+        },
+        'tick': datetime.now(),
+        'timestamp': datetime.now(),
+    }
+    IOLoop.current().watchdog = watchdog
+
+
 class Command(BaseCommand):
 
     help = 'WebSockets'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watchdog',
+            default=0.0,
+            dest='watchdog',
+            help='Report event-loop stalls and handlers slower than this many seconds',
+            type=float,
+        )
+
     def handle(self, *args, **kwargs):
         server = HTTPServer(
-            Application([('/websockets/', WebSocket)], autoreload=settings.DEBUG, debug=settings.DEBUG),
+            Application(
+                [
+                    ('/websockets/', WebSocket),
+                ],
+                autoreload=settings.DEBUG,
+                debug=settings.DEBUG,
+            ),
         )
         server.listen(settings.TORNADO['port'], address=settings.TORNADO['address'])
-        IOLoop.current().clients = {}
-        IOLoop.current().add_callback(RabbitMQ)
+        if 'metrics' in settings.TORNADO:
+            server = HTTPServer(
+                Application(
+                    [
+                        ('/metrics/', Metrics),
+                    ],
+                ),
+            )
+            server.listen(
+                settings.TORNADO['metrics']['port'],
+                address=settings.TORNADO['metrics'].get('address', '127.0.0.1'),
+            )
+        set_io_loop(kwargs['watchdog'])
+        PeriodicCallback(set_stall, 1000).start()
+        if IOLoop.current().watchdog:
+            IOLoop.current().set_blocking_signal_threshold(IOLoop.current().watchdog, on_stall)
+        IOLoop.current().add_callback(Memory if broker.is_memory() else RabbitMQ)
         IOLoop.current().start()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from random import expovariate, uniform
+from time import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from numpy import percentile
+from tornado.gen import coroutine, Return, sleep
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.testing import bind_unused_port
+from tornado.web import Application
+from tornado.websocket import websocket_connect
+from ujson import dumps, loads
+
+from api import broker, middleware, models
+from api.management.commands import websockets
+
+
+class Session(object):
+
+    def __init__(self, command, user_id, token, user_destination_id):
+        self.command = command
+        self.user_id = user_id
+        self.token = token
+        self.user_destination_id = user_destination_id
+        self.connection = None
+        self.pings = deque()
+        self.messages = 0
+
+    @coroutine
+    def start(self, url, deadline):
+        try:
+            self.connection = yield websocket_connect(url)
+        except Exception:
+            self.command.errors['connect'] += 1
+            raise Return(None)
+        self.connection.write_message(dumps({
+            'subject': 'users',
+            'body': self.token,
+        }))
+        while True:
+            message = yield self.connection.read_message()
+            if message is None:
+                break
+            try:
+                message = loads(message)
+            except Exception:
+                self.command.errors['loads'] += 1
+                continue
+            self.on_message(message, deadline)
+        self.connection = None
+        raise Return(None)
+
+    def on_message(self, message, deadline):
+        if isinstance(message['body'], dict) and 'errors' in message['body']:
+            self.command.errors[message['subject']] += 1
+            return
+        if message['subject'] == 'users':
+            if not message['body']:
+                self.command.errors['users'] += 1
+                return
+            self.command.authenticated += 1
+            if self.command.rates['users_locations_post']:
+                IOLoop.current().add_callback(self.ping, deadline)
+            if self.command.rates['messages']:
+                IOLoop.current().add_callback(self.message, deadline)
+            return
+        if message['subject'] == 'users_locations_post':
+            if self.pings:
+                self.command.latencies['users_locations_post'].append(time() - self.pings.popleft())
+            return
+        if message['subject'] == 'messages':
+            if not isinstance(message['body'], dict) or message['body']['user_destination_id'] != self.user_id:
+                return
+            try:
+                self.command.latencies['messages'].append(time() - float(message['body']['contents']))
+            except (TypeError, ValueError):
+                pass
+            return
+
+    @coroutine
+    def ping(self, deadline):
+        while self.connection and time() < deadline:
+            yield sleep(expovariate(self.command.rates['users_locations_post']))
+            if not self.connection:
+                break
+            self.pings.append(time())
+            self.connection.write_message(dumps({
+                'subject': 'users_locations_post',
+                'body': {
+                    'point': {
+                        'latitude': 1.00 + uniform(-0.001, 0.001),
+                        'longitude': 1.00 + uniform(-0.001, 0.001),
+                    },
+                    'accuracies_horizontal': 0.00,
+                    'accuracies_vertical': 0.00,
+                    'bearing': 0,
+                    'is_casting': True,
+                },
+            }))
+            self.command.sent['users_locations_post'] += 1
+        raise Return(None)
+
+    @coroutine
+    def message(self, deadline):
+        while self.connection and time() < deadline:
+            yield sleep(expovariate(self.command.rates['messages']))
+            if not self.connection:
+                break
+            self.connection.write_message(dumps({
+                'subject': 'messages',
+                'body': {
+                    'user_destination_id': self.user_destination_id,
+                    'type': 'Message' if self.messages else 'Request',
+                    'contents': repr(time()),
+                    'status': 'Unread',
+                },
+            }))
+            self.messages += 1
+            self.command.sent['messages'] += 1
+        raise Return(None)
+
+
+class Command(BaseCommand):
+
+    help = 'WebSockets (Load)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', default=1000, dest='clients', type=int)
+        parser.add_argument(
+            '--database',
+            action='store_true',
+            default=False,
+            dest='database',
+            help='Allow --url to create the load users in the configured database (they are deleted afterwards)',
+        )
+        parser.add_argument('--duration', default=60.0, dest='duration', type=float)
+        parser.add_argument('--messages', default=0.05, dest='messages', help='Messages/second/client', type=float)
+        parser.add_argument('--pings', default=0.20, dest='pings', help='Pings/second/client', type=float)
+        parser.add_argument('--ramp', default=10.0, dest='ramp', help='Seconds to spread connects over', type=float)
+        parser.add_argument(
+            '--url',
+            default=None,
+            dest='url',
+            help='Load an already running daemon instead of an in-process one (requires --database)',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['url']:
+            if not kwargs['database']:
+                raise CommandError('--url creates the load users in the configured database; pass --database')
+            self.load(kwargs['url'], kwargs)
+            return
+        with override_settings(
+            BROKER='memory://',
+            CACHES={
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                },
+            },
+        ):
+            broker.app.conf.BROKER_URL = settings.BROKER
+            name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                socket, port = bind_unused_port()
+                server = HTTPServer(Application([('/websockets/', websockets.WebSocket)]))
+                server.add_sockets([socket])
+                websockets.set_io_loop(0.0)
+                IOLoop.current().add_callback(websockets.Memory)
+                self.load('ws://127.0.0.1:{port:d}/websockets/'.format(port=port), kwargs)
+                server.stop()
+            finally:
+                connection.creation.destroy_test_db(name, verbosity=0)
+        broker.app.conf.BROKER_URL = settings.BROKER
+
+    def load(self, url, kwargs):
+        self.authenticated = 0
+        self.errors = {
+            'connect': 0,
+            'loads': 0,
+            'messages': 0,
+            'users': 0,
+            'users_locations_post': 0,
+        }
+        self.latencies = {
+            'messages': [],
+            'users_locations_post': [],
+        }
+        self.rates = {
+            'messages': kwargs['messages'],
+            'users_locations_post': kwargs['pings'],
+        }
+        self.sent = {
+            'messages': 0,
+            'users_locations_post': 0,
+        }
+        users = middleware.mixer.cycle(kwargs['clients']).blend('api.User', is_verified=True, tellzone=None)
+        try:
+            self.stdout.write('Users: {count:d}'.format(count=len(users)))
+            sessions = [
+                Session(self, user.id, user.token, users[(index + 1) % len(users)].id)
+                for index, user in enumerate(users)
+            ]
+            start = time()
+            IOLoop.current().run_sync(lambda: self.run(sessions, kwargs, url))
+            self.report(time() - start)
+        finally:
+            models.User.objects.get_queryset().filter(id__in=[user.id for user in users]).delete()
+
+    @coroutine
+    def run(self, sessions, kwargs, url):
+        deadline = time() + kwargs['ramp'] + kwargs['duration']
+        for session in sessions:
+            IOLoop.current().add_callback(session.start, url, deadline)
+            yield sleep(kwargs['ramp'] / len(sessions))
+        yield sleep(max(0.0, deadline - time()) + 5.0)
+        for session in sessions:
+            if session.connection:
+                session.connection.close()
+        raise Return(None)
+
+    def report(self, seconds):
+        self.stdout.write('Seconds: {seconds:.2f}'.format(seconds=seconds))
+        self.stdout.write('Authenticated: {count:d}'.format(count=self.authenticated))
+        for key, value in sorted(self.errors.items()):
+            if value:
+                self.stdout.write('Errors ({key:s}): {value:d}'.format(key=key, value=value))
+        for key in sorted(self.latencies.keys()):
+            latencies = [latency * 1000 for latency in self.latencies[key]]
+            self.stdout.write(
+                '{key:s}: {sent:d} sent, {received:d} received, {throughput:.2f}/second'.format(
+                    key=key,
+                    sent=self.sent[key],
+                    received=len(latencies),
+                    throughput=len(latencies) / seconds,
+                ),
+            )
+            if not latencies:
+                continue
+            self.stdout.write(
+                '{key:s}: p50 {p50:.2f} ms, p90 {p90:.2f} ms, p99 {p99:.2f} ms, max {max:.2f} ms'.format(
+                    key=key,
+                    p50=percentile(latencies, 50),
+                    p90=percentile(latencies, 90),
+                    p99=percentile(latencies, 99),
+                    max=max(latencies),
+                ),
+            )
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0086_auto_20160717_1139'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rendition',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('source', models.CharField(max_length=255, verbose_name='Source', db_index=True)),
+                ('name', models.CharField(unique=True, max_length=255, verbose_name='Name')),
+                ('prefix', models.CharField(max_length=255, verbose_name='Prefix', db_index=True)),
+                ('format', models.CharField(max_length=255, verbose_name='Format', db_index=True)),
+                ('bytes', models.IntegerField(verbose_name='Bytes')),
+                ('inserted_at', models.DateTimeField(auto_now_add=True, verbose_name='Inserted At', db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At', db_index=True)),
+            ],
+            options={
+                'ordering': ('-id',),
+                'db_table': 'api_renditions',
+                'verbose_name': 'Rendition',
+                'verbose_name_plural': 'Renditions',
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+from contextlib import closing
+
+from django.db import connection, migrations, models
+from ujson import dumps, loads
+
+SETTINGS = {
+    'notifications_invitations': 1,
+    'notifications_messages': 2,
+    'notifications_saved_you': 4,
+    'notifications_shared_profiles': 8,
+    'show_email': 16,
+    'show_last_name': 32,
+    'show_phone': 64,
+    'show_photo': 128,
+}
+
+SETTINGS_DEFAULT = 79
+
+
+def transfer_users_settings(applications, schema):
+    with closing(connection.cursor()) as cursor:
+        cursor.execute('SELECT id, settings FROM api_users')
+        users = {}
+        for id, settings in cursor.fetchall():
+            flags = SETTINGS_DEFAULT
+            try:
+                settings = loads(settings) if settings else {}
+            except Exception:
+                settings = {}
+            for key, value in settings.items():
+                if key not in SETTINGS:
+                    continue
+                if value == 'True':
+                    flags |= SETTINGS[key]
+                else:
+                    flags &= ~SETTINGS[key]
+            users.setdefault(flags, []).append(id)
+        for flags, ids in users.items():
+            cursor.execute('UPDATE api_users SET flags = %s WHERE id = ANY(%s)', (flags, ids,))
+
+
+def transfer_users_flags(applications, schema):
+    with closing(connection.cursor()) as cursor:
+        cursor.execute('SELECT id, flags FROM api_users')
+        users = {}
+        for id, flags in cursor.fetchall():
+            users.setdefault(flags, []).append(id)
+        for flags, ids in users.items():
+            settings = dict((key, 'True' if flags & value else 'False',) for key, value in SETTINGS.items())
+            cursor.execute('UPDATE api_users SET settings = %s WHERE id = ANY(%s)', (dumps(settings), ids,))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0087_rendition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            field=models.IntegerField(default=SETTINGS_DEFAULT, verbose_name='Settings'),
+            model_name='user',
+            name='flags',
+        ),
+        migrations.RunPython(transfer_users_settings, reverse_code=transfer_users_flags),
+        migrations.RemoveField(model_name='user', name='settings'),
+        migrations.RenameField(model_name='user', old_name='flags', new_name='settings'),
+    ]
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0088_user_settings'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                'ALTER TABLE api_posts ADD COLUMN search tsvector',
+                '''
+                CREATE FUNCTION api_posts_search() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search :=
+                        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A')
+                        ||
+                        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.contents, '')), 'B');
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql
+                ''',
+                '''
+                CREATE TRIGGER api_posts_search
+                BEFORE INSERT OR UPDATE OF title, contents ON api_posts
+                FOR EACH ROW EXECUTE PROCEDURE api_posts_search()
+                ''',
+                'UPDATE api_posts SET title = title',
+                'CREATE INDEX api_posts_search ON api_posts USING GIN (search)',
+            ],
+            reverse_sql=[
+                'DROP INDEX api_posts_search',
+                'DROP TRIGGER api_posts_search ON api_posts',
+                'DROP FUNCTION api_posts_search()',
+                'ALTER TABLE api_posts DROP COLUMN search',
+            ],
+        ),
+    ]
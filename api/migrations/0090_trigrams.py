@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0089_posts_search'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+            ],
+            reverse_sql=[],
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='description',
+            field=models.TextField(null=True, verbose_name='Description', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='recommendedtell',
+            name='contents',
+            field=models.TextField(verbose_name='Contents'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='description',
+            field=models.TextField(null=True, verbose_name='Description', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='tellzonetype',
+            name='description',
+            field=models.TextField(null=True, verbose_name='Description', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='tellzonestatus',
+            name='description',
+            field=models.TextField(null=True, verbose_name='Description', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='tellzone',
+            name='description',
+            field=models.TextField(null=True, verbose_name='Description', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='userphoto',
+            name='description',
+            field=models.TextField(null=True, verbose_name='Description', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='userstatus',
+            name='notes',
+            field=models.TextField(null=True, verbose_name='Notes', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='mastertell',
+            name='contents',
+            field=models.TextField(verbose_name='Contents'),
+        ),
+        migrations.AlterField(
+            model_name='mastertell',
+            name='description',
+            field=models.TextField(null=True, verbose_name='Description', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='slavetell',
+            name='contents_original',
+            field=models.TextField(null=True, verbose_name='Contents :: Original', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='slavetell',
+            name='contents_preview',
+            field=models.TextField(null=True, verbose_name='Contents :: Preview', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='slavetell',
+            name='description',
+            field=models.TextField(null=True, verbose_name='Description', blank=True),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='contents',
+            field=models.TextField(verbose_name='Contents'),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='contents',
+            field=models.TextField(verbose_name='Contents', blank=True),
+        ),
+        migrations.RunSQL(
+            sql=[
+                'CREATE INDEX api_master_tells_contents_trgm ON api_master_tells USING GIN (contents gin_trgm_ops)',
+                'CREATE INDEX api_tellzones_name_trgm ON api_tellzones USING GIN (name gin_trgm_ops)',
+                'CREATE INDEX api_users_email_trgm ON api_users USING GIN (email gin_trgm_ops)',
+                'CREATE INDEX api_users_first_name_trgm ON api_users USING GIN (first_name gin_trgm_ops)',
+                'CREATE INDEX api_users_last_name_trgm ON api_users USING GIN (last_name gin_trgm_ops)',
+            ],
+            reverse_sql=[
+                'DROP INDEX api_master_tells_contents_trgm',
+                'DROP INDEX api_tellzones_name_trgm',
+                'DROP INDEX api_users_email_trgm',
+                'DROP INDEX api_users_first_name_trgm',
+                'DROP INDEX api_users_last_name_trgm',
+            ],
+        ),
+    ]
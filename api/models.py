@@ -5,7 +5,6 @@ from contextlib import closing
 from datetime import datetime, timedelta
 
 from bcrypt import gensalt, hashpw
-from celery import current_app
 from django.conf import settings
 from django.contrib.auth.models import update_last_login, User as Administrator
 from django.contrib.auth.signals import user_logged_in
@@ -45,6 +44,35 @@ from social.backends.utils import get_backend
 from social.strategies.django_strategy import DjangoStrategy
 from ujson import dumps, loads
 
+from api import assembler, broker, caches
+
+SETTINGS = {
+    'notifications_invitations': 1,
+    'notifications_messages': 2,
+    'notifications_saved_you': 4,
+    'notifications_shared_profiles': 8,
+    'show_email': 16,
+    'show_last_name': 32,
+    'show_phone': 64,
+    'show_photo': 128,
+}
+
+SETTINGS_DEFAULT = (
+    SETTINGS['notifications_invitations'] |
+    SETTINGS['notifications_messages'] |
+    SETTINGS['notifications_saved_you'] |
+    SETTINGS['notifications_shared_profiles'] |
+    SETTINGS['show_phone']
+)
+
+PRIVACY = (
+    ('email', SETTINGS['show_email'],),
+    ('last_name', SETTINGS['show_last_name'],),
+    ('phone', SETTINGS['show_phone'],),
+    ('photo_original', SETTINGS['show_photo'],),
+    ('photo_preview', SETTINGS['show_photo'],),
+)
+
 
 def __init__(
     self,
@@ -225,7 +253,7 @@ class Category(Model):
     name = CharField(ugettext_lazy('Name'), db_index=True, max_length=255, unique=True)
     photo = CharField(ugettext_lazy('Photo'), db_index=True, max_length=255)
     display_type = CharField(ugettext_lazy('Display Type'), blank=True, db_index=True, max_length=255, null=True)
-    description = TextField(ugettext_lazy('Description'), blank=True, db_index=True, null=True)
+    description = TextField(ugettext_lazy('Description'), blank=True, null=True)
     position = IntegerField(ugettext_lazy('Position'), db_index=True)
 
     class Meta:
@@ -256,7 +284,7 @@ class RecommendedTell(Model):
         default='Hobby',
         max_length=255,
     )
-    contents = TextField(ugettext_lazy('Contents'), db_index=True)
+    contents = TextField(ugettext_lazy('Contents'))
     photo = CharField(ugettext_lazy('Photo'), db_index=True, max_length=255)
     inserted_at = DateTimeField(ugettext_lazy('Inserted At'), auto_now_add=True, db_index=True)
     updated_at = DateTimeField(ugettext_lazy('Updated At'), auto_now=True, db_index=True)
@@ -314,10 +342,10 @@ class User(Model):
         null=True,
     )
     location = CharField(ugettext_lazy('Location'), blank=True, db_index=True, max_length=255, null=True)
-    description = TextField(ugettext_lazy('Description'), blank=True, db_index=True, null=True)
+    description = TextField(ugettext_lazy('Description'), blank=True, null=True)
     phone = CharField(ugettext_lazy('Phone'), blank=True, db_index=True, max_length=255, null=True)
     point = PointField(ugettext_lazy('Point'), blank=True, db_index=True, null=True)
-    settings = JSONField(ugettext_lazy('Settings'), blank=True, null=True)
+    settings = IntegerField(ugettext_lazy('Settings'), default=SETTINGS_DEFAULT)
     social_profiles = JSONField(ugettext_lazy('Social Profiles'), blank=True, null=True)
     is_verified = BooleanField(ugettext_lazy('Is Verified?'), db_index=True, default=True)
     is_signed_in = BooleanField(ugettext_lazy('Is Signed In?'), db_index=True, default=True)
@@ -359,10 +387,6 @@ class User(Model):
 
     @classmethod
     def insert(cls, data):
-        settings_ = {}
-        if 'settings' in data:
-            for key, value in data['settings'].items():
-                settings_[key] = 'True' if value else 'False'
         social_profiles = []
         if 'social_profiles' in data:
             for social_profile in data['social_profiles']:
@@ -391,7 +415,7 @@ class User(Model):
             is_verified=False,
             access_code=data['access_code'] if 'access_code' in data else None,
             source=data['source'] if 'source' in data else None,
-            settings=settings_,
+            settings=get_settings(data['settings'] if 'settings' in data else {}, SETTINGS_DEFAULT),
             social_profiles=social_profiles,
         )
         if 'password' in data:
@@ -479,7 +503,7 @@ class User(Model):
             for master_tell in data['master_tells']:
                 MasterTell.insert(user.id, master_tell)
         if not user.is_verified:
-            current_app.send_task(
+            broker.send_task(
                 'api.tasks.email_notifications',
                 (user.id, 'verify',),
                 queue='api.tasks.email_notifications',
@@ -490,10 +514,10 @@ class User(Model):
 
     @property
     def settings_(self):
-        dictionary = {}
-        for key, value in self.settings.items():
-            dictionary[key] = True if value == 'True' else False
-        return dictionary
+        return dict((key, bool(self.settings & value),) for key, value in SETTINGS.items())
+
+    def get_setting(self, key):
+        return bool(self.settings & SETTINGS[key])
 
     def __str__(self):
         return '{first_name:s} {last_name:s} ({email:s})'.format(
@@ -528,10 +552,11 @@ class User(Model):
             'networks': [],
             'tellzones': [],
         }
+        blocked_ids = get_blocked_ids(user_location_1.user_id)
         for user_location_2 in UserLocation.objects.get_queryset().filter(
             ~Q(user_id=user_location_1.user_id), is_casting=True, timestamp__gt=datetime.now() - timedelta(minutes=1),
         ):
-            if not is_blocked(user_location_1.user_id, user_location_2.user_id):
+            if user_location_2.user_id not in blocked_ids:
                 if vincenty(
                     (user_location_1.point.x, user_location_1.point.y),
                     (user_location_2.point.x, user_location_2.point.y)
@@ -542,7 +567,7 @@ class User(Model):
                 if user_location_1.tellzone_id and user_location_1.tellzone_id == user_location_2.tellzone_id:
                     user_ids['tellzones'].append(user_location_2.user_id)
         if user_ids['home']:
-            current_app.send_task(
+            broker.send_task(
                 'api.management.commands.websockets',
                 (
                     {
@@ -558,7 +583,7 @@ class User(Model):
                 serializer='json',
             )
         if user_ids['networks']:
-            current_app.send_task(
+            broker.send_task(
                 'api.management.commands.websockets',
                 (
                     {
@@ -575,7 +600,7 @@ class User(Model):
                 serializer='json',
             )
         if user_ids['tellzones']:
-            current_app.send_task(
+            broker.send_task(
                 'api.management.commands.websockets',
                 (
                     {
@@ -642,9 +667,7 @@ class User(Model):
 
     def update_settings(self, data):
         if 'settings' in data:
-            for key, value in data['settings'].items():
-                data['settings'][key] = 'True' if value else 'False'
-            self.settings = data['settings']
+            self.settings = get_settings(data['settings'], self.settings)
             self.save()
         return self
 
@@ -848,7 +871,7 @@ class TellzoneType(Model):
     name = CharField(ugettext_lazy('Name'), db_index=True, max_length=255, unique=True)
     title = CharField(ugettext_lazy('Title'), db_index=True, max_length=255, unique=True)
     icon = CharField(ugettext_lazy('Icon'), blank=True, db_index=True, max_length=255, null=True)
-    description = TextField(ugettext_lazy('Description'), blank=True, db_index=True, null=True)
+    description = TextField(ugettext_lazy('Description'), blank=True, null=True)
     position = IntegerField(ugettext_lazy('Position'), db_index=True)
 
     class Meta:
@@ -872,7 +895,7 @@ class TellzoneStatus(Model):
     name = CharField(ugettext_lazy('Name'), db_index=True, max_length=255, unique=True)
     title = CharField(ugettext_lazy('Title'), db_index=True, max_length=255, unique=True)
     icon = CharField(ugettext_lazy('Icon'), blank=True, db_index=True, max_length=255, null=True)
-    description = TextField(ugettext_lazy('Description'), blank=True, db_index=True, null=True)
+    description = TextField(ugettext_lazy('Description'), blank=True, null=True)
     position = IntegerField(ugettext_lazy('Position'), db_index=True)
 
     class Meta:
@@ -897,7 +920,7 @@ class Tellzone(Model):
     type = ForeignKey(TellzoneType, null=True, related_name='tellzones')
     status = ForeignKey(TellzoneStatus, null=True, related_name='tellzones')
     name = CharField(ugettext_lazy('Name'), db_index=True, max_length=255)
-    description = TextField(ugettext_lazy('Description'), blank=True, db_index=True, null=True)
+    description = TextField(ugettext_lazy('Description'), blank=True, null=True)
     photo = CharField(ugettext_lazy('Photo'), blank=True, db_index=True, max_length=255, null=True)
     location = CharField(ugettext_lazy('Location'), blank=True, db_index=True, max_length=255, null=True)
     phone = CharField(ugettext_lazy('Phone'), blank=True, db_index=True, max_length=255, null=True)
@@ -1134,22 +1157,15 @@ class Tellzone(Model):
         return connections
 
     def get_master_tells(self, user_id):
-        ids = []
-        for block in Block.objects.filter(
-            Q(user_source_id=user_id) | Q(user_destination_id=user_id),
-        ).order_by(
-            '-timestamp',
-        ).all():
-            if block.user_source.id == user_id:
-                if block.user_destination.id not in ids:
-                    ids.append(block.user_destination.id)
-            if block.user_destination.id == user_id:
-                if block.user_source.id not in ids:
-                    ids.append(block.user_source.id)
         return [
             master_tell_tellzone.master_tell
-            for master_tell_tellzone in MasterTellTellzone.objects.get_queryset().filter(tellzone_id=self.id)
-            if master_tell_tellzone.master_tell.owned_by_id not in ids
+            for master_tell_tellzone in MasterTellTellzone.objects.get_queryset().select_related(
+                'master_tell',
+            ).filter(
+                tellzone_id=self.id,
+            ).exclude(
+                master_tell__owned_by_id__in=get_blocked_ids(user_id),
+            )
         ]
 
     def get_posts(self, user_id):
@@ -1337,7 +1353,7 @@ class UserPhoto(Model):
         max_length=255,
         null=True,
     )
-    description = TextField(ugettext_lazy('Description'), blank=True, db_index=True, null=True)
+    description = TextField(ugettext_lazy('Description'), blank=True, null=True)
     position = IntegerField(ugettext_lazy('Position'), db_index=True)
 
     class Meta:
@@ -1373,7 +1389,7 @@ class UserStatus(Model):
     string = CharField(ugettext_lazy('String'), db_index=True, max_length=255)
     title = CharField(ugettext_lazy('Title'), db_index=True, max_length=255)
     url = CharField(ugettext_lazy('URL'), blank=True, db_index=True, max_length=255, null=True)
-    notes = TextField(ugettext_lazy('Notes'), blank=True, db_index=True, null=True)
+    notes = TextField(ugettext_lazy('Notes'), blank=True, null=True)
 
     class Meta:
 
@@ -1696,8 +1712,8 @@ class MasterTell(Model):
     created_by = ForeignKey(User, related_name='+')
     owned_by = ForeignKey(User, related_name='master_tells')
     category = ForeignKey(Category, null=True, related_name='master_tells')
-    contents = TextField(ugettext_lazy('Contents'), db_index=True)
-    description = TextField(ugettext_lazy('Description'), blank=True, db_index=True, null=True)
+    contents = TextField(ugettext_lazy('Contents'))
+    description = TextField(ugettext_lazy('Description'), blank=True, null=True)
     position = IntegerField(ugettext_lazy('Position'), db_index=True)
     is_visible = BooleanField(ugettext_lazy('Is Visible?'), db_index=True, default=True)
     inserted_at = DateTimeField(ugettext_lazy('Inserted At'), auto_now_add=True, db_index=True)
@@ -1959,9 +1975,9 @@ class SlaveTell(Model):
         db_index=True,
         max_length=255,
     )
-    contents_original = TextField(ugettext_lazy('Contents :: Original'), blank=True, db_index=True, null=True)
-    contents_preview = TextField(ugettext_lazy('Contents :: Preview'), blank=True, db_index=True, null=True)
-    description = TextField(ugettext_lazy('Description'), blank=True, db_index=True, null=True)
+    contents_original = TextField(ugettext_lazy('Contents :: Original'), blank=True, null=True)
+    contents_preview = TextField(ugettext_lazy('Contents :: Preview'), blank=True, null=True)
+    description = TextField(ugettext_lazy('Description'), blank=True, null=True)
     position = IntegerField(ugettext_lazy('Position'), db_index=True)
     is_editable = BooleanField(ugettext_lazy('Is Editable?'), db_index=True, default=True)
     inserted_at = DateTimeField(ugettext_lazy('Inserted At'), auto_now_add=True, db_index=True)
@@ -2106,7 +2122,7 @@ class Post(Model):
     user = ForeignKey(User, related_name='posts')
     category = ForeignKey(Category, null=True, related_name='posts')
     title = CharField(ugettext_lazy('Title'), db_index=True, max_length=255, null=True)
-    contents = TextField(ugettext_lazy('Contents'), db_index=True)
+    contents = TextField(ugettext_lazy('Contents'))
     inserted_at = DateTimeField(ugettext_lazy('Inserted At'), auto_now_add=True, db_index=True)
     updated_at = DateTimeField(ugettext_lazy('Updated At'), auto_now=True, db_index=True)
     expired_at = DateTimeField(ugettext_lazy('Expired At'), db_index=True)
@@ -2303,7 +2319,7 @@ class Message(Model):
         db_index=True,
         max_length=255,
     )
-    contents = TextField(ugettext_lazy('Contents'), blank=True, db_index=True)
+    contents = TextField(ugettext_lazy('Contents'), blank=True)
     attachments = JSONField(ugettext_lazy('Attachments'), blank=True, null=True)
     status = CharField(
         ugettext_lazy('Status'),
@@ -2383,6 +2399,42 @@ class Message(Model):
         return self
 
 
+class Rendition(Model):
+
+    source = CharField(ugettext_lazy('Source'), db_index=True, max_length=255)
+    name = CharField(ugettext_lazy('Name'), max_length=255, unique=True)
+    prefix = CharField(ugettext_lazy('Prefix'), db_index=True, max_length=255)
+    format = CharField(ugettext_lazy('Format'), db_index=True, max_length=255)
+    bytes = IntegerField(ugettext_lazy('Bytes'))
+    inserted_at = DateTimeField(ugettext_lazy('Inserted At'), auto_now_add=True, db_index=True)
+    updated_at = DateTimeField(ugettext_lazy('Updated At'), auto_now=True, db_index=True)
+
+    class Meta:
+
+        db_table = 'api_renditions'
+        ordering = (
+            '-id',
+        )
+        verbose_name = 'Rendition'
+        verbose_name_plural = 'Renditions'
+
+    def __str__(self):
+        return str(self.name)
+
+    def __unicode__(self):
+        return unicode(self.name)
+
+
+@receiver((post_delete, post_save,), sender=Version)
+def version_post_save(instance, **kwargs):
+    caches.set_version('versions')
+
+
+@receiver((post_delete, post_save,), sender=Ad)
+def ad_post_save(instance, **kwargs):
+    caches.set_version('ads')
+
+
 @receiver(pre_save, sender=Category)
 def category_pre_save(instance, **kwargs):
     if not instance.position:
@@ -2390,6 +2442,16 @@ def category_pre_save(instance, **kwargs):
         instance.position = position + 1 if position else 1
 
 
+@receiver((post_delete, post_save,), sender=Category)
+def category_post_save(instance, **kwargs):
+    caches.set_version('categories')
+
+
+@receiver((post_delete, post_save,), sender=RecommendedTell)
+def recommended_tell_post_save(instance, **kwargs):
+    caches.set_version('recommended_tells')
+
+
 @receiver(pre_save, sender=TellzoneType)
 def tellzone_type_pre_save(instance, **kwargs):
     if not instance.position:
@@ -2397,6 +2459,11 @@ def tellzone_type_pre_save(instance, **kwargs):
         instance.position = position + 1 if position else 1
 
 
+@receiver((post_delete, post_save,), sender=TellzoneType)
+def tellzone_type_post_save(instance, **kwargs):
+    caches.set_version('tellzones_types')
+
+
 @receiver(pre_save, sender=TellzoneStatus)
 def tellzone_status_pre_save(instance, **kwargs):
     if not instance.position:
@@ -2404,9 +2471,15 @@ def tellzone_status_pre_save(instance, **kwargs):
         instance.position = position + 1 if position else 1
 
 
+@receiver((post_delete, post_save,), sender=TellzoneStatus)
+def tellzone_status_post_save(instance, **kwargs):
+    caches.set_version('tellzones_statuses')
+
+
 @receiver(post_delete, sender=Tellzone)
 def tellzone_post_delete(instance, **kwargs):
-    current_app.send_task(
+    set_tellzones_versions([instance.id], [])
+    broker.send_task(
         'api.management.commands.websockets',
         (
             {
@@ -2421,6 +2494,28 @@ def tellzone_post_delete(instance, **kwargs):
     )
 
 
+@receiver(post_save, sender=Tellzone)
+def tellzone_post_save(instance, **kwargs):
+    set_tellzones_versions([instance.id], [])
+
+
+@receiver((post_delete, post_save,), sender=Network)
+def network_post_save(instance, **kwargs):
+    set_tellzones_versions(
+        NetworkTellzone.objects.get_queryset().filter(
+            network_id=instance.id,
+        ).values_list(
+            'tellzone_id', flat=True,
+        ),
+        [instance.id],
+    )
+
+
+@receiver((post_delete, post_save,), sender=NetworkTellzone)
+def network_tellzone_post_save(instance, **kwargs):
+    set_tellzones_versions([instance.tellzone_id], [])
+
+
 @receiver(pre_save, sender=User)
 def user_pre_save(instance, **kwargs):
     if instance.tellzone:
@@ -2435,29 +2530,15 @@ def user_pre_save(instance, **kwargs):
 
 @receiver(post_save, sender=User)
 def user_post_save(instance, **kwargs):
-    if 'created' in kwargs and kwargs['created']:
-        settings = {}
-        for key, value in {
-            'notifications_invitations': True,
-            'notifications_messages': True,
-            'notifications_saved_you': True,
-            'notifications_shared_profiles': True,
-            'show_email': False,
-            'show_last_name': False,
-            'show_phone': True,
-            'show_photo': False
-        }.items():
-            settings[key] = 'True' if value else 'False'
-        instance.settings = settings
-        instance.save()
-    current_app.send_task(
+    set_users_versions([instance.id])
+    broker.send_task_on_commit(
         'api.tasks.thumbnails_1',
         ('User', instance.id,),
         queue='api.tasks.thumbnails',
         routing_key='api.tasks.thumbnails',
         serializer='json',
     )
-    current_app.send_task(
+    broker.send_task(
         'api.management.commands.websockets',
         (
             {
@@ -2471,9 +2552,14 @@ def user_post_save(instance, **kwargs):
     )
 
 
+@receiver(post_delete, sender=User)
+def user_post_delete(instance, **kwargs):
+    set_users_versions([instance.id])
+
+
 @receiver(post_save, sender=UserLocation)
 def user_location_post_save(instance, **kwargs):
-    current_app.send_task(
+    broker.send_task(
         'api.management.commands.websockets',
         (
             {
@@ -2496,12 +2582,13 @@ def user_location_post_save(instance, **kwargs):
         'networks': {},
         'tellzones': {},
     }
+    blocked_ids = get_blocked_ids(user_location_1.user_id)
     for user_location in UserLocation.objects.get_queryset().filter(
         ~Q(user_id=user_location_1.user_id),
         is_casting=True,
         timestamp__gt=user_location_1.timestamp - timedelta(minutes=1),
     ):
-        if is_blocked(user_location_1.user_id, user_location.user_id):
+        if user_location.user_id in blocked_ids:
             continue
         if user_location_2:
             is_casting = (
@@ -2545,8 +2632,14 @@ def user_location_post_save(instance, **kwargs):
                 if user_location.tellzone_id not in user_ids['tellzones']:
                     user_ids['tellzones'][user_location.tellzone_id] = []
                 user_ids['tellzones'][user_location.tellzone_id].append(user_location.user_id)
+    set_homes_versions(
+        [user_location_1.user_id] +
+        user_ids['home'] +
+        [user_id for ids in user_ids['networks'].values() for user_id in ids] +
+        [user_id for ids in user_ids['tellzones'].values() for user_id in ids],
+    )
     if user_ids['home']:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2562,7 +2655,7 @@ def user_location_post_save(instance, **kwargs):
             serializer='json',
         )
     for network_id in user_ids['networks']:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2579,7 +2672,7 @@ def user_location_post_save(instance, **kwargs):
             serializer='json',
         )
     for tellzone_id in user_ids['tellzones']:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2610,7 +2703,8 @@ def user_photo_pre_save(instance, **kwargs):
 
 @receiver(post_save, sender=UserPhoto)
 def user_photo_post_save(instance, **kwargs):
-    current_app.send_task(
+    set_users_versions([instance.user_id])
+    broker.send_task_on_commit(
         'api.tasks.thumbnails_1',
         ('UserPhoto', instance.id,),
         queue='api.tasks.thumbnails',
@@ -2619,6 +2713,16 @@ def user_photo_post_save(instance, **kwargs):
     )
 
 
+@receiver(post_delete, sender=UserPhoto)
+def user_photo_post_delete(instance, **kwargs):
+    set_users_versions([instance.user_id])
+
+
+@receiver((post_delete, post_save,), sender=UserStatus)
+def user_status_post_save(instance, **kwargs):
+    set_users_versions([instance.user_id])
+
+
 @receiver(pre_save, sender=UserStatusAttachment)
 def user_status_attachment_pre_save(instance, **kwargs):
     if not instance.position:
@@ -2632,7 +2736,10 @@ def user_status_attachment_pre_save(instance, **kwargs):
 
 @receiver(post_save, sender=UserStatusAttachment)
 def user_status_attachment_post_save(instance, **kwargs):
-    current_app.send_task(
+    set_users_versions(
+        UserStatus.objects.get_queryset().filter(id=instance.user_status_id).values_list('user_id', flat=True),
+    )
+    broker.send_task_on_commit(
         'api.tasks.thumbnails_1',
         ('UserStatusAttachment', instance.id,),
         queue='api.tasks.thumbnails',
@@ -2641,22 +2748,32 @@ def user_status_attachment_post_save(instance, **kwargs):
     )
 
 
+@receiver(post_delete, sender=UserStatusAttachment)
+def user_status_attachment_post_delete(instance, **kwargs):
+    set_users_versions(
+        UserStatus.objects.get_queryset().filter(id=instance.user_status_id).values_list('user_id', flat=True),
+    )
+
+
 @receiver(post_save, sender=UserTellzone)
 def user_tellzone_post_save(instance, **kwargs):
+    caches.set_version('user_tellzones:{id:d}'.format(id=instance.user_id))
     if not instance.favorited_at:
         return
     user_ids = []
     user_ids.append(instance.user_id)
+    blocked_ids = get_blocked_ids(instance.user_id)
     for user_location in UserLocation.objects.get_queryset().filter(
         ~Q(user_id=instance.user_id),
         tellzone_id=instance.tellzone_id,
         is_casting=True,
         timestamp__gt=datetime.now() - timedelta(minutes=1),
     ):
-        if not is_blocked(instance.user_id, user_location.user_id):
+        if user_location.user_id not in blocked_ids:
             user_ids.append(user_location.user_id)
+    set_homes_versions(user_ids)
     if user_ids:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2674,6 +2791,11 @@ def user_tellzone_post_save(instance, **kwargs):
         )
 
 
+@receiver(post_delete, sender=UserTellzone)
+def user_tellzone_post_delete(instance, **kwargs):
+    caches.set_version('user_tellzones:{id:d}'.format(id=instance.user_id))
+
+
 @receiver(pre_save, sender=UserURL)
 def user_url_pre_save(instance, **kwargs):
     if not instance.position:
@@ -2685,13 +2807,22 @@ def user_url_pre_save(instance, **kwargs):
         instance.position = position + 1 if position else 1
 
 
+@receiver((post_delete, post_save,), sender=UserURL)
+def user_url_post_save(instance, **kwargs):
+    set_users_versions([instance.user_id])
+
+
 @receiver(post_save, sender=Block)
 def block_post_save(instance, **kwargs):
+    caches.set_versions(
+        'blocks:{id:d}'.format(id=instance.user_source_id),
+        'blocks:{id:d}'.format(id=instance.user_destination_id),
+    )
     Tellcard.objects.get_queryset().filter(
         Q(user_source_id=instance.user_source_id, user_destination_id=instance.user_destination_id) |
         Q(user_source_id=instance.user_destination_id, user_destination_id=instance.user_source_id),
     ).delete()
-    current_app.send_task(
+    broker.send_task(
         'api.management.commands.websockets',
         (
             {
@@ -2703,7 +2834,7 @@ def block_post_save(instance, **kwargs):
         routing_key='api.management.commands.websockets',
         serializer='json',
     )
-    current_app.send_task(
+    broker.send_task(
         'api.tasks.reports',
         (instance.id,),
         queue='api.tasks.reports',
@@ -2712,6 +2843,14 @@ def block_post_save(instance, **kwargs):
     )
 
 
+@receiver(post_delete, sender=Block)
+def block_post_delete(instance, **kwargs):
+    caches.set_versions(
+        'blocks:{id:d}'.format(id=instance.user_source_id),
+        'blocks:{id:d}'.format(id=instance.user_destination_id),
+    )
+
+
 @receiver(pre_save, sender=MasterTell)
 def master_tell_pre_save(instance, **kwargs):
     if not instance.position:
@@ -2725,12 +2864,14 @@ def master_tell_pre_save(instance, **kwargs):
 
 @receiver(post_delete, sender=MasterTell)
 def master_tell_post_delete(instance, **kwargs):
+    set_users_versions([instance.owned_by_id])
     master_tells_websockets_1(instance)
 
 
 @receiver(post_save, sender=MasterTell)
 def master_tell_post_save(instance, **kwargs):
-    current_app.send_task(
+    set_users_versions([instance.owned_by_id])
+    broker.send_task(
         'api.management.commands.websockets',
         (
             {
@@ -2758,18 +2899,20 @@ def master_tells_websockets_1(instance):
         'networks': [],
         'tellzones': [],
     }
+    blocked_ids = get_blocked_ids(user_location.user_id)
     for ul in UserLocation.objects.get_queryset().filter(
         ~Q(user_id=user_location.user_id), is_casting=True, timestamp__gt=datetime.now() - timedelta(minutes=1),
     ):
-        if not is_blocked(user_location.user_id, ul.user_id):
+        if ul.user_id not in blocked_ids:
             if vincenty((user_location.point.x, user_location.point.y), (ul.point.x, ul.point.y)).ft <= 300.00:
                 user_ids['home'].append(ul.user_id)
             if user_location.network_id and user_location.network_id == ul.network_id:
                 user_ids['networks'].append(ul.user_id)
             if user_location.tellzone_id and user_location.tellzone_id == ul.tellzone_id:
                     user_ids['tellzones'].append(ul.user_id)
+    set_homes_versions(user_ids['home'] + user_ids['networks'] + user_ids['tellzones'])
     if user_ids['home']:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2785,7 +2928,7 @@ def master_tells_websockets_1(instance):
             serializer='json',
         )
     if user_ids['networks']:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2802,7 +2945,7 @@ def master_tells_websockets_1(instance):
             serializer='json',
         )
     if user_ids['tellzones']:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2828,21 +2971,24 @@ def master_tell_tellzone_pre_save(instance, **kwargs):
 
 @receiver(post_save, sender=MasterTellTellzone)
 def master_tell_tellzone_post_save(instance, **kwargs):
+    set_users_versions([instance.master_tell.owned_by_id])
     master_tells_websockets_2(instance)
 
 
 @receiver(post_delete, sender=MasterTellTellzone)
 def master_tell_tellzone_post_delete(instance, **kwargs):
+    set_users_versions([instance.master_tell.owned_by_id])
     master_tells_websockets_2(instance)
 
 
 def master_tells_websockets_2(instance):
     user_ids = set()
+    blocked_ids = get_blocked_ids(instance.master_tell.owned_by_id)
     for master_tell_tellzone in MasterTellTellzone.objects.get_queryset().filter(
         ~Q(master_tell__owned_by_id=instance.master_tell.owned_by_id),
         tellzone_id=instance.tellzone_id,
     ):
-        if not is_blocked(instance.master_tell.owned_by_id, master_tell_tellzone.master_tell.owned_by_id):
+        if master_tell_tellzone.master_tell.owned_by_id not in blocked_ids:
             if instance.tellzone_id and instance.tellzone_id == master_tell_tellzone.tellzone_id:
                 user_ids.add(master_tell_tellzone.master_tell.owned_by_id)
     for ul in UserLocation.objects.get_queryset().filter(
@@ -2851,11 +2997,12 @@ def master_tells_websockets_2(instance):
         is_casting=True,
         timestamp__gt=datetime.now() - timedelta(minutes=1),
     ):
-        if not is_blocked(instance.master_tell.owned_by_id, ul.user_id):
+        if ul.user_id not in blocked_ids:
             if instance.tellzone_id and instance.tellzone_id == ul.tellzone_id:
                 user_ids.add(ul.user_id)
+    set_homes_versions(user_ids)
     if user_ids:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2881,6 +3028,10 @@ def message_pre_save(instance, **kwargs):
 
 @receiver(post_save, sender=Message)
 def message_post_save(instance, **kwargs):
+    caches.set_versions(
+        'messages:{id:d}'.format(id=instance.user_source_id),
+        'messages:{id:d}'.format(id=instance.user_destination_id),
+    )
     if 'created' in kwargs and kwargs['created']:
         if instance.type == 'Response - Blocked':
             Block.insert_or_update(instance.user_source.id, instance.user_destination_id, False)
@@ -2901,10 +3052,10 @@ def message_post_save(instance, **kwargs):
                     break
         status = False
         if instance.type in ['Request', 'Response - Accepted']:
-            if instance.user_destination.settings_['notifications_invitations']:
+            if instance.user_destination.get_setting('notifications_invitations'):
                 status = True
         if instance.type in ['Ask', 'Message']:
-            if instance.user_destination.settings_['notifications_messages']:
+            if instance.user_destination.get_setting('notifications_messages'):
                 status = True
         if status:
             if instance.type in ['Ask', 'Message']:
@@ -2915,7 +3066,7 @@ def message_post_save(instance, **kwargs):
                 )
             else:
                 body = instance.contents
-            current_app.send_task(
+            broker.send_task(
                 'api.tasks.push_notifications',
                 (
                     instance.user_destination_id,
@@ -2938,7 +3089,7 @@ def message_post_save(instance, **kwargs):
                 serializer='json',
             )
     if ('created' in kwargs and kwargs['created']) or not instance.is_suppressed:
-        current_app.send_task(
+        broker.send_task(
             'api.management.commands.websockets',
             (
                 {
@@ -2954,7 +3105,11 @@ def message_post_save(instance, **kwargs):
 
 @receiver(post_delete, sender=Message)
 def message_post_delete(instance, **kwargs):
-    current_app.send_task(
+    caches.set_versions(
+        'messages:{id:d}'.format(id=instance.user_source_id),
+        'messages:{id:d}'.format(id=instance.user_destination_id),
+    )
+    broker.send_task(
         'api.management.commands.websockets',
         (
             {
@@ -2972,7 +3127,8 @@ def message_post_delete(instance, **kwargs):
 
 @receiver(post_save, sender=Notification)
 def notification_post_save(instance, **kwargs):
-    current_app.send_task(
+    caches.set_version('notifications:{id:d}'.format(id=instance.user_id))
+    broker.send_task(
         'api.management.commands.websockets',
         (
             {
@@ -2986,11 +3142,16 @@ def notification_post_save(instance, **kwargs):
     )
 
 
+@receiver(post_delete, sender=Notification)
+def notification_post_delete(instance, **kwargs):
+    caches.set_version('notifications:{id:d}'.format(id=instance.user_id))
+
+
 @receiver(post_save, sender=ShareUser)
 def share_user_post_save(instance, **kwargs):
     if 'created' in kwargs and kwargs['created']:
         if instance.user_destination_id:
-            if instance.user_destination.settings_['notifications_shared_profiles']:
+            if instance.user_destination.get_setting('notifications_shared_profiles'):
                 Notification.objects.create(
                     user_id=instance.user_destination_id,
                     type='B',
@@ -2998,28 +3159,31 @@ def share_user_post_save(instance, **kwargs):
                         'user_source': {
                             'id': instance.user_source.id,
                             'first_name': instance.user_source.first_name,
-                            'last_name': instance.user_source.last_name if instance.user_source.settings_[
-                                'show_last_name'
-                            ] else None,
-                            'photo_original': instance.user_source.photo_original if instance.user_source.settings_[
-                                'show_photo'
-                            ] else None,
-                            'photo_preview': instance.user_source.photo_preview if instance.user_source.settings_[
-                                'show_photo'
-                            ] else None,
+                            'last_name': (
+                                instance.user_source.last_name
+                                if instance.user_source.get_setting('show_last_name') else None
+                            ),
+                            'photo_original': (
+                                instance.user_source.photo_original
+                                if instance.user_source.get_setting('show_photo') else None
+                            ),
+                            'photo_preview': (
+                                instance.user_source.photo_preview
+                                if instance.user_source.get_setting('show_photo') else None
+                            ),
                         },
                         'user_destination': {
                             'id': instance.object.id,
                             'first_name': instance.object.first_name,
-                            'last_name': instance.object.last_name if instance.object.settings_[
-                                'show_last_name'
-                            ] else None,
-                            'photo_original': instance.object.photo_original if instance.object.settings_[
-                                'show_photo'
-                            ] else None,
-                            'photo_preview': instance.object.photo_preview if instance.object.settings_[
-                                'show_photo'
-                            ] else None,
+                            'last_name': (
+                                instance.object.last_name if instance.object.get_setting('show_last_name') else None
+                            ),
+                            'photo_original': (
+                                instance.object.photo_original if instance.object.get_setting('show_photo') else None
+                            ),
+                            'photo_preview': (
+                                instance.object.photo_preview if instance.object.get_setting('show_photo') else None
+                            ),
                         },
                     },
                 )
@@ -3038,14 +3202,15 @@ def slave_tell_pre_save(instance, **kwargs):
 
 @receiver(post_save, sender=SlaveTell)
 def slave_tell_post_save(instance, **kwargs):
-    current_app.send_task(
+    set_users_versions([instance.owned_by_id])
+    broker.send_task_on_commit(
         'api.tasks.thumbnails_1',
         ('SlaveTell', instance.id,),
         queue='api.tasks.thumbnails',
         routing_key='api.tasks.thumbnails',
         serializer='json',
     )
-    current_app.send_task(
+    broker.send_task(
         'api.management.commands.websockets',
         (
             {
@@ -3059,29 +3224,41 @@ def slave_tell_post_save(instance, **kwargs):
     )
 
 
+@receiver(post_delete, sender=SlaveTell)
+def slave_tell_post_delete(instance, **kwargs):
+    set_users_versions([instance.owned_by_id])
+
+
 @receiver(post_save, sender=Tellcard)
 def tellcard_post_save(instance, **kwargs):
+    caches.set_versions(
+        'tellcards:{id:d}'.format(id=instance.user_source_id),
+        'tellcards:{id:d}'.format(id=instance.user_destination_id),
+    )
     if instance.saved_at:
         if (
             ('created' in kwargs and kwargs['created']) or
             ('update_fields' in kwargs and kwargs['update_fields'] and 'saved_at' in kwargs['update_fields'])
         ):
-            if instance.user_destination.settings_['notifications_saved_you']:
+            if instance.user_destination.get_setting('notifications_saved_you'):
                 Notification.objects.create(
                     user_id=instance.user_destination_id,
                     type='A',
                     contents={
                         'id': instance.user_source.id,
                         'first_name': instance.user_source.first_name,
-                        'last_name': instance.user_source.last_name if instance.user_source.settings_[
-                            'show_last_name'
-                        ] else None,
-                        'photo_original': instance.user_source.photo_original if instance.user_source.settings_[
-                            'show_photo'
-                        ] else None,
-                        'photo_preview': instance.user_source.photo_preview if instance.user_source.settings_[
-                            'show_photo'
-                        ] else None,
+                        'last_name': (
+                            instance.user_source.last_name
+                            if instance.user_source.get_setting('show_last_name') else None
+                        ),
+                        'photo_original': (
+                            instance.user_source.photo_original
+                            if instance.user_source.get_setting('show_photo') else None
+                        ),
+                        'photo_preview': (
+                            instance.user_source.photo_preview
+                            if instance.user_source.get_setting('show_photo') else None
+                        ),
                     },
                 )
                 string = u'{name:s} saved your profile'.format(
@@ -3090,14 +3267,15 @@ def tellcard_post_save(instance, **kwargs):
                             None,
                             [
                                 instance.user_source.first_name,
-                                instance.user_source.last_name if instance.user_source.settings_[
-                                    'show_last_name'
-                                ] else None,
+                                (
+                                    instance.user_source.last_name
+                                    if instance.user_source.get_setting('show_last_name') else None
+                                ),
                             ]
                         )
                     ),
                 )
-                current_app.send_task(
+                broker.send_task(
                     'api.tasks.push_notifications',
                     (
                         instance.user_destination_id,
@@ -3118,11 +3296,24 @@ def tellcard_post_save(instance, **kwargs):
                 )
 
 
+@receiver(post_delete, sender=Tellcard)
+def tellcard_post_delete(instance, **kwargs):
+    caches.set_versions(
+        'tellcards:{id:d}'.format(id=instance.user_source_id),
+        'tellcards:{id:d}'.format(id=instance.user_destination_id),
+    )
+
+
 @receiver(pre_save, sender=Post)
 def post_pre_save(instance, **kwargs):
     instance.expired_at = datetime.now() + timedelta(days=365)
 
 
+@receiver((post_delete, post_save,), sender=Post)
+def post_post_save(instance, **kwargs):
+    set_users_versions([instance.user_id])
+
+
 @receiver(pre_save, sender=PostAttachment)
 def post_attachment_pre_save(instance, **kwargs):
     if not instance.position:
@@ -3136,7 +3327,7 @@ def post_attachment_pre_save(instance, **kwargs):
 
 @receiver(post_save, sender=PostAttachment)
 def post_attachment_post_save(instance, **kwargs):
-    current_app.send_task(
+    broker.send_task_on_commit(
         'api.tasks.thumbnails_1',
         ('PostAttachment', instance.id,),
         queue='api.tasks.thumbnails',
@@ -3161,200 +3352,129 @@ def get_items(items, count):
 
 
 def get_master_tells(user_id, tellzone_id, tellzones, radius):
-    master_tells = {}
-    records = []
-    for tellzone in tellzones:
-        with closing(connection.cursor()) as cursor:
-            cursor.execute(
-                '''
-                SELECT
-                    api_master_tells.id AS id,
-                    api_master_tells.contents AS contents,
-                    api_master_tells.description AS description,
-                    api_master_tells.position AS position,
-                    api_master_tells.is_visible AS is_visible,
-                    api_master_tells.inserted_at AS inserted_at,
-                    api_master_tells.updated_at AS updated_at,
-                    true AS is_pinned,
-                    api_slave_tells.id AS slave_tell_id,
-                    api_slave_tells.created_by_id AS slave_tell_created_by_id,
-                    api_slave_tells.owned_by_id AS slave_tell_owned_by_id,
-                    api_slave_tells.photo AS slave_tell_photo,
-                    api_slave_tells.first_name AS slave_tell_first_name,
-                    api_slave_tells.last_name AS slave_tell_last_name,
-                    api_slave_tells.type AS slave_tell_type,
-                    api_slave_tells.contents_original AS slave_tell_contents_original,
-                    api_slave_tells.contents_preview AS slave_tell_contents_preview,
-                    api_slave_tells.description AS slave_tell_description,
-                    api_slave_tells.position AS slave_tell_position,
-                    api_slave_tells.is_editable AS slave_tell_is_editable,
-                    api_slave_tells.inserted_at AS slave_tell_inserted_at,
-                    api_slave_tells.updated_at AS slave_tell_updated_at,
-                    api_users_created_by.id AS created_by_id,
-                    api_users_created_by.photo_original AS created_by_photo_original,
-                    api_users_created_by.photo_preview AS created_by_photo_preview,
-                    api_users_created_by.first_name AS created_by_first_name,
-                    api_users_created_by.last_name AS created_by_last_name,
-                    api_users_created_by.description AS created_by_description,
-                    api_users_created_by.settings AS created_by_settings,
-                    api_users_owned_by.id AS owned_by_id,
-                    api_users_owned_by.photo_original AS owned_by_photo_original,
-                    api_users_owned_by.photo_preview AS owned_by_photo_preview,
-                    api_users_owned_by.first_name AS owned_by_first_name,
-                    api_users_owned_by.last_name AS owned_by_last_name,
-                    api_users_owned_by.description AS owned_by_description,
-                    api_users_owned_by.settings AS owned_by_settings,
-                    api_categories.id AS category_id,
-                    api_categories.name AS category_name,
-                    api_categories.photo AS category_photo,
-                    api_categories.display_type AS category_display_type,
-                    api_categories.description AS category_description,
-                    api_categories.position AS category_position,
-                    api_tellzones.id AS tellzone_id,
-                    api_tellzones.name AS tellzone_name
-                FROM api_master_tells_tellzones
-                INNER JOIN api_master_tells ON api_master_tells.id = api_master_tells_tellzones.master_tell_id
-                INNER JOIN api_tellzones ON api_tellzones.id = api_master_tells_tellzones.tellzone_id
-                LEFT OUTER JOIN api_slave_tells ON api_slave_tells.master_tell_id = api_master_tells.id
-                INNER JOIN api_users AS api_users_created_by
-                    ON api_users_created_by.id = api_master_tells.created_by_id
-                INNER JOIN api_users AS api_users_owned_by
-                    ON api_users_owned_by.id = api_master_tells.owned_by_id
-                INNER JOIN api_categories ON api_categories.id = api_master_tells.category_id
-                LEFT OUTER JOIN api_blocks ON
-                    (api_blocks.user_source_id = %s AND api_blocks.user_destination_id = api_master_tells.owned_by_id)
-                    OR
-                    (api_blocks.user_source_id = api_master_tells.owned_by_id AND api_blocks.user_destination_id = %s)
-                WHERE
-                    api_master_tells.owned_by_id != %s
-                    AND
-                    (
-                        api_master_tells_tellzones.tellzone_id IS NULL
-                        OR
-                        api_master_tells_tellzones.tellzone_id != %s
-                    )
-                    AND
-                    api_master_tells_tellzones.tellzone_id = %s
-                    AND
-                    api_master_tells_tellzones.status = %s
-                    AND
-                    api_blocks.id IS NULL
-                ORDER BY api_master_tells.id ASC, api_slave_tells.position ASC
-                ''',
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(
+            '''
+            SELECT
+                api_master_tells.id AS id,
+                api_master_tells.contents AS contents,
+                api_master_tells.description AS description,
+                api_master_tells.position AS position,
+                api_master_tells.is_visible AS is_visible,
+                api_master_tells.inserted_at AS inserted_at,
+                api_master_tells.updated_at AS updated_at,
+                true AS is_pinned,
+                api_master_tells.created_by_id AS created_by_id,
+                api_master_tells.owned_by_id AS owned_by_id,
+                api_master_tells.category_id AS category_id,
+                api_tellzones.id AS tellzone_id,
+                api_tellzones.name AS tellzone_name
+            FROM api_master_tells_tellzones
+            INNER JOIN api_master_tells ON api_master_tells.id = api_master_tells_tellzones.master_tell_id
+            INNER JOIN api_tellzones ON api_tellzones.id = api_master_tells_tellzones.tellzone_id
+            WHERE
+                api_master_tells.owned_by_id != %s
+                AND
                 (
-                    user_id, user_id, user_id, tellzone_id, tellzone[0], 'Published',
+                    api_master_tells_tellzones.tellzone_id IS NULL
+                    OR
+                    api_master_tells_tellzones.tellzone_id != %s
+                )
+                AND
+                api_master_tells_tellzones.tellzone_id = ANY(%s)
+                AND
+                api_master_tells_tellzones.status = %s
+                AND
+                api_master_tells.category_id IS NOT NULL
+                AND
+                api_master_tells.owned_by_id != ALL(%s)
+            ''',
+            (
+                user_id,
+                tellzone_id,
+                [tellzone[0] for tellzone in tellzones],
+                'Published',
+                list(get_blocked_ids(user_id)),
+            ),
+        )
+        master_tells = assembler.assemble(
+            assembler.Node(
+                '',
+                assembler.MASTER_TELLS + ('is_pinned', 'created_by_id', 'owned_by_id', 'category_id',),
+                order='id',
+                nodes=(
+                    ('tellzones', assembler.Node('tellzone_', ('id', 'name',), many=True, order='id'),),
+                ),
+            ),
+            [column.name for column in cursor.description],
+            cursor.fetchall(),
+        )
+        if not master_tells:
+            return []
+        cursor.execute(
+            '''
+            SELECT
+                id,
+                master_tell_id,
+                created_by_id,
+                owned_by_id,
+                photo,
+                first_name,
+                last_name,
+                type,
+                contents_original,
+                contents_preview,
+                description,
+                position,
+                is_editable,
+                inserted_at,
+                updated_at
+            FROM api_slave_tells
+            WHERE master_tell_id = ANY(%s)
+            ORDER BY position ASC
+            ''',
+            ([master_tell['id'] for master_tell in master_tells],),
+        )
+        slave_tells = {}
+        columns = [column.name for column in cursor.description]
+        for record in cursor.fetchall():
+            record = dict(zip(columns, record))
+            slave_tells.setdefault(record.pop('master_tell_id'), []).append(record)
+        cursor.execute(
+            '''
+            SELECT id, photo_original, photo_preview, first_name, last_name, description, settings
+            FROM api_users
+            WHERE id = ANY(%s)
+            ''',
+            (
+                list(
+                    set(master_tell['created_by_id'] for master_tell in master_tells) |
+                    set(master_tell['owned_by_id'] for master_tell in master_tells)
                 ),
+            ),
+        )
+        users = dict(
+            (user['id'], user,)
+            for user in assembler.assemble(
+                assembler.Node('', assembler.USERS, privacy=('settings', PRIVACY,)),
+                [column.name for column in cursor.description],
+                cursor.fetchall(),
             )
-            columns = [column.name for column in cursor.description]
-            for record in cursor.fetchall():
-                records.append(dict(zip(columns, record)))
-    for record in records:
-        if record['id'] not in master_tells:
-            master_tells[record['id']] = {}
-        if 'id' not in master_tells[record['id']]:
-            master_tells[record['id']]['id'] = record['id']
-        if 'contents' not in master_tells[record['id']]:
-            master_tells[record['id']]['contents'] = record['contents']
-        if 'description' not in master_tells[record['id']]:
-            master_tells[record['id']]['description'] = record['description']
-        if 'position' not in master_tells[record['id']]:
-            master_tells[record['id']]['position'] = record['position']
-        if 'is_visible' not in master_tells[record['id']]:
-            master_tells[record['id']]['is_visible'] = record['is_visible']
-        if 'inserted_at' not in master_tells[record['id']]:
-            master_tells[record['id']]['inserted_at'] = record['inserted_at']
-        if 'updated_at' not in master_tells[record['id']]:
-            master_tells[record['id']]['updated_at'] = record['updated_at']
-        if 'is_pinned' not in master_tells[record['id']]:
-            master_tells[record['id']]['is_pinned'] = record['is_pinned']
-        if 'slave_tells' not in master_tells[record['id']]:
-            master_tells[record['id']]['slave_tells'] = {}
-        if record['slave_tell_id']:
-            if record['slave_tell_id'] not in master_tells[record['id']]['slave_tells']:
-                master_tells[record['id']]['slave_tells'][record['slave_tell_id']] = {
-                    'id': record['slave_tell_id'],
-                    'created_by_id': record['slave_tell_created_by_id'],
-                    'owned_by_id': record['slave_tell_owned_by_id'],
-                    'photo': record['slave_tell_photo'],
-                    'first_name': record['slave_tell_first_name'],
-                    'last_name': record['slave_tell_last_name'],
-                    'type': record['slave_tell_type'],
-                    'contents_original': record['slave_tell_contents_original'],
-                    'contents_preview': record['slave_tell_contents_preview'],
-                    'description': record['slave_tell_description'],
-                    'position': record['slave_tell_position'],
-                    'is_editable': record['slave_tell_is_editable'],
-                    'inserted_at': record['slave_tell_inserted_at'],
-                    'updated_at': record['slave_tell_updated_at'],
-                }
-        if 'created_by' not in master_tells[record['id']]:
-            master_tells[record['id']]['created_by'] = {
-                'id': record['created_by_id'],
-                'photo_original': record['created_by_photo_original'],
-                'photo_preview': record['created_by_photo_preview'],
-                'first_name': record['created_by_first_name'],
-                'last_name': record['created_by_last_name'],
-                'description': record['created_by_description'],
-                'settings': loads(record['created_by_settings']),
-            }
-        if 'owned_by' not in master_tells[record['id']]:
-            master_tells[record['id']]['owned_by'] = {
-                'id': record['owned_by_id'],
-                'photo_original': record['owned_by_photo_original'],
-                'photo_preview': record['owned_by_photo_preview'],
-                'first_name': record['owned_by_first_name'],
-                'last_name': record['owned_by_last_name'],
-                'description': record['owned_by_description'],
-                'settings': loads(record['owned_by_settings']),
-            }
-        if 'category' not in master_tells[record['id']]:
-            master_tells[record['id']]['category'] = {
-                'id': record['category_id'],
-                'name': record['category_name'],
-                'photo': record['category_photo'],
-                'display_type': record['category_display_type'],
-                'description': record['category_description'],
-                'position': record['category_position'],
-            }
-        if 'tellzones' not in master_tells[record['id']]:
-            master_tells[record['id']]['tellzones'] = {}
-        if 'tellzone_id' in record and record['tellzone_id'] and 'tellzone_name' in record and record['tellzone_name']:
-            master_tells[record['id']]['tellzones'][record['tellzone_id']] = {
-                'id': record['tellzone_id'],
-                'name': record['tellzone_name'],
-            }
-    master_tells = sorted(master_tells.values(), key=lambda item: item['id'])
-    for key, value in enumerate(master_tells):
-        master_tells[key]['created_by']['photo_original'] = (
-            master_tells[key]['created_by']['photo_original']
-            if master_tells[key]['created_by']['settings']['show_photo'] == 'True' else None
-        )
-        master_tells[key]['created_by']['photo_preview'] = (
-            master_tells[key]['created_by']['photo_preview']
-            if master_tells[key]['created_by']['settings']['show_photo'] == 'True' else None
-        )
-        master_tells[key]['created_by']['last_name'] = (
-            master_tells[key]['created_by']['last_name']
-            if master_tells[key]['created_by']['settings']['show_last_name'] == 'True' else None
-        )
-        master_tells[key]['owned_by']['photo_original'] = (
-            master_tells[key]['owned_by']['photo_original']
-            if master_tells[key]['owned_by']['settings']['show_photo'] == 'True' else None
-        )
-        master_tells[key]['owned_by']['photo_preview'] = (
-            master_tells[key]['owned_by']['photo_preview']
-            if master_tells[key]['owned_by']['settings']['show_photo'] == 'True' else None
-        )
-        master_tells[key]['owned_by']['last_name'] = (
-            master_tells[key]['owned_by']['last_name']
-            if master_tells[key]['owned_by']['settings']['show_last_name'] == 'True' else None
-        )
-        del master_tells[key]['created_by']['settings']
-        del master_tells[key]['owned_by']['settings']
-        master_tells[key]['slave_tells'] = sorted(
-            master_tells[key]['slave_tells'].values(), key=lambda item: item['position'],
-        )
-        master_tells[key]['tellzones'] = sorted(master_tells[key]['tellzones'].values(), key=lambda item: item['id'])
+        )
+        cursor.execute(
+            '''
+            SELECT id, name, photo, display_type, description, position
+            FROM api_categories
+            WHERE id = ANY(%s)
+            ''',
+            (list(set(master_tell['category_id'] for master_tell in master_tells)),),
+        )
+        categories = dict((record[0], dict(zip(assembler.CATEGORIES, record)),) for record in cursor.fetchall())
+    for master_tell in master_tells:
+        master_tell['slave_tells'] = slave_tells.get(master_tell['id'], [])
+        master_tell['created_by'] = dict(users[master_tell.pop('created_by_id')])
+        master_tell['owned_by'] = dict(users[master_tell.pop('owned_by_id')])
+        master_tell['category'] = dict(categories[master_tell.pop('category_id')])
     return master_tells
 
 
@@ -3362,6 +3482,17 @@ def get_point(latitude, longitude):
     return fromstr('POINT({longitude:.14f} {latitude:.14f})'.format(latitude=latitude, longitude=longitude))
 
 
+def get_settings(dictionary, settings):
+    for key, value in dictionary.items():
+        if key not in SETTINGS:
+            continue
+        if value:
+            settings |= SETTINGS[key]
+        else:
+            settings &= ~SETTINGS[key]
+    return settings
+
+
 def get_users(user_id, network_id, tellzone_id, point, radius, include_user_id):
     point = 'POINT({longitude:.14f} {latitude:.14f})'.format(longitude=point.x, latitude=point.y)
     users = {}
@@ -3402,34 +3533,96 @@ def get_users(user_id, network_id, tellzone_id, point, radius, include_user_id):
             ''',
             (point, user_id, include_user_id, point, radius,),
         )
-        for record in cursor.fetchall():
-            if record[0] not in users:
-                p = loads(record[3])
-                p = get_point(p['coordinates'][1], p['coordinates'][0])
-                users[record[0]] = (User.objects.get_queryset().filter(id=record[0]).first(), p, record[4],)
-                users[record[0]][0].group = 1
-                if tellzone_id:
-                    if record[2]:
-                        if tellzone_id == record[2]:
-                            users[record[0]][0].group = 1
-                        else:
-                            users[record[0]][0].group = 2
-                    else:
-                        if record[4] <= 300.0:
-                            users[record[0]][0].group = 1
-                        else:
-                            users[record[0]][0].group = 2
+        records = cursor.fetchall()
+    instances = User.objects.get_queryset().in_bulk(set(record[0] for record in records))
+    for record in records:
+        if record[0] in users or record[0] not in instances:
+            continue
+        p = loads(record[3])
+        p = get_point(p['coordinates'][1], p['coordinates'][0])
+        users[record[0]] = (instances[record[0]], p, record[4],)
+        users[record[0]][0].group = 1
+        if tellzone_id:
+            if record[2]:
+                if tellzone_id == record[2]:
+                    users[record[0]][0].group = 1
                 else:
-                    if record[4] <= 300.0:
-                        users[record[0]][0].group = 1
-                    else:
-                        users[record[0]][0].group = 2
+                    users[record[0]][0].group = 2
+            else:
+                if record[4] <= 300.0:
+                    users[record[0]][0].group = 1
+                else:
+                    users[record[0]][0].group = 2
+        else:
+            if record[4] <= 300.0:
+                users[record[0]][0].group = 1
+            else:
+                users[record[0]][0].group = 2
     return users
 
 
-def is_blocked(one, two):
-    if Block.objects.get_queryset().filter(
-        Q(user_source_id=one, user_destination_id=two) | Q(user_source_id=two, user_destination_id=one),
-    ).count():
-        return True
-    return False
+def get_blocked_ids(user_id):
+    blocked_ids = set()
+    for user_source_id, user_destination_id in Block.objects.get_queryset().filter(
+        Q(user_source_id=user_id) | Q(user_destination_id=user_id),
+    ).values_list(
+        'user_source_id', 'user_destination_id',
+    ):
+        blocked_ids.add(user_destination_id if user_source_id == user_id else user_source_id)
+    return blocked_ids
+
+
+def set_homes_versions(user_ids):
+    caches.set_versions(*['home:{id:d}'.format(id=user_id) for user_id in set(user_ids)])
+
+
+def set_tellzones_versions(tellzone_ids, network_ids):
+    caches.set_versions(
+        *(
+            ['tellzones:{id:d}'.format(id=tellzone_id) for tellzone_id in set(tellzone_ids)] +
+            ['networks:{id:d}'.format(id=network_id) for network_id in set(network_ids)]
+        )
+    )
+
+
+def set_users_versions(user_ids):
+    caches.set_versions(*['users:{id:d}'.format(id=user_id) for user_id in set(user_ids)])
+
+
+def get_messages_versions(user_id):
+    user_ids = set([user_id])
+    for user_source_id, user_destination_id, owned_by_id in Message.objects.get_queryset().filter(
+        Q(user_source_id=user_id) | Q(user_destination_id=user_id),
+    ).order_by().values_list(
+        'user_source_id', 'user_destination_id', 'master_tell__owned_by_id',
+    ).distinct():
+        user_ids.update([user_source_id, user_destination_id])
+        if owned_by_id:
+            user_ids.add(owned_by_id)
+    return ['users:{id:d}'.format(id=id) for id in sorted(user_ids)]
+
+
+def get_tellcards_versions(query):
+    user_ids = set()
+    tellzone_ids = set()
+    network_ids = set()
+    for user_source_id, user_destination_id, tellzone_id, network_id in query.order_by().values_list(
+        'user_source_id', 'user_destination_id', 'tellzone_id', 'network_id',
+    ).distinct():
+        user_ids.update([user_source_id, user_destination_id])
+        if tellzone_id:
+            tellzone_ids.add(tellzone_id)
+        if network_id:
+            network_ids.add(network_id)
+    tellzone_ids.update(
+        MasterTellTellzone.objects.get_queryset().filter(
+            master_tell__owned_by_id__in=user_ids,
+        ).order_by().values_list(
+            'tellzone_id', flat=True,
+        ).distinct()
+    )
+    return (
+        ['users:{id:d}'.format(id=id) for id in sorted(user_ids)] +
+        ['tellzones:{id:d}'.format(id=id) for id in sorted(tellzone_ids)] +
+        ['networks:{id:d}'.format(id=id) for id in sorted(network_ids)]
+    )
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from ujson import loads
+
+
+class Parser(JSONParser):
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            return loads(stream.read().decode(encoding))
+        except ValueError as exception:
+            raise ParseError(u'JSON parse error - {exception:s}'.format(exception=unicode(exception)))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+from django.contrib.gis.geos import GEOSGeometry
+from django.db.models.query import QuerySet
+from django.http.multipartparser import parse_header
+from django.utils.encoding import force_text
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import ISO_8601
+from ujson import dumps, loads
+
+from api.serializers import DateTimeField
+
+DATETIME = DateTimeField(format=ISO_8601)
+
+NATIVES = frozenset((bool, float, int, long, str, unicode, type(None),))
+
+
+class Renderer(JSONRenderer):
+
+    '''
+    Drop-in replacement for JSONRenderer, backed by ujson.
+
+    Values that ujson cannot (or should not) encode natively are converted up front:
+
+    + datetime: formatted like the (patched) DateTimeField, i.e. `2015-01-01T00:00:00.000000`
+    + date/time/timedelta/UUID/Decimal/lazy strings/QuerySet: as JSONEncoder does
+    + GEOSGeometry: GeoJSON
+
+    ujson 1.33 has no `default` hook and silently mis-encodes these types (datetimes become epoch integers), hence the
+    walk. Containers are copied only when something inside them had to be converted; everything else (including
+    OrderedDict/ReturnDict) is handed to ujson as is. ujson emits object members in hash order regardless of the
+    mapping type, so key order is not part of the contract (JSON objects are unordered).
+
+    ujson 1.33 cannot indent either; when an indent is requested (`indent` in the media type or the renderer context),
+    the converted payload is rendered by the stdlib path of JSONRenderer instead.
+    '''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return bytes()
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super(Renderer, self).render(get_value(data), accepted_media_type, renderer_context)
+        contents = dumps(get_value(data), double_precision=15, ensure_ascii=self.ensure_ascii)
+        if not self.ensure_ascii:
+            contents = contents.replace('\xe2\x80\xa8', '\\u2028').replace('\xe2\x80\xa9', '\\u2029')
+        return contents
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        if accepted_media_type:
+            _, parameters = parse_header(accepted_media_type.encode('ascii'))
+            try:
+                return max(min(int(parameters['indent']), 8), 0)
+            except (KeyError, ValueError, TypeError):
+                pass
+        return renderer_context.get('indent', None)
+
+
+def get_value(value):
+    if type(value) in NATIVES:
+        return value
+    if isinstance(value, dict):
+        dictionary = value
+        for key, item in value.iteritems():
+            representation = get_value(item)
+            if representation is not item or type(key) not in NATIVES:
+                if dictionary is value:
+                    dictionary = dict(value)
+                if type(key) not in NATIVES:
+                    del dictionary[key]
+                    key = force_text(key)
+                dictionary[key] = representation
+        return dictionary
+    if isinstance(value, (list, tuple,)):
+        items = value
+        for index, item in enumerate(value):
+            representation = get_value(item)
+            if representation is not item:
+                if items is value:
+                    items = list(value)
+                items[index] = representation
+        return items
+    if isinstance(value, QuerySet):
+        return [get_value(item) for item in value]
+    if isinstance(value, (str, unicode,)):
+        return value
+    if isinstance(value, (bool, float, int, long,)):
+        return value
+    if isinstance(value, datetime):
+        return DATETIME.to_representation(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, time):
+        if value.utcoffset() is not None:
+            raise ValueError('JSON can\'t represent timezone-aware times.')
+        representation = value.isoformat()
+        if value.microsecond:
+            representation = representation[:12]
+        return representation
+    if isinstance(value, timedelta):
+        return unicode(value.total_seconds())
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return unicode(value)
+    if isinstance(value, Promise):
+        return force_text(value)
+    if isinstance(value, GEOSGeometry):
+        return loads(value.json)
+    if hasattr(value, 'tolist'):
+        return get_value(value.tolist())
+    if hasattr(value, '__iter__'):
+        return [get_value(item) for item in value]
+    raise TypeError('{value:s} is not JSON serializable'.format(value=repr(value)))
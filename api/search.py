@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from re import findall, sub, UNICODE
+
+from api.models import SETTINGS
+
+CONFIGURATION = 'pg_catalog.english'
+
+
+def get_master_tells(queryset, keywords):
+    return get_similar(queryset, keywords, (('api_master_tells.contents', None,),))
+
+
+def get_posts(queryset, keywords):
+    query = get_query(keywords)
+    if not query:
+        return queryset.none()
+    return queryset.extra(
+        select={
+            'rank': 'ts_rank_cd(api_posts.search, to_tsquery(%s, %s))',
+        },
+        select_params=(CONFIGURATION, query,),
+        where=[
+            'api_posts.search @@ to_tsquery(%s, %s)',
+        ],
+        params=(CONFIGURATION, query,),
+        order_by=('-rank', '-id',),
+    )
+
+
+def get_tellzones(queryset, keywords):
+    return get_similar(queryset, keywords, (('api_tellzones.name', None,),))
+
+
+def get_users(queryset, keywords, is_private=False):
+    '''
+    If `is_private` is True, `last_name` and `email` are only matched for users who have made them visible.
+    '''
+    return get_similar(
+        queryset,
+        keywords,
+        (
+            ('api_users.first_name', None,),
+            (
+                'api_users.last_name',
+                'api_users.settings & {setting:d} != 0'.format(
+                    setting=SETTINGS['show_last_name'],
+                ) if is_private else None,
+            ),
+            (
+                'api_users.email',
+                'api_users.settings & {setting:d} != 0'.format(setting=SETTINGS['show_email']) if is_private else None,
+            ),
+        ),
+    )
+
+
+def get_query(keywords):
+    return u' & '.join(u'{word:s}:*'.format(word=word) for word in findall(r'[^\W_]+', keywords, UNICODE))
+
+
+def get_similar(queryset, keywords, columns):
+    '''
+    Substring (`ILIKE`) and fuzzy (`%`, see `pg_trgm.similarity_threshold`) matches over `columns`, a list of
+    (column, condition,) tuples, both of which are served by the trigram (GIN) indexes. Ordered by similarity.
+    '''
+    keywords = keywords.strip()
+    if not keywords:
+        return queryset.none()
+    pattern = u'%{keywords:s}%'.format(keywords=sub(r'([\\%_])', r'\\\1', keywords))
+    similarities = []
+    wheres = []
+    for column, condition in columns:
+        similarity = 'similarity({column:s}, %s)'.format(column=column)
+        where = '({column:s} %% %s OR {column:s} ILIKE %s)'.format(column=column)
+        if condition:
+            similarity = 'CASE WHEN {condition:s} THEN {similarity:s} ELSE 0 END'.format(
+                condition=condition, similarity=similarity,
+            )
+            where = '({condition:s} AND {where:s})'.format(condition=condition, where=where)
+        similarities.append(similarity)
+        wheres.append(where)
+    return queryset.extra(
+        select={
+            'similarity': 'GREATEST({similarities:s})'.format(similarities=', '.join(similarities)),
+        },
+        select_params=(keywords,) * len(columns),
+        where=[
+            '({wheres:s})'.format(wheres=' OR '.join(wheres)),
+        ],
+        params=(keywords, pattern,) * len(columns),
+        order_by=('-similarity', '-id',),
+    )
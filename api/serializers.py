@@ -80,6 +80,14 @@ class Null(Serializer):
     pass
 
 
+class PageRequest(Serializer):
+
+    since_id = IntegerField(required=False)
+    max_id = IntegerField(required=False)
+    limit = IntegerField(max_value=1000, min_value=1, required=False)
+    offset = IntegerField(min_value=0, required=False)
+
+
 class Version(ModelSerializer):
 
     class Meta:
@@ -190,6 +198,21 @@ class RecommendedTell(ModelSerializer):
         model = models.RecommendedTell
 
 
+class Rendition(ModelSerializer):
+
+    class Meta:
+
+        fields = (
+            'id',
+            'source',
+            'name',
+            'prefix',
+            'format',
+            'bytes',
+        )
+        model = models.Rendition
+
+
 class UserPhoto(ModelSerializer):
 
     string_preview = CharField(allow_blank=True, required=False)
@@ -486,27 +509,27 @@ class User(ModelSerializer):
         for field in [field for field in self.fields.values() if not field.write_only]:
             if field.field_name == 'email':
                 dictionary[field.field_name] = None
-                if id == instance.id or instance.settings_['show_email']:
+                if id == instance.id or instance.get_setting('show_email'):
                     dictionary[field.field_name] = instance.email
                 continue
             if field.field_name == 'photo_original':
                 dictionary[field.field_name] = None
-                if id == instance.id or instance.settings_['show_photo']:
+                if id == instance.id or instance.get_setting('show_photo'):
                     dictionary[field.field_name] = instance.photo_original
                 continue
             if field.field_name == 'photo_preview':
                 dictionary[field.field_name] = None
-                if id == instance.id or instance.settings_['show_photo']:
+                if id == instance.id or instance.get_setting('show_photo'):
                     dictionary[field.field_name] = instance.photo_preview
                 continue
             if field.field_name == 'last_name':
                 dictionary[field.field_name] = None
-                if id == instance.id or instance.settings_['show_last_name']:
+                if id == instance.id or instance.get_setting('show_last_name'):
                     dictionary[field.field_name] = instance.last_name
                 continue
             if field.field_name == 'phone':
                 dictionary[field.field_name] = None
-                if id == instance.id or instance.settings_['show_phone']:
+                if id == instance.id or instance.get_setting('show_phone'):
                     dictionary[field.field_name] = instance.phone
                 continue
             if field.field_name == 'settings':
@@ -2383,6 +2406,15 @@ class RecommendedTellsResponse(RecommendedTell):
         model = models.RecommendedTell
 
 
+class RenditionsRequest(Serializer):
+
+    names = CharField()
+
+
+class RenditionsResponse(Rendition):
+    pass
+
+
 class RegisterRequest(User):
 
     email = EmailField()
@@ -3017,6 +3049,57 @@ class ProfilesResponse(UsersProfile):
     pass
 
 
+class SearchRequest(Serializer):
+
+    keywords = CharField()
+
+
+class SearchMasterTellsResponse(MasterTellsResponse):
+    pass
+
+
+class SearchTellzonesResponse(Tellzone):
+
+    class Meta:
+
+        fields = (
+            'id',
+            'user',
+            'type',
+            'status',
+            'name',
+            'description',
+            'photo',
+            'location',
+            'phone',
+            'url',
+            'hours',
+            'point',
+            'social_profiles',
+            'inserted_at',
+            'updated_at',
+            'started_at',
+            'ended_at',
+        )
+        model = models.Tellzone
+
+
+class SearchUsersResponse(User):
+
+    class Meta:
+
+        fields = (
+            'id',
+            'email',
+            'photo_original',
+            'photo_preview',
+            'first_name',
+            'last_name',
+            'description',
+        )
+        model = models.User
+
+
 class VerifyRequest(Serializer):
 
     id = IntegerField()
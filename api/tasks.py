@@ -2,19 +2,23 @@
 
 from __future__ import absolute_import
 
+from contextlib import closing
 from copy import deepcopy
-from os import environ, remove
-from os.path import getsize
-from tempfile import mkstemp
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
+from os import environ
+from tempfile import SpooledTemporaryFile
+from threading import local
+from time import sleep, time
 from uuid import uuid4
 
 from boto.s3.connection import S3Connection
-from boto.s3.key import Key
 from boto.ses import connect_to_region
-from celery import Celery, current_app
-from celery.signals import task_failure
+from celery import Celery
+from celery.signals import task_failure, worker_process_init
 from celery.utils.log import get_task_logger
 from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
 from kombu import Exchange, Queue
 from PIL import Image
 from pilkit.processors import ProcessorPipeline, ResizeToFit, Transpose
@@ -23,11 +27,12 @@ from requests import request
 
 environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
 
-from api import models  # noqa
+from api import broker, models  # noqa
 
 celery = Celery('api.tasks')
 celery.conf.update(
     BROKER_POOL_LIMIT=0,
+    BROKER_URL=settings.BROKER,
     CELERY_ACCEPT_CONTENT=[
         'json',
     ],
@@ -60,6 +65,9 @@ celery.conf.update(
         'api.tasks.email_notifications': {
             'queue': 'api.tasks.email_notifications',
         },
+        'api.tasks.email_notifications_batch': {
+            'queue': 'api.tasks.email_notifications',
+        },
         'api.tasks.push_notifications': {
             'queue': 'api.tasks.push_notifications',
         },
@@ -72,6 +80,9 @@ celery.conf.update(
         'api.tasks.thumbnails_2': {
             'queue': 'api.tasks.thumbnails',
         },
+        'api.tasks.thumbnails_3': {
+            'queue': 'api.tasks.thumbnails',
+        },
     },
     CELERY_TASK_SERIALIZER='json',
     CELERYD_LOG_FORMAT='[%(asctime)s: %(levelname)s] %(message)s',
@@ -85,26 +96,22 @@ client = Client(settings.RAVEN_CONFIG['dsn'])
 
 logger = get_task_logger(__name__)
 
+connections = local()
 
-@task_failure.connect
-def handle_task_failure(**kwargs):
-    client.captureException(extra=kwargs)
+quotas = {}
 
+counters = {
+    'thumbnails_1': 0,
+}
 
-@celery.task
-def email_notifications(id, type):
-    user = models.User.objects.get_queryset().filter(id=id).first()
-    if not user:
-        return
-    if type == 'reset_password':
-        connect_to_region(
-            settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        ).send_email(
-            settings.AWS_EMAIL,
-            'Reset Password',
-            u'''
+pools = {}
+
+TABLES = ('User', 'UserPhoto', 'UserStatusAttachment', 'SlaveTell', 'PostAttachment',)
+
+EMAILS = {
+    'reset_password': (
+        'Reset Password',
+        u'''
 Hi {first_name:s},
 
 Please use the following link to reset your password.
@@ -113,20 +120,11 @@ https://invite.tellzone.com/reset-password/{id:d}/{hash:s}/
 
 From,
 Tellzone
-            '''.strip().format(first_name=user.first_name, id=user.id, hash=user.hash),
-            [
-                user.email,
-            ],
-        )
-    if type == 'verify':
-        connect_to_region(
-            settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        ).send_email(
-            settings.AWS_EMAIL,
-            'Verify',
-            u'''
+        '''.strip(),
+    ),
+    'verify': (
+        'Verify',
+        u'''
 Hi {first_name:s},
 
 Please use the following link to verify.
@@ -135,11 +133,42 @@ https://invite.tellzone.com/verify/{id:d}/{hash:s}/
 
 From,
 Tellzone
-            '''.strip().format(first_name=user.first_name, id=user.id, hash=user.hash),
-            [
-                user.email,
-            ],
-        )
+        '''.strip(),
+    ),
+}
+
+MAXIMUM_MEMORY = 16777216
+MAXIMUM_PART = 8388608
+MAXIMUM_RETRIES = 5
+
+THREADS = 4
+
+FORMATS = ('jpeg', 'webp',)
+QUALITY = 75
+
+
+@task_failure.connect
+def handle_task_failure(**kwargs):
+    client.captureException(extra=kwargs)
+
+
+@worker_process_init.connect
+def handle_worker_process_init(**kwargs):
+    connections.__dict__.clear()
+    pools.clear()
+    quotas.clear()
+    get_bucket()
+    get_ses()
+
+
+@celery.task
+def email_notifications(id, type):
+    send_emails([(id, type,)])
+
+
+@celery.task
+def email_notifications_batch(items):
+    send_emails(items)
 
 
 @celery.task
@@ -208,199 +237,41 @@ def reports(id):
     )
 
 
-@celery.task
+@celery.task(max_retries=MAXIMUM_RETRIES)
 def thumbnails_1(table, id):
-    if table == 'User':
-        instance = models.User.objects.get_queryset().filter(id=id).first()
-        if not instance:
-            logger.critical('{table:s}/{id:d}: if not instance'.format(table=table, id=id))
-            raise thumbnails_1.retry(countdown=1)
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.photo_original, 'image/*', 'large', 1920, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.photo_original, 'image/*', 'small', 320, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.photo_preview, 'image/*', 'large', 1920, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.photo_preview, 'image/*', 'small', 320, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        return
-    if table == 'UserPhoto':
-        instance = models.UserPhoto.objects.get_queryset().filter(id=id).first()
-        if not instance:
-            logger.critical('{table:s}/{id:d}: if not instance'.format(table=table, id=id))
-            raise thumbnails_1.retry(countdown=1)
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.string_original, 'image/*', 'large', 1920, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.string_original, 'image/*', 'small', 320, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.string_preview, 'image/*', 'large', 1920, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.string_preview, 'image/*', 'small', 320, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        return
-    if table == 'UserStatusAttachment':
-        instance = models.UserStatusAttachment.objects.get_queryset().filter(id=id).first()
-        if not instance:
-            logger.critical('{table:s}/{id:d}: if not instance'.format(table=table, id=id))
-            raise thumbnails_1.retry(countdown=1)
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.string_original, 'image/*', 'large', 1920, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.string_original, 'image/*', 'small', 685, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.string_preview, 'image/*', 'large', 1920, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.string_preview, 'image/*', 'small', 685, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
+    if table not in TABLES:
         return
-    if table == 'SlaveTell':
-        instance = models.SlaveTell.objects.get_queryset().filter(id=id).first()
-        if not instance:
-            logger.critical('{table:s}/{id:d}: if not instance'.format(table=table, id=id))
-            raise thumbnails_1.retry(countdown=1)
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.photo, 'image/*', 'large', 1920, None,),
-            queue='api.tasks.thumbnails',
-            routing_key='api.tasks.thumbnails',
-            serializer='json',
-        )
-        current_app.send_task(
-            'api.tasks.thumbnails_2',
-            (instance.photo, 'image/*', 'small', 320, None,),
+    instance = getattr(models, table).objects.get_queryset().filter(id=id).first()
+    if not instance:
+        retries = thumbnails_1.request.retries
+        if retries >= MAXIMUM_RETRIES:
+            logger.critical('{table:s}/{id:d}: if not instance (#{retries:d})'.format(
+                table=table, id=id, retries=retries,
+            ))
+            client.captureMessage('thumbnails_1: if not instance', extra={
+                'table': table,
+                'id': id,
+                'retries': retries,
+            })
+            return
+        counters['thumbnails_1'] += 1
+        logger.warning('{table:s}/{id:d}: if not instance (#{retries:d}, {count:d} wasted retries)'.format(
+            table=table, id=id, retries=retries, count=counters['thumbnails_1'],
+        ))
+        raise thumbnails_1.retry(countdown=2 ** retries)
+    for name, type, items in get_thumbnails(table, instance):
+        broker.send_task(
+            'api.tasks.thumbnails_3',
+            (name, type, items,),
             queue='api.tasks.thumbnails',
             routing_key='api.tasks.thumbnails',
             serializer='json',
         )
-        if instance.type.startswith('image'):
-            current_app.send_task(
-                'api.tasks.thumbnails_2',
-                (instance.contents_original, instance.type, 'large', 1920, 1048576,),
-                queue='api.tasks.thumbnails',
-                routing_key='api.tasks.thumbnails',
-                serializer='json',
-            )
-            current_app.send_task(
-                'api.tasks.thumbnails_2',
-                (instance.contents_original, instance.type, 'small', 685, 524288,),
-                queue='api.tasks.thumbnails',
-                routing_key='api.tasks.thumbnails',
-                serializer='json',
-            )
-            current_app.send_task(
-                'api.tasks.thumbnails_2',
-                (instance.contents_preview, instance.type, 'large', 1920, 1048576,),
-                queue='api.tasks.thumbnails',
-                routing_key='api.tasks.thumbnails',
-                serializer='json',
-            )
-            current_app.send_task(
-                'api.tasks.thumbnails_2',
-                (instance.contents_preview, instance.type, 'small', 685, 524288,),
-                queue='api.tasks.thumbnails',
-                routing_key='api.tasks.thumbnails',
-                serializer='json',
-            )
-        return
-    if table == 'PostAttachment':
-        instance = models.PostAttachment.objects.get_queryset().filter(id=id).first()
-        if not instance:
-            logger.critical('{table:s}/{id:d}: if not instance'.format(table=table, id=id))
-            raise thumbnails_1.retry(countdown=1)
-        if instance.type.startswith('image'):
-            current_app.send_task(
-                'api.tasks.thumbnails_2',
-                (instance.string_original, instance.type, 'large', 1920, None,),
-                queue='api.tasks.thumbnails',
-                routing_key='api.tasks.thumbnails',
-                serializer='json',
-            )
-            current_app.send_task(
-                'api.tasks.thumbnails_2',
-                (instance.string_original, instance.type, 'small', 685, None,),
-                queue='api.tasks.thumbnails',
-                routing_key='api.tasks.thumbnails',
-                serializer='json',
-            )
-            current_app.send_task(
-                'api.tasks.thumbnails_2',
-                (instance.string_preview, instance.type, 'large', 1920, None,),
-                queue='api.tasks.thumbnails',
-                routing_key='api.tasks.thumbnails',
-                serializer='json',
-            )
-            current_app.send_task(
-                'api.tasks.thumbnails_2',
-                (instance.string_preview, instance.type, 'small', 685, None,),
-                queue='api.tasks.thumbnails',
-                routing_key='api.tasks.thumbnails',
-                serializer='json',
-            )
-        return
 
 
 @celery.task
 def thumbnails_2(name, type, prefix, width, bytes):
-    bucket = S3Connection(settings.AWS_ACCESS_KEY_ID, settings.AWS_SECRET_ACCESS_KEY).get_bucket(settings.AWS_BUCKET)
+    bucket = get_bucket()
     if not name:
         logger.critical('{name:s}: if not name (#1)'.format(name=name))
         return
@@ -417,28 +288,227 @@ def thumbnails_2(name, type, prefix, width, bytes):
     if k:
         logger.info('{name:s}: Success (#1)'.format(name=n))
         return
-    _, source = mkstemp()
-    key.get_contents_to_filename(source)
     destination = None
-    try:
-        destination = get_destination(source, name, type, width, bytes)
-    except Exception:
-        client.captureException()
+    with closing(SpooledTemporaryFile(max_size=MAXIMUM_MEMORY)) as source:
+        key.get_contents_to_file(source)
+        source.seek(0)
+        try:
+            destination = get_destination(source, name, type, width, bytes)
+        except Exception:
+            client.captureException()
     if not destination:
         logger.critical('{name:s}: Failure'.format(name=n))
         return
-    k = Key(bucket)
-    k.key = n
-    k.set_contents_from_filename(destination)
-    remove(destination)
-    remove(source)
+    set_contents(bucket, n, destination)
     logger.info('{name:s}: Success (#2)'.format(name=n))
     return
 
 
+@celery.task
+def thumbnails_3(name, type, items):
+    bucket = get_bucket()
+    if not name:
+        logger.critical('{name:s}: if not name (#1)'.format(name=name))
+        return
+    name = name.split('/')[-1]
+    if not name:
+        logger.critical('{name:s}: if not name (#2)'.format(name=name))
+        return
+    key = bucket.get_key(name)
+    if not key:
+        logger.critical('{name:s}: if not key'.format(name=name))
+        return
+    names = []
+    for prefix, width, bytes in items:
+        cache = get_cache(key, name, type, width, bytes)
+        names.append('{prefix:s}_{suffix:s}'.format(prefix=prefix, suffix=name))
+        names.append(cache)
+        names.extend(c for _, c in get_caches(cache, name, type))
+    keys = dict(zip(names, get_pool().map(get_key, names)))
+    items_ = []
+    for prefix, width, bytes in items:
+        n = '{prefix:s}_{suffix:s}'.format(prefix=prefix, suffix=name)
+        if keys[n]:
+            logger.info('{name:s}: Success (#1)'.format(name=n))
+            continue
+        cache = get_cache(key, name, type, width, bytes)
+        if keys[cache]:
+            bucket.copy_key(n, bucket.name, cache)
+            for format, c in get_caches(cache, name, type):
+                if not keys[c]:
+                    continue
+                bucket.copy_key('{name:s}.{format:s}'.format(name=n, format=format), bucket.name, c)
+                set_alternate(n, name, prefix, format, keys[c].size)
+            logger.info('{name:s}: Success (#3)'.format(name=n))
+            continue
+        items_.append((prefix, width, bytes,))
+    if not items_:
+        return
+    results = {}
+    alternates = {}
+    with closing(SpooledTemporaryFile(max_size=MAXIMUM_MEMORY)) as source:
+        key.get_contents_to_file(source)
+        source.seek(0)
+        try:
+            for prefix, width, bytes, contents, alternate in get_destinations(source, name, type, items_):
+                if not contents:
+                    continue
+                results[prefix] = get_pool().apply_async(
+                    set_rendition,
+                    (
+                        '{prefix:s}_{suffix:s}'.format(prefix=prefix, suffix=name),
+                        contents,
+                        get_cache(key, name, type, width, bytes),
+                    ),
+                )
+                if not alternate:
+                    continue
+                cache = get_cache(key, name, type, width, bytes)
+                alternates[prefix] = (
+                    alternate[0],
+                    len(alternate[1]),
+                    get_pool().apply_async(
+                        set_rendition,
+                        (
+                            '{prefix:s}_{suffix:s}.{format:s}'.format(
+                                prefix=prefix, suffix=name, format=alternate[0],
+                            ),
+                            alternate[1],
+                            '{cache:s}.{format:s}'.format(cache=cache, format=alternate[0]) if cache else None,
+                        ),
+                    ),
+                )
+        except Exception:
+            client.captureException()
+    for prefix, width, bytes in items_:
+        n = '{prefix:s}_{suffix:s}'.format(prefix=prefix, suffix=name)
+        if prefix not in results:
+            logger.critical('{name:s}: Failure'.format(name=n))
+            continue
+        results[prefix].get()
+        logger.info('{name:s}: Success (#2)'.format(name=n))
+        if prefix not in alternates:
+            continue
+        format, size, result = alternates[prefix]
+        result.get()
+        set_alternate(n, name, prefix, format, size)
+    return
+
+
 def get_destination(source, name, type, width, bytes):
     if not type.startswith('image'):
         return
+    format = get_format(name, type)
+    return get_contents(
+        ProcessorPipeline([
+            Transpose(),
+            ResizeToFit(width=width, upscale=False),
+        ]).process(
+            Image.open(source),
+        ),
+        format,
+        bytes,
+    )
+
+
+def get_destinations(source, name, type, items):
+    if not type.startswith('image'):
+        return
+    format = get_format(name, type)
+    image = Image.open(source)
+    image.load()
+    image = Transpose().process(image)
+    for prefix, width, bytes in sorted(items, key=lambda item: -item[1]):
+        image = ResizeToFit(width=width, upscale=False).process(image)
+        contents = get_contents(image, format, bytes)
+        yield prefix, width, bytes, contents, get_alternate(image, format, bytes, contents)
+
+
+def get_alternate(image, format, bytes, contents):
+    if not contents:
+        return
+    alpha = image.mode in ['LA', 'RGBA'] or 'transparency' in image.info
+    if image.mode not in ['RGB', 'RGBA']:
+        image = image.convert('RGBA' if alpha else 'RGB')
+    alternate = None
+    for f in FORMATS:
+        if f == format:
+            continue
+        if f == 'jpeg' and alpha:
+            continue
+        try:
+            c = get_bytes(image, f, QUALITY)
+        except (IOError, KeyError):
+            continue
+        if bytes and len(c) > bytes:
+            continue
+        if len(c) >= len(alternate[1] if alternate else contents):
+            continue
+        alternate = (f, c,)
+    return alternate
+
+
+def get_contents(image, format, bytes):
+    try:
+        contents = get_bytes(image, format, QUALITY)
+    except IOError:
+        return ''
+    if not bytes or len(contents) <= bytes:
+        return contents
+    if format not in ['jpeg', 'webp']:
+        return contents
+    qualities = range(5, QUALITY, 5)
+    low = 0
+    high = len(qualities) - 1
+    contents = {}
+    while low <= high:
+        middle = (low + high) // 2
+        try:
+            contents[qualities[middle]] = get_bytes(image, format, qualities[middle])
+        except IOError:
+            break
+        if len(contents[qualities[middle]]) <= bytes:
+            low = middle + 1
+        else:
+            high = middle - 1
+    qualities = [quality for quality in contents if len(contents[quality]) <= bytes]
+    if qualities:
+        return contents[max(qualities)]
+    if contents:
+        return contents[min(contents)]
+    return ''
+
+
+def get_cache(key, name, type, width, bytes):
+    if not key.etag:
+        return
+    return 'thumbnails/{etag:s}_{width:d}_{format:s}_{bytes:d}'.format(
+        etag=key.etag.strip('"'), width=width, format=get_format(name, type), bytes=bytes or 0,
+    )
+
+
+def get_caches(cache, name, type):
+    if not cache:
+        return []
+    format = get_format(name, type)
+    return [(f, '{cache:s}.{format:s}'.format(cache=cache, format=f),) for f in FORMATS if f != format]
+
+
+def get_bucket():
+    if not hasattr(connections, 'bucket'):
+        connections.bucket = S3Connection(
+            settings.AWS_ACCESS_KEY_ID, settings.AWS_SECRET_ACCESS_KEY, **getattr(settings, 'AWS_S3', {})
+        ).get_bucket(settings.AWS_BUCKET, validate=False)
+    return connections.bucket
+
+
+def get_bytes(image, format, quality):
+    contents = BytesIO()
+    image.save(contents, format=format, optimize=True, progressive=True, quality=quality)
+    return contents.getvalue()
+
+
+def get_format(name, type):
     format = type.split('/')[1]
     if format == '*':
         format = ''
@@ -450,29 +520,159 @@ def get_destination(source, name, type, width, bytes):
             format = 'png'
         if format == 'jpg':
             format = 'jpeg'
-    _, destination = mkstemp()
-    quality = 75
-    while True:
-        try:
-            ProcessorPipeline([
-                Transpose(),
-                ResizeToFit(width=width, upscale=False),
-            ]).process(
-                Image.open(source),
-            ).save(
-                destination, format=format, optimize=True, quality=quality,
-            )
-        except IOError:
-            break
-        if not bytes:
-            break
-        if getsize(destination) <= bytes:
-            break
-        if quality <= 5:
-            break
-        quality = quality - 5
-    return destination
+    return format
 
 
 def get_name(first_name, last_name):
     return ' '.join(filter(None, [first_name, last_name]))
+
+
+def get_smtp():
+    if not hasattr(connections, 'smtp'):
+        connections.smtp = get_connection()
+        connections.smtp.open()
+    return connections.smtp
+
+
+def get_thumbnails(table, instance):
+    if table == 'User':
+        return [
+            (instance.photo_original, 'image/*', [('large', 1920, None,), ('small', 320, None,)],),
+            (instance.photo_preview, 'image/*', [('large', 1920, None,), ('small', 320, None,)],),
+        ]
+    if table == 'UserPhoto':
+        return [
+            (instance.string_original, 'image/*', [('large', 1920, None,), ('small', 320, None,)],),
+            (instance.string_preview, 'image/*', [('large', 1920, None,), ('small', 320, None,)],),
+        ]
+    if table == 'UserStatusAttachment':
+        return [
+            (instance.string_original, 'image/*', [('large', 1920, None,), ('small', 685, None,)],),
+            (instance.string_preview, 'image/*', [('large', 1920, None,), ('small', 685, None,)],),
+        ]
+    if table == 'SlaveTell':
+        thumbnails = [
+            (instance.photo, 'image/*', [('large', 1920, None,), ('small', 320, None,)],),
+        ]
+        if instance.type.startswith('image'):
+            thumbnails.extend([
+                (instance.contents_original, instance.type, [('large', 1920, 1048576,), ('small', 685, 524288,)],),
+                (instance.contents_preview, instance.type, [('large', 1920, 1048576,), ('small', 685, 524288,)],),
+            ])
+        return thumbnails
+    if table == 'PostAttachment':
+        if instance.type.startswith('image'):
+            return [
+                (instance.string_original, instance.type, [('large', 1920, None,), ('small', 685, None,)],),
+                (instance.string_preview, instance.type, [('large', 1920, None,), ('small', 685, None,)],),
+            ]
+        return []
+    return []
+
+
+def get_key(name):
+    if not name:
+        return
+    return get_bucket().get_key(name)
+
+
+def get_pool():
+    if 'threads' not in pools:
+        pools['threads'] = ThreadPool(THREADS)
+    return pools['threads']
+
+
+def get_quota():
+    if 'rate' not in quotas:
+        quotas['rate'] = 1.0
+        quotas['timestamp'] = 0.0
+        try:
+            quotas['rate'] = float(
+                get_ses().get_send_quota()['GetSendQuotaResponse']['GetSendQuotaResult']['MaxSendRate']
+            )
+        except Exception:
+            client.captureException()
+    return quotas
+
+
+def get_ses():
+    if not hasattr(connections, 'ses'):
+        connections.ses = connect_to_region(
+            settings.AWS_REGION,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        )
+    return connections.ses
+
+
+def send_email(subject, body, email):
+    if not getattr(settings, 'AWS_SES', True):
+        EmailMessage(subject, body, settings.AWS_EMAIL, [email], connection=get_smtp()).send()
+        return
+    quota = get_quota()
+    seconds = quota['timestamp'] + (1.0 / quota['rate']) - time()
+    if seconds > 0:
+        sleep(seconds)
+    quota['timestamp'] = time()
+    get_ses().send_email(settings.AWS_EMAIL, subject, body, [email])
+
+
+def send_emails(items):
+    start = time()
+    users = models.User.objects.get_queryset().in_bulk(set(item[0] for item in items))
+    counts = {
+        'failed': 0,
+        'sent': 0,
+        'skipped': 0,
+    }
+    for id, type in items:
+        if id not in users or type not in EMAILS:
+            counts['skipped'] += 1
+            continue
+        user = users[id]
+        subject, body = EMAILS[type]
+        try:
+            send_email(subject, body.format(first_name=user.first_name, id=user.id, hash=user.hash), user.email)
+        except Exception:
+            client.captureException()
+            counts['failed'] += 1
+            continue
+        counts['sent'] += 1
+    logger.info('Emails: {sent:d} sent, {failed:d} failed, {skipped:d} skipped, {seconds:.3f} seconds'.format(
+        seconds=time() - start, **counts
+    ))
+    return counts
+
+
+def set_alternate(name, source, prefix, format, bytes):
+    models.Rendition.objects.update_or_create(
+        name='{name:s}.{format:s}'.format(name=name, format=format),
+        defaults={
+            'source': source,
+            'prefix': prefix,
+            'format': format,
+            'bytes': bytes,
+        },
+    )
+
+
+def set_rendition(name, contents, cache):
+    bucket = get_bucket()
+    set_contents(bucket, name, contents)
+    if cache:
+        bucket.copy_key(cache, bucket.name, name)
+
+
+def set_contents(bucket, name, contents):
+    if len(contents) <= MAXIMUM_PART:
+        key = bucket.new_key(name)
+        key.set_contents_from_file(BytesIO(contents))
+        return
+    upload = bucket.initiate_multipart_upload(name)
+    try:
+        for index, offset in enumerate(range(0, len(contents), MAXIMUM_PART)):
+            upload.upload_part_from_file(BytesIO(contents[offset:offset + MAXIMUM_PART]), index + 1)
+        upload.complete_upload()
+    except Exception:
+        upload.cancel_upload()
+        raise
@@ -1,17 +1,47 @@
 # -*- coding: utf-8 -*-
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
-
-from amqplib import client_0_8
+from decimal import Decimal
+from hashlib import md5
+from inspect import currentframe
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
+from os.path import exists, join
+from random import Random
+from shutil import rmtree
+from StringIO import StringIO
+from tempfile import mkdtemp
+from time import time
+from unittest import skipUnless
+
+from celery.exceptions import Retry
 from dateutil import parser
 from django.contrib.gis.geos import fromstr
-from django.test import TransactionTestCase
-from pika import URLParameters
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase as _TransactionTestCase
+from PIL import Image
 from rest_framework.test import APIClient
+from tornado.gen import sleep
+from tornado.ioloop import IOLoop
+from ujson import loads
+
+from api import broker, middleware, models, parsers, renderers, tasks
+from api.management.commands import websockets
+
 
-from api import middleware, models
+class TransactionTestCase(_TransactionTestCase):
 
-from settings import BROKER
+    def _pre_setup(self):
+        super(TransactionTestCase, self)._pre_setup()
+        cache.clear()
+
+
+def has_webp():
+    Image.init()
+    return 'WEBP' in Image.SAVE
 
 
 class Versions(TransactionTestCase):
@@ -78,6 +108,9 @@ class Blocks(TransactionTestCase):
         assert response.data[0]['user']['id'] == self.user_2.id
         assert response.status_code == 200
 
+        assert models.get_blocked_ids(self.user_1.id) == set([self.user_2.id])
+        assert models.get_blocked_ids(self.user_2.id) == set([self.user_1.id])
+
         response = self.client.post(
             '/api/tellcards/',
             {
@@ -130,6 +163,60 @@ class Blocks(TransactionTestCase):
         assert response.data == []
         assert response.status_code == 200
 
+        assert models.get_blocked_ids(self.user_1.id) == set()
+
+    def test_b(self):
+        user = middleware.mixer.blend('api.User')
+        middleware.mixer.blend('api.Block', user_source=self.user_1, user_destination=self.user_2)
+        middleware.mixer.blend('api.Block', user_source=self.user_1, user_destination=user)
+
+        response = self.client.get('/api/blocks/', format='json')
+        assert len(response.data) == 2
+        assert response.status_code == 200
+
+        response = self.client.get('/api/blocks/', {'limit': 1}, format='json')
+        assert len(response.data) == 1
+        assert response.data[0]['user']['id'] == user.id
+        assert response.status_code == 200
+
+        response = self.client.get('/api/blocks/', {'max_id': response.data[0]['id']}, format='json')
+        assert len(response.data) == 1
+        assert response.data[0]['user']['id'] == self.user_2.id
+        assert response.status_code == 200
+
+        response = self.client.get('/api/blocks/', {'limit': 0}, format='json')
+        assert response.status_code == 400
+
+
+class Broker(TransactionTestCase):
+
+    def setUp(self):
+        broker.purge('api.management.commands.websockets')
+
+    def test_a(self):
+        broker.send_task(
+            'api.management.commands.websockets',
+            (
+                {
+                    'subject': 'profile',
+                    'body': 1,
+                },
+            ),
+            queue='api.management.commands.websockets',
+            routing_key='api.management.commands.websockets',
+            serializer='json',
+        )
+        assert broker.get_size('api.management.commands.websockets') == 1
+
+        messages = broker.get_messages('api.management.commands.websockets')
+        assert len(messages) == 1
+        assert loads(messages[0])['args'][0] == {
+            'subject': 'profile',
+            'body': 1,
+        }
+
+        assert broker.get_size('api.management.commands.websockets') == 0
+
 
 class Categories(TransactionTestCase):
 
@@ -148,6 +235,37 @@ class Categories(TransactionTestCase):
         assert sum([category['position'] for category in response.data]) == 55
         assert response.status_code == 200
 
+        etag = response['ETag']
+
+        response = self.client.get('/api/categories/', format='json', HTTP_IF_NONE_MATCH=etag)
+        assert response['ETag'] == etag
+        assert response.status_code == 304
+
+        middleware.mixer.blend('api.Category', position=None)
+
+        response = self.client.get('/api/categories/', format='json', HTTP_IF_NONE_MATCH=etag)
+        assert len(response.data) == 11
+        assert response['ETag'] != etag
+        assert response.status_code == 200
+
+    def test_b(self):
+        response = self.client.get('/api/categories/', format='json')
+        assert '\n' not in response.content
+        assert response.status_code == 200
+
+        etag = response['ETag']
+
+        response = self.client.get('/api/categories/', HTTP_ACCEPT='application/json; indent=4')
+        assert len(loads(response.content)) == 10
+        assert '\n    ' in response.content
+        assert not response.has_header('ETag')
+        assert response.status_code == 200
+
+        response = self.client.get('/api/categories/', format='json')
+        assert '\n' not in response.content
+        assert response['ETag'] == etag
+        assert response.status_code == 200
+
 
 class Deauthenticate(TransactionTestCase):
 
@@ -544,6 +662,36 @@ class DevicesGCM(TransactionTestCase):
         assert response.status_code == 200
 
 
+class Emails(TransactionTestCase):
+
+    def setUp(self):
+        self.ses = SES()
+        tasks.connections.ses = self.ses
+        tasks.quotas.update({
+            'rate': 20.0,
+            'timestamp': 0.0,
+        })
+
+    def tearDown(self):
+        tasks.connections.__dict__.clear()
+        tasks.quotas.clear()
+
+    def test_a(self):
+        users = middleware.mixer.cycle(3).blend('api.User')
+        with self.settings(AWS_SES=True):
+            counts = tasks.send_emails(
+                [(user.id, 'verify',) for user in users] + [(0, 'verify',), (users[0].id, 'unknown',)],
+            )
+        assert counts == {
+            'failed': 0,
+            'sent': 3,
+            'skipped': 2,
+        }
+        assert sorted(email[2] for email in self.ses.emails) == sorted([user.email] for user in users)
+        timestamps = [email[0] for email in self.ses.emails]
+        assert all(b - a >= 0.045 for a, b in zip(timestamps, timestamps[1:]))
+
+
 class Home(TransactionTestCase):
 
     def setUp(self):
@@ -715,6 +863,66 @@ class Home(TransactionTestCase):
         assert len(response.data) == count
         assert response.status_code == 200
 
+    def test_d(self):
+        tellzone = middleware.mixer.blend('api.Tellzone', user=None, type=None, status=None)
+        tellzone.point = get_point()
+        tellzone.save()
+
+        user = middleware.mixer.blend('api.User')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=get_header(user.token))
+
+        dictionary = {
+            'tellzone_id': tellzone.id,
+            'point': {
+                'latitude': 1.00,
+                'longitude': 1.00,
+            },
+            'accuracies_horizontal': 1.00,
+            'accuracies_vertical': 1.00,
+            'is_casting': True,
+        }
+
+        response = self.client.post('/api/radar/', dictionary, format='json')
+        assert response.status_code == 200
+
+        dictionary = {
+            'latitude': 1.00,
+            'longitude': 1.00,
+            'dummy': 'No',
+        }
+
+        response = self.client.get('/api/home/tellzones/', dictionary, format='json')
+        assert len(response.data) == 1
+        assert response.status_code == 200
+
+        etag = response['ETag']
+
+        response = self.client.get('/api/home/tellzones/', dictionary, format='json', HTTP_IF_NONE_MATCH=etag)
+        assert response['ETag'] == etag
+        assert response.status_code == 304
+
+        response = client.post(
+            '/api/radar/',
+            {
+                'tellzone_id': tellzone.id,
+                'point': {
+                    'latitude': 1.00,
+                    'longitude': 1.00,
+                },
+                'accuracies_horizontal': 1.00,
+                'accuracies_vertical': 1.00,
+                'is_casting': True,
+            },
+            format='json',
+        )
+        assert response.status_code == 200
+
+        response = self.client.get('/api/home/tellzones/', dictionary, format='json', HTTP_IF_NONE_MATCH=etag)
+        assert len(response.data) == 1
+        assert response['ETag'] != etag
+        assert response.status_code == 200
+
 
 class MasterTells(TransactionTestCase):
 
@@ -1049,6 +1257,25 @@ class MasterTells(TransactionTestCase):
         assert len(response.data) == 1
         assert response.status_code == 200
 
+    def test_c(self):
+        for master_tell in middleware.mixer.cycle(2).blend(
+            'api.MasterTell', created_by=self.user_2, owned_by=self.user_2, category=self.category,
+        ):
+            middleware.mixer.blend(
+                'api.MasterTellTellzone', master_tell=master_tell, tellzone=self.tellzone, status='Published',
+            )
+
+        master_tells = models.get_master_tells(self.user_1.id, 0, [(self.tellzone.id, 1.00, 1.00,)], 0)
+        assert len(master_tells) == 2
+        assert master_tells[0]['created_by'] == master_tells[0]['owned_by']
+        assert master_tells[0]['created_by'] is not master_tells[0]['owned_by']
+        assert master_tells[0]['owned_by'] is not master_tells[1]['owned_by']
+        assert master_tells[0]['category'] is not master_tells[1]['category']
+
+        master_tells[0]['owned_by']['first_name'] = None
+        assert master_tells[0]['created_by']['first_name'] == self.user_2.first_name
+        assert master_tells[1]['owned_by']['first_name'] == self.user_2.first_name
+
 
 class Messages(TransactionTestCase):
 
@@ -1675,6 +1902,16 @@ class Notifications(TransactionTestCase):
         assert len(response.data) == 0
         assert response.status_code == 200
 
+        etag = response['ETag']
+
+        response = self.client_1.get('/api/notifications/', format='json', HTTP_IF_NONE_MATCH=etag)
+        assert response['ETag'] == etag
+        assert response.status_code == 304
+
+        response = self.client_2.get('/api/notifications/', format='json', HTTP_IF_NONE_MATCH=etag)
+        assert response['ETag'] != etag
+        assert response.status_code == 200
+
         data = []
 
         response = self.client_2.post(
@@ -1688,7 +1925,7 @@ class Notifications(TransactionTestCase):
         )
         assert response.status_code == 201
 
-        response = self.client_1.get('/api/notifications/', format='json')
+        response = self.client_1.get('/api/notifications/', format='json', HTTP_IF_NONE_MATCH=etag)
         assert len(response.data) == 1
         assert response.data[0]['type'] == 'A'
         assert response.data[0]['status'] == 'Unread'
@@ -1956,6 +2193,39 @@ class Posts(TransactionTestCase):
         assert response.data == {}
         assert response.status_code == 200
 
+    def test_b(self):
+        post_1 = middleware.mixer.blend(
+            'api.Post', user=self.user_1, category=self.category, title='Bicycles', contents='Repairs',
+        )
+        post_2 = middleware.mixer.blend(
+            'api.Post', user=self.user_1, category=self.category, title='Repairs', contents='Bicycles and cars',
+        )
+        middleware.mixer.blend('api.Post', user=self.user_1, category=self.category, title='Cars', contents='Cars')
+        middleware.mixer.blend('api.PostTellzone', post=post_2, tellzone=self.tellzone)
+
+        response = self.client_1.get('/api/posts/search/', {'keywords': 'bicycle'}, format='json')
+        assert [post['id'] for post in response.data] == [post_1.id, post_2.id]
+        assert response.status_code == 200
+
+        response = self.client_1.get('/api/posts/search/', {'keywords': 'repair bicyc'}, format='json')
+        assert len(response.data) == 2
+        assert response.status_code == 200
+
+        response = self.client_1.get('/api/posts/search/', {'keywords': 'bicycles', 'limit': 1}, format='json')
+        assert [post['id'] for post in response.data] == [post_1.id]
+        assert response.status_code == 200
+
+        response = self.client_1.get(
+            '/api/posts/search/',
+            {
+                'keywords': 'bicycles',
+                'tellzone_ids': str(self.tellzone.id),
+            },
+            format='json',
+        )
+        assert [post['id'] for post in response.data] == [post_2.id]
+        assert response.status_code == 200
+
 
 class Profiles(TransactionTestCase):
 
@@ -2146,6 +2416,174 @@ class RecommendedTells(TransactionTestCase):
             assert response.status_code == 200
 
 
+class Renderers(TransactionTestCase):
+
+    def test_a(self):
+        contents = renderers.Renderer().render({
+            'datetime': datetime(2015, 1, 1, 12, 30),
+            'decimal': Decimal('1.5'),
+            'point': fromstr('POINT(1 2)'),
+            'items': (1, 'Two', None,),
+        })
+        assert parsers.Parser().parse(BytesIO(contents)) == {
+            'datetime': '2015-01-01T12:30:00.000000',
+            'decimal': 1.5,
+            'point': {
+                'type': 'Point',
+                'coordinates': [1, 2],
+            },
+            'items': [1, 'Two', None],
+        }
+
+        assert renderers.Renderer().render(None) == ''
+
+    def test_b(self):
+        dictionary = OrderedDict([('z', 1,), ('a', [True, 'Two', None],), ('m', OrderedDict([('y', 1.5,)]),)])
+        assert renderers.get_value(dictionary) is dictionary
+        assert loads(renderers.Renderer().render(dictionary)) == dictionary
+
+        value = renderers.get_value(OrderedDict([('z', [1, Decimal('1.5')],), ('a', 'A',)]))
+        assert value == {
+            'z': [1, 1.5],
+            'a': 'A',
+        }
+
+    def test_c(self):
+        dictionary = {
+            'datetime': datetime(2015, 1, 1, 12, 30),
+            'items': [1, 'Two', None],
+        }
+        contents = renderers.Renderer().render(dictionary, 'application/json')
+        assert '\n' not in contents
+        assert loads(contents) == {
+            'datetime': '2015-01-01T12:30:00.000000',
+            'items': [1, 'Two', None],
+        }
+
+        contents = renderers.Renderer().render(dictionary, 'application/json; indent=4')
+        assert '\n    "' in contents
+        assert loads(contents) == {
+            'datetime': '2015-01-01T12:30:00.000000',
+            'items': [1, 'Two', None],
+        }
+
+
+class Renditions(TransactionTestCase):
+
+    def setUp(self):
+        self.user = middleware.mixer.blend('api.User')
+
+        for prefix in ['large', 'small']:
+            for format in ['jpeg', 'webp']:
+                middleware.mixer.blend(
+                    'api.Rendition',
+                    source='1.png',
+                    name='{prefix:s}_1.png.{format:s}'.format(prefix=prefix, format=format),
+                    prefix=prefix,
+                    format=format,
+                )
+        middleware.mixer.blend('api.Rendition', source='2.png', name='large_2.png.webp', prefix='large', format='webp')
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=get_header(self.user.token))
+
+    def test_a(self):
+        response = self.client.get(
+            '/api/renditions/',
+            {
+                'names': 'https://example.com/1.png,3.png',
+            },
+            format='json',
+        )
+        assert len(response.data) == 4
+        assert all(rendition['source'] == '1.png' for rendition in response.data)
+        assert response.status_code == 200
+
+        response = self.client.get('/api/renditions/', format='json')
+        assert response.status_code == 400
+
+
+class Search(TransactionTestCase):
+
+    def setUp(self):
+        self.user_1 = middleware.mixer.blend('api.User')
+        self.client_1 = APIClient()
+        self.client_1.credentials(HTTP_AUTHORIZATION=get_header(self.user_1.token))
+
+        self.user_2 = middleware.mixer.blend(
+            'api.User', first_name='Jonathan', last_name='Livingston', settings=models.SETTINGS_DEFAULT,
+        )
+
+        self.user_3 = middleware.mixer.blend(
+            'api.User',
+            first_name='Richard',
+            last_name='Livingstone',
+            settings=models.SETTINGS_DEFAULT | models.SETTINGS['show_last_name'],
+        )
+
+    def test_a(self):
+        response = self.client_1.get('/api/users/search/', {'keywords': 'livingston'}, format='json')
+        assert [user['id'] for user in response.data] == [self.user_3.id]
+        assert response.status_code == 200
+
+        response = self.client_1.get('/api/users/search/', {'keywords': 'jonathon'}, format='json')
+        assert [user['id'] for user in response.data] == [self.user_2.id]
+        assert response.status_code == 200
+
+        middleware.mixer.blend('api.Block', user_source=self.user_1, user_destination=self.user_3)
+
+        response = self.client_1.get('/api/users/search/', {'keywords': 'livingston'}, format='json')
+        assert len(response.data) == 0
+        assert response.status_code == 200
+
+        response = self.client_1.get('/api/users/search/', format='json')
+        assert response.status_code == 400
+
+    def test_b(self):
+        tellzone_1 = middleware.mixer.blend('api.Tellzone', user=None, type=None, status=None, name='Central Park')
+        tellzone_2 = middleware.mixer.blend('api.Tellzone', user=None, type=None, status=None, name='Park Avenue')
+
+        response = self.client_1.get('/api/tellzones/search/', {'keywords': 'park'}, format='json')
+        assert sorted(tellzone['id'] for tellzone in response.data) == [tellzone_1.id, tellzone_2.id]
+        assert response.status_code == 200
+
+        response = self.client_1.get('/api/tellzones/search/', {'keywords': 'entral'}, format='json')
+        assert [tellzone['id'] for tellzone in response.data] == [tellzone_1.id]
+        assert response.status_code == 200
+
+        response = self.client_1.get('/api/tellzones/search/', {'keywords': 'park', 'limit': 1}, format='json')
+        assert len(response.data) == 1
+        assert response.status_code == 200
+
+        response = self.client_1.get('/api/tellzones/search/', {'keywords': '%'}, format='json')
+        assert len(response.data) == 0
+        assert response.status_code == 200
+
+    def test_c(self):
+        category = middleware.mixer.blend('api.Category')
+
+        master_tell = middleware.mixer.blend(
+            'api.MasterTell',
+            created_by=self.user_2,
+            owned_by=self.user_2,
+            category=category,
+            contents='Bicycle repairs',
+            is_visible=True,
+        )
+        middleware.mixer.blend(
+            'api.MasterTell',
+            created_by=self.user_2,
+            owned_by=self.user_2,
+            category=category,
+            contents='Bicycle sales',
+            is_visible=False,
+        )
+
+        response = self.client_1.get('/api/master-tells/search/', {'keywords': 'bicycle'}, format='json')
+        assert [item['id'] for item in response.data] == [master_tell.id]
+        assert response.status_code == 200
+
+
 class SharesUsers(TransactionTestCase):
 
     def setUp(self):
@@ -2220,25 +2658,11 @@ class SharesUsers(TransactionTestCase):
 
 class Signals(TransactionTestCase):
 
-    def get_celery_connection(self):
-        parameters = URLParameters(BROKER)
-        return client_0_8.Connection(
-            host='{hostname:s}:{port:d}'.format(hostname=parameters.host, port=parameters.port),
-            userid=parameters.credentials.username,
-            password=parameters.credentials.password,
-            virtual_host=parameters.virtual_host,
-            insist=False,
-        ).channel()
-
     def get_celery_tasks(self):
-        _, backlog, _ = self.get_celery_connection().queue_declare(
-            queue='api.management.commands.websockets',
-            passive=True,
-        )
-        return backlog
+        return broker.get_size('api.management.commands.websockets')
 
     def reset_celery_tasks(self):
-        self.get_celery_connection().queue_purge('api.management.commands.websockets')
+        broker.purge('api.management.commands.websockets')
 
     def setUp(self):
         self.user_1 = middleware.mixer.blend('api.User')
@@ -2450,6 +2874,18 @@ class Signals(TransactionTestCase):
         assert self.get_celery_tasks() == 2
         self.reset_celery_tasks()
 
+        settings = models.get_settings(
+            {
+                'show_email': True,
+                'show_phone': False,
+                'show_photos': True,
+            },
+            models.SETTINGS_DEFAULT,
+        )
+        assert settings & models.SETTINGS['notifications_messages']
+        assert settings & models.SETTINGS['show_email']
+        assert not settings & models.SETTINGS['show_phone']
+
     def test_h(self):
         response = self.client_1.post(
             '/api/radar/',
@@ -2760,6 +3196,43 @@ class Tellcards(TransactionTestCase):
         response = self.client_2.get('/api/users/{id:d}/profile/'.format(id=self.user_1.id), format='json')
         assert response.data['is_tellcard'] is False
 
+    def test_b(self):
+        user = middleware.mixer.blend('api.User')
+
+        response = self.client_1.post(
+            '/api/tellcards/',
+            {
+                'user_destination_id': self.user_2.id,
+                'action': 'Save',
+            },
+            format='json',
+        )
+        assert response.status_code == 201
+
+        dictionary = {
+            'type': 'Source',
+        }
+
+        response = self.client_1.get('/api/tellcards/', dictionary, format='json')
+        assert len(response.data) == 1
+        assert response.status_code == 200
+
+        etag = response['ETag']
+
+        user.first_name = 'First Name'
+        user.save()
+
+        response = self.client_1.get('/api/tellcards/', dictionary, format='json', HTTP_IF_NONE_MATCH=etag)
+        assert response['ETag'] == etag
+        assert response.status_code == 304
+
+        middleware.mixer.blend('api.UserStatus', user=self.user_2)
+
+        response = self.client_1.get('/api/tellcards/', dictionary, format='json', HTTP_IF_NONE_MATCH=etag)
+        assert len(response.data) == 1
+        assert response['ETag'] != etag
+        assert response.status_code == 200
+
     def get(self, client, count_1, count_2):
         response = client.get(
             '/api/tellcards/',
@@ -3059,6 +3532,14 @@ class Tellzones(TransactionTestCase):
         assert len(response.data) == 1
         assert response.status_code == 200
 
+        assert len(self.tellzone.get_master_tells(self.user.id)) == 25
+        middleware.mixer.blend(
+            'api.Block',
+            user_source=models.MasterTell.objects.get_queryset().first().owned_by,
+            user_destination=self.user,
+        )
+        assert len(self.tellzone.get_master_tells(self.user.id)) == 20
+
     def test_c(self):
         response = self.client.get(
             '/api/tellzones/{id:d}/master-tells/'.format(id=models.Tellzone.objects.get_queryset().first().id),
@@ -3156,6 +3637,207 @@ class TellzonesStatuses(TransactionTestCase):
         assert response.status_code == 200
 
 
+class Thumbnails(TransactionTestCase):
+
+    def setUp(self):
+        self.bucket = Bucket()
+        tasks.connections.bucket = self.bucket
+        tasks.pools['threads'] = ThreadPool(
+            tasks.THREADS, initializer=setattr, initargs=(tasks.connections, 'bucket', self.bucket,),
+        )
+
+    def tearDown(self):
+        tasks.pools.pop('threads').terminate()
+        tasks.connections.__dict__.clear()
+
+    def test_a(self):
+        source = BytesIO(tasks.get_bytes(Image.new('RGB', (800, 400), (255, 0, 0)), 'jpeg', tasks.QUALITY))
+        items = [('small', 160, None,), ('large', 640, None,), ('huge', 1600, None,)]
+
+        destinations = list(tasks.get_destinations(source, '1.jpg', 'image/*', items))
+        assert [destination[0] for destination in destinations] == ['huge', 'large', 'small']
+        assert [Image.open(BytesIO(destination[3])).size for destination in destinations] == [
+            (800, 400),
+            (640, 320),
+            (160, 80),
+        ]
+
+        assert list(tasks.get_destinations(source, '1.mp4', 'video/mp4', items)) == []
+
+    def test_b(self):
+        image = get_noise(200, 200)
+        sizes = dict(
+            (quality, len(tasks.get_bytes(image, 'jpeg', quality)),) for quality in range(5, tasks.QUALITY, 5)
+        )
+        bytes = (sizes[5] + sizes[max(sizes)]) // 2
+        quality = max(quality for quality in sizes if sizes[quality] <= bytes)
+
+        contents = tasks.get_contents(image, 'jpeg', bytes)
+        assert len(contents) <= bytes
+        assert contents == tasks.get_bytes(image, 'jpeg', quality)
+
+        assert tasks.get_contents(image, 'jpeg', None) == tasks.get_bytes(image, 'jpeg', tasks.QUALITY)
+        assert tasks.get_contents(image, 'jpeg', 1) == tasks.get_bytes(image, 'jpeg', 5)
+        assert tasks.get_contents(image, 'png', 1) == tasks.get_bytes(image, 'png', tasks.QUALITY)
+
+    def test_c(self):
+        maximum_part = tasks.MAXIMUM_PART
+        tasks.MAXIMUM_PART = 4
+        try:
+            tasks.set_contents(self.bucket, 'small', '1234')
+            tasks.set_contents(self.bucket, 'large', '123456789')
+        finally:
+            tasks.MAXIMUM_PART = maximum_part
+        assert self.bucket.keys == {
+            'small': '1234',
+            'large': '123456789',
+        }
+        assert self.bucket.uploads == 1
+
+    def test_d(self):
+        tasks.connections.__dict__.clear()
+        with self.settings(
+            AWS_S3={
+                'host': 'localhost',
+                'port': 4567,
+                'is_secure': False,
+                'calling_format': 'boto.s3.connection.OrdinaryCallingFormat',
+            },
+        ):
+            bucket = tasks.get_bucket()
+        assert bucket.connection.host == 'localhost'
+        assert bucket.connection.port == 4567
+        assert bucket.connection.is_secure is False
+        assert tasks.get_bucket() is bucket
+
+        tasks.connections.bucket = self.bucket
+        self.bucket.keys['1.jpg'] = tasks.get_bytes(Image.new('RGB', (800, 400), (255, 0, 0)), 'jpeg', tasks.QUALITY)
+        tasks.thumbnails_3('https://example.com/1.jpg', 'image/*', [('large', 640, None,), ('small', 160, None,)])
+        assert Image.open(BytesIO(self.bucket.keys['large_1.jpg'])).size == (640, 320)
+        assert Image.open(BytesIO(self.bucket.keys['small_1.jpg'])).size == (160, 80)
+        assert self.bucket.keys['thumbnails/{etag:s}_160_jpeg_0'.format(
+            etag=md5(self.bucket.keys['1.jpg']).hexdigest(),
+        )] == self.bucket.keys['small_1.jpg']
+
+    def test_e(self):
+        self.bucket.keys['1.jpg'] = 'contents'
+        self.bucket.keys['2.jpg'] = 'contents'
+        cache = 'thumbnails/{etag:s}_640_jpeg_0'.format(etag=md5('contents').hexdigest())
+        assert tasks.get_cache(self.bucket.get_key('1.jpg'), '1.jpg', 'image/*', 640, None) == cache
+        assert tasks.get_cache(self.bucket.get_key('1.jpg'), '1.jpg', 'image/*', 640, 1024) == cache[:-1] + '1024'
+        assert tasks.get_cache(self.bucket.new_key('3.jpg'), '3.jpg', 'image/*', 640, None) is None
+        assert tasks.get_caches(cache, '1.jpg', 'image/*') == [('webp', cache + '.webp',)]
+        assert tasks.get_caches(None, '1.jpg', 'image/*') == []
+
+        self.bucket.keys[cache] = 'large'
+        self.bucket.keys[cache + '.webp'] = 'webp'
+        tasks.thumbnails_3('2.jpg', 'image/*', [('large', 640, None,)])
+        assert self.bucket.keys['large_2.jpg'] == 'large'
+        assert self.bucket.keys['large_2.jpg.webp'] == 'webp'
+        rendition = models.Rendition.objects.get_queryset().get(name='large_2.jpg.webp')
+        assert rendition.source == '2.jpg'
+        assert rendition.prefix == 'large'
+        assert rendition.format == 'webp'
+        assert rendition.bytes == 4
+
+    def test_f(self):
+        image = get_noise(100, 100)
+        contents = tasks.get_bytes(image, 'png', tasks.QUALITY)
+        assert tasks.get_alternate(image, 'png', None, '') is None
+        assert tasks.get_alternate(image, 'png', 1, contents) is None
+        alternate = tasks.get_alternate(image, 'png', None, contents)
+        assert alternate[0] in tasks.FORMATS
+        assert len(alternate[1]) < len(contents)
+        assert len(alternate[1]) <= len(tasks.get_bytes(image, 'jpeg', tasks.QUALITY))
+
+    @skipUnless(has_webp(), 'Pillow is built without WebP support')
+    def test_i(self):
+        image = get_noise(100, 100)
+        image.putalpha(128)
+        contents = tasks.get_bytes(image, 'png', tasks.QUALITY)
+        alternate = tasks.get_alternate(image, 'png', None, contents)
+        assert alternate[0] == 'webp'
+        assert len(alternate[1]) < len(contents)
+
+    def test_g(self):
+        countdowns = []
+        messages = []
+
+        def retry(countdown=None, **kwargs):
+            countdowns.append(countdown)
+            return Retry()
+
+        send_task = broker.send_task
+        broker.send_task = lambda *args, **kwargs: messages.append(args)
+        tasks.thumbnails_1.retry = retry
+        try:
+            for retries in range(tasks.MAXIMUM_RETRIES + 1):
+                tasks.thumbnails_1.apply(args=('User', 0,), retries=retries)
+            user = middleware.mixer.blend('api.User', photo_original='1.jpg', photo_preview='2.jpg')
+            del messages[:]
+            tasks.thumbnails_1.apply(args=('User', user.id,))
+        finally:
+            broker.send_task = send_task
+            del tasks.thumbnails_1.retry
+        assert countdowns == [2 ** retries for retries in range(tasks.MAXIMUM_RETRIES)]
+        assert [message[0] for message in messages] == ['api.tasks.thumbnails_3', 'api.tasks.thumbnails_3']
+        assert [message[1][0] for message in messages] == ['1.jpg', '2.jpg']
+
+    def test_h(self):
+        directory = mkdtemp()
+        progress = join(directory, 'thumbnails.json')
+        messages = []
+
+        send_task = broker.send_task
+        get_size = broker.get_size
+        broker.send_task = lambda *args, **kwargs: messages.append(args)
+        broker.get_size = lambda queue: 0
+        try:
+            users = [
+                middleware.mixer.blend('api.User', photo_original='{id:d}.jpg'.format(id=id), photo_preview=None)
+                for id in range(3)
+            ]
+            self.bucket.keys['large_0.jpg'] = b''
+            self.bucket.keys['small_0.jpg'] = b''
+            del messages[:]
+
+            stdout = StringIO()
+            call_command('thumbnails', 'User', dry_run=True, progress=progress, stdout=stdout)
+            assert stdout.getvalue() == 'User: 3 instances, 4 missing renditions, 2 tasks\n'
+            assert messages == []
+            assert not exists(progress)
+
+            call_command('thumbnails', 'User', batch=2, progress=progress, stdout=StringIO())
+            assert [message[0] for message in messages] == ['api.tasks.thumbnails_3', 'api.tasks.thumbnails_3']
+            assert [message[1][0] for message in messages] == ['1.jpg', '2.jpg']
+            with open(progress) as resource:
+                assert loads(resource.read()) == {
+                    'User': users[-1].id,
+                }
+
+            middleware.mixer.blend('api.User', photo_original='3.jpg', photo_preview=None)
+            del messages[:]
+
+            stdout = StringIO()
+            call_command('thumbnails', 'User', progress=progress, stdout=stdout)
+            assert stdout.getvalue() == 'User: 1 instances, 2 missing renditions, 1 tasks\n'
+            assert [message[1][0] for message in messages] == ['3.jpg']
+
+            del messages[:]
+
+            stdout = StringIO()
+            call_command('thumbnails', progress=progress, reset=True, stdout=stdout)
+            assert len(stdout.getvalue().splitlines()) == len(tasks.TABLES)
+            assert [message[1][0] for message in messages] == ['1.jpg', '2.jpg', '3.jpg']
+
+            with self.assertRaises(CommandError):
+                call_command('thumbnails', 'Users', progress=progress, stdout=StringIO())
+        finally:
+            broker.send_task = send_task
+            broker.get_size = get_size
+            rmtree(directory)
+
+
 class Users(TransactionTestCase):
 
     def setUp(self):
@@ -3408,9 +4090,170 @@ class Others(TransactionTestCase):
         assert response.status_code == 200
 
 
+class WebSockets(TransactionTestCase):
+
+    def setUp(self):
+        websockets.set_io_loop(0.0)
+
+    def test_a(self):
+        websockets.set_event('WebSocket', 'messages', 0.02)
+        websockets.set_event('WebSocket', 'messages', 2.0)
+
+        metrics = websockets.get_metrics()
+        assert sorted(metrics.keys()) == ['buffers', 'clients', 'events', 'lag', 'stalls', 'uptime', 'users']
+        assert metrics['clients'] == 0
+        assert metrics['users'] == {
+            'sockets': 0,
+            'ids': 0,
+        }
+        assert metrics['buffers'] == {
+            'bytes': 0,
+            'maximum': 0,
+        }
+        assert metrics['stalls']['count'] == 0
+        assert metrics['events']['WebSocket']['messages']['count'] == 2
+        assert metrics['events']['WebSocket']['messages']['histogram']['<=0.050'] == 1
+        assert metrics['events']['WebSocket']['messages']['histogram']['<=5.000'] == 1
+        assert metrics['events']['WebSocket']['messages']['histogram']['+Inf'] == 0
+
+    def test_b(self):
+        tornado_connection = websockets.TornadoConnection
+        websockets.TornadoConnection = lambda **kwargs: None
+        try:
+            rabbitmq = websockets.RabbitMQ.__new__(websockets.RabbitMQ)
+            websockets.RabbitMQ.__init__(rabbitmq)
+        finally:
+            websockets.TornadoConnection = tornado_connection
+        lag = rabbitmq.lag
+
+        rabbitmq.channel = Channel()
+        rabbitmq.on_channel_open(rabbitmq.channel)
+        rabbitmq.on_channel_queue_bind(None)
+        rabbitmq.on_channel_queue_bind(None)
+        assert rabbitmq.lag is lag
+        assert rabbitmq.lag.is_running()
+        assert rabbitmq.channel.consumes == 2
+
+        for callback in rabbitmq.channel.callbacks:
+            callback(rabbitmq.channel, 200, 'Normal shutdown')
+        assert not rabbitmq.lag.is_running()
+
+    def test_c(self):
+        messages = []
+
+        capture_message = websockets.client.captureMessage
+        websockets.client.captureMessage = lambda message, **kwargs: messages.append((message, kwargs,))
+        try:
+            websockets.on_stall(None, currentframe())
+            assert messages == []
+            IOLoop.current().run_sync(lambda: sleep(0.01))
+        finally:
+            websockets.client.captureMessage = capture_message
+        assert len(messages) == 1
+        assert messages[0][0] == 'Stall'
+        assert 'in test_c' in messages[0][1]['extra']['stack']
+
+
+class Bucket(object):
+
+    def __init__(self):
+        self.keys = {}
+        self.name = 'tests'
+        self.uploads = 0
+
+    def copy_key(self, new_key_name, src_bucket_name, src_key_name):
+        self.keys[new_key_name] = self.keys[src_key_name]
+
+    def get_key(self, name):
+        if name not in self.keys:
+            return
+        return self.new_key(name)
+
+    def initiate_multipart_upload(self, name):
+        self.uploads += 1
+        return Upload(self, name)
+
+    def list(self, prefix=''):
+        return [self.new_key(name) for name in sorted(self.keys) if name.startswith(prefix)]
+
+    def new_key(self, name):
+        return Key(self, name)
+
+
+class Channel(object):
+
+    def __init__(self):
+        self.callbacks = []
+        self.consumes = 0
+        self.is_open = True
+
+    def add_on_close_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def basic_consume(self, *args, **kwargs):
+        self.consumes += 1
+
+    def basic_qos(self, *args, **kwargs):
+        pass
+
+    def exchange_declare(self, *args, **kwargs):
+        pass
+
+
+class Key(object):
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.etag = None
+        self.size = None
+        if name in bucket.keys:
+            self.etag = '"{etag:s}"'.format(etag=md5(bucket.keys[name]).hexdigest())
+            self.size = len(bucket.keys[name])
+
+    def get_contents_to_file(self, file):
+        file.write(self.bucket.keys[self.name])
+
+    def set_contents_from_file(self, file):
+        self.bucket.keys[self.name] = file.read()
+
+
+class SES(object):
+
+    def __init__(self):
+        self.emails = []
+
+    def send_email(self, source, subject, body, to_addresses):
+        self.emails.append((time(), subject, to_addresses,))
+
+
+class Upload(object):
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.parts = {}
+
+    def cancel_upload(self):
+        self.parts.clear()
+
+    def complete_upload(self):
+        self.bucket.keys[self.name] = ''.join(self.parts[number] for number in sorted(self.parts))
+
+    def upload_part_from_file(self, file, part_num):
+        self.parts[part_num] = file.read()
+
+
 def get_header(token):
     return 'Token {token:s}'.format(token=token)
 
 
+def get_noise(width, height):
+    random = Random(0)
+    return Image.frombytes(
+        'RGB', (width, height), str(bytearray(random.randint(0, 255) for _ in range(width * height * 3))),
+    )
+
+
 def get_point():
     return fromstr('POINT(1.00 1.00)')
@@ -7,7 +7,6 @@ from random import randint
 
 from arrow import get
 from bcrypt import gensalt, hashpw
-from celery import current_app
 from django.conf import settings
 from django.contrib import messages as messages_
 from django.contrib.gis.measure import D
@@ -25,6 +24,7 @@ from rest_framework.status import (
     HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN, HTTP_409_CONFLICT,
 )
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ViewSet
 from social.apps.django_app.default.models import DjangoStorage
 from social.backends.linkedin import LinkedinOAuth2
@@ -32,7 +32,7 @@ from social.backends.utils import get_backend
 from social.strategies.django_strategy import DjangoStrategy
 from ujson import loads
 
-from api import middleware, models, serializers
+from api import assembler, broker, caches, middleware, models, search, serializers
 
 
 def do_auth(self, access_token, *args, **kwargs):
@@ -70,7 +70,23 @@ class Blocks(ViewSet):
         Input
         =====
 
-        + N/A
+        + since_id
+            - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+              (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+            - Type: integer
+            - Status: optional
+
+        + max_id
+            - Type: integer
+            - Status: optional
+
+        + limit
+            - Type: integer (default = 100; maximum = 1000)
+            - Status: optional
+
+        + offset
+            - Type: integer (default = 0)
+            - Status: optional
 
         Output
         ======
@@ -78,6 +94,25 @@ class Blocks(ViewSet):
         (see below; "Response Class" -> "Model Schema")
         </pre>
         ---
+        omit_parameters:
+            - form
+        parameters:
+            - name: since_id
+              paramType: query
+              required: false
+              type: integer
+            - name: max_id
+              paramType: query
+              required: false
+              type: integer
+            - name: limit
+              paramType: query
+              required: false
+              type: integer
+            - name: offset
+              paramType: query
+              required: false
+              type: integer
         response_serializer: api.serializers.BlocksResponse
         responseMessages:
             - code: 400
@@ -85,7 +120,10 @@ class Blocks(ViewSet):
         '''
         return Response(
             data=serializers.BlocksResponse(
-                models.Block.objects.get_queryset().filter(user_source_id=self.request.user.id),
+                get_paginated(
+                    request,
+                    models.Block.objects.get_queryset().filter(user_source_id=self.request.user.id),
+                ),
                 context={
                     'request': request,
                 },
@@ -453,6 +491,24 @@ class MasterTells(ViewSet):
             - Type: datetime
             - Status: optional
 
+        + since_id
+            - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+              (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+            - Type: integer
+            - Status: optional
+
+        + max_id
+            - Type: integer
+            - Status: optional
+
+        + limit
+            - Type: integer (default = 100; maximum = 1000)
+            - Status: optional
+
+        + offset
+            - Type: integer (default = 0)
+            - Status: optional
+
         Output
         ======
 
@@ -470,6 +526,22 @@ class MasterTells(ViewSet):
               paramType: query
               required: false
               type: datetime
+            - name: since_id
+              paramType: query
+              required: false
+              type: integer
+            - name: max_id
+              paramType: query
+              required: false
+              type: integer
+            - name: limit
+              paramType: query
+              required: false
+              type: integer
+            - name: offset
+              paramType: query
+              required: false
+              type: integer
         response_serializer: api.serializers.MasterTellsGet1Response
         responseMessages:
             - code: 400
@@ -484,13 +556,16 @@ class MasterTells(ViewSet):
         serializer.is_valid(request.query_params)
         return Response(
             data=serializers.MasterTellsGet1Response(
-                self.get_queryset(
-                    inserted_at=serializer.validated_data[
-                        'inserted_at'
-                    ] if 'inserted_at' in serializer.validated_data else None,
-                    updated_at=serializer.validated_data[
-                        'updated_at'
-                    ] if 'updated_at' in serializer.validated_data else None,
+                get_paginated(
+                    request,
+                    self.get_queryset(
+                        inserted_at=serializer.validated_data[
+                            'inserted_at'
+                        ] if 'inserted_at' in serializer.validated_data else None,
+                        updated_at=serializer.validated_data[
+                            'updated_at'
+                        ] if 'updated_at' in serializer.validated_data else None,
+                    ),
                 ),
                 context={
                     'request': request,
@@ -914,6 +989,8 @@ class Messages(ViewSet):
               type: integer
         response_serializer: api.serializers.MessagesGetResponse
         responseMessages:
+            - code: 304
+              message: Not Modified (If-None-Match matches the ETag)
             - code: 400
               message: Invalid Input
         '''
@@ -924,22 +1001,14 @@ class Messages(ViewSet):
             data=request.query_params,
         )
         serializer.is_valid(request.query_params)
+        etag = caches.get_etag(
+            request, 'blocks:{user_id:d}', 'messages:{user_id:d}', *models.get_messages_versions(request.user.id)
+        )
+        response = caches.get_not_modified(request, etag)
+        if response:
+            return response
         messages = []
-        blocks = []
-        with closing(connection.cursor()) as cursor:
-            cursor.execute(
-                '''
-                SELECT user_source_id, user_destination_id
-                FROM api_blocks
-                WHERE user_source_id = %s OR user_destination_id = %s
-                ''',
-                (request.user.id, request.user.id,)
-            )
-            for record in cursor.fetchall():
-                if record[0] != request.user.id:
-                    blocks.append(record[0])
-                if record[1] != request.user.id:
-                    blocks.append(record[1])
+        blocks = list(models.get_blocked_ids(request.user.id) - set([request.user.id]))
         if serializer.validated_data.get('recent', True):
             for user in models.User.objects.get_queryset().exclude(id__in=[request.user.id] + blocks):
                 message = models.Message.objects.get_queryset().filter(
@@ -991,7 +1060,7 @@ class Messages(ViewSet):
                 pass
             for message in query.order_by('-id')[:limit]:
                 messages.append(message)
-        return Response(
+        response = Response(
             data=serializers.MessagesGetResponse(
                 messages,
                 context={
@@ -1001,6 +1070,8 @@ class Messages(ViewSet):
             ).data,
             status=HTTP_200_OK,
         )
+        response['ETag'] = etag
+        return response
 
     def post(self, request):
         '''
@@ -1126,7 +1197,7 @@ class Messages(ViewSet):
                 },
                 status=HTTP_400_BAD_REQUEST,
             )
-        if models.is_blocked(request.user.id, serializer.validated_data['user_destination_id']):
+        if serializer.validated_data['user_destination_id'] in models.get_blocked_ids(request.user.id):
             return Response(
                 data={
                     'error': ugettext_lazy('Invalid `user_destination_id`'),
@@ -1257,7 +1328,7 @@ class Messages(ViewSet):
         )
         serializer.is_valid(raise_exception=True)
         if 'user_source_is_hidden' in request.data or 'user_destination_is_hidden' in request.data:
-            current_app.send_task(
+            broker.send_task(
                 'api.tasks.push_notifications',
                 (
                     request.user.id,
@@ -1334,7 +1405,23 @@ class Networks(ViewSet):
         Input
         =====
 
-        + N/A
+        + since_id
+            - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+              (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+            - Type: integer
+            - Status: optional
+
+        + max_id
+            - Type: integer
+            - Status: optional
+
+        + limit
+            - Type: integer (default = 100; maximum = 1000)
+            - Status: optional
+
+        + offset
+            - Type: integer (default = 0)
+            - Status: optional
 
         Output
         ======
@@ -1342,6 +1429,25 @@ class Networks(ViewSet):
         (see below; "Response Class" -> "Model Schema")
         </pre>
         ---
+        omit_parameters:
+            - form
+        parameters:
+            - name: since_id
+              paramType: query
+              required: false
+              type: integer
+            - name: max_id
+              paramType: query
+              required: false
+              type: integer
+            - name: limit
+              paramType: query
+              required: false
+              type: integer
+            - name: offset
+              paramType: query
+              required: false
+              type: integer
         response_serializer: api.serializers.NetworksResponse
         responseMessages:
             - code: 400
@@ -1356,7 +1462,7 @@ class Networks(ViewSet):
         serializer.is_valid(request.query_params)
         return Response(
             data=serializers.NetworksResponse(
-                self.get_queryset(),
+                get_paginated(request, self.get_queryset()),
                 context={
                     'request': request,
                 },
@@ -1739,6 +1845,8 @@ class Notifications(ViewSet):
               type: integer
         response_serializer: api.serializers.NotificationsGetResponse
         responseMessages:
+            - code: 304
+              message: Not Modified (If-None-Match matches the ETag)
             - code: 400
               message: Invalid Input
         '''
@@ -1749,6 +1857,10 @@ class Notifications(ViewSet):
             data=request.query_params,
         )
         serializer.is_valid(request.query_params)
+        etag = caches.get_etag(request, 'notifications:{user_id:d}')
+        response = caches.get_not_modified(request, etag)
+        if response:
+            return response
         query = models.Notification.objects.get_queryset().filter(user_id=request.user.id)
         since_id = 0
         try:
@@ -1769,7 +1881,7 @@ class Notifications(ViewSet):
             limit = serializer.validated_data.get('limit', 100)
         except Exception:
             pass
-        return Response(
+        response = Response(
             data=serializers.NotificationsGetResponse(
                 query.order_by('-timestamp')[:limit],
                 context={
@@ -1779,6 +1891,8 @@ class Notifications(ViewSet):
             ).data,
             status=HTTP_200_OK,
         )
+        response['ETag'] = etag
+        return response
 
     def post(self, request, *args, **kwargs):
         '''
@@ -1864,9 +1978,30 @@ class Posts(ViewSet):
             - Status: optional
 
         + keywords
+            - Description: Full-text search over `title` and `contents` (every word must match; the last letters
+              of a word may be omitted). If supplied, the results are ordered by relevance and paginated with
+              `limit` and `offset` (`since_id` and `max_id` are ignored).
             - Type: string
             - Status: optional
 
+        + since_id
+            - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+              (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+            - Type: integer
+            - Status: optional
+
+        + max_id
+            - Type: integer
+            - Status: optional
+
+        + limit
+            - Type: integer (default = 100; maximum = 1000)
+            - Status: optional
+
+        + offset
+            - Type: integer (default = 0)
+            - Status: optional
+
         Output
         ======
 
@@ -1896,20 +2031,38 @@ class Posts(ViewSet):
               paramType: query
               required: false
               type: string
+            - name: since_id
+              paramType: query
+              required: false
+              type: integer
+            - name: max_id
+              paramType: query
+              required: false
+              type: integer
+            - name: limit
+              paramType: query
+              required: false
+              type: integer
+            - name: offset
+              paramType: query
+              required: false
+              type: integer
         response_serializer: api.serializers.PostsSearch
         responseMessages:
             - code: 400
               message: Invalid Input
         '''
+        keywords = request.query_params.get('keywords', None)
+        queryset = self.get_queryset(
+            user_ids=request.query_params.get('user_ids', None),
+            category_ids=request.query_params.get('category_ids', None),
+            network_ids=request.query_params.get('network_ids', None),
+            tellzone_ids=request.query_params.get('tellzone_ids', None),
+            keywords=keywords,
+        )
         return Response(
             data=serializers.PostsResponse(
-                self.get_queryset(
-                    user_ids=request.query_params.get('user_ids', None),
-                    category_ids=request.query_params.get('category_ids', None),
-                    network_ids=request.query_params.get('network_ids', None),
-                    tellzone_ids=request.query_params.get('tellzone_ids', None),
-                    keywords=request.query_params.get('keywords', None),
-                ),
+                get_ranked(request, queryset) if keywords else get_paginated(request, queryset),
                 context={
                     'request': request,
                 },
@@ -1926,7 +2079,23 @@ class Posts(ViewSet):
         Input
         =====
 
-        + N/A
+        + since_id
+            - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+              (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+            - Type: integer
+            - Status: optional
+
+        + max_id
+            - Type: integer
+            - Status: optional
+
+        + limit
+            - Type: integer (default = 100; maximum = 1000)
+            - Status: optional
+
+        + offset
+            - Type: integer (default = 0)
+            - Status: optional
 
         Output
         ======
@@ -1934,6 +2103,25 @@ class Posts(ViewSet):
         (see below; "Response Class" -> "Model Schema")
         </pre>
         ---
+        omit_parameters:
+            - form
+        parameters:
+            - name: since_id
+              paramType: query
+              required: false
+              type: integer
+            - name: max_id
+              paramType: query
+              required: false
+              type: integer
+            - name: limit
+              paramType: query
+              required: false
+              type: integer
+            - name: offset
+              paramType: query
+              required: false
+              type: integer
         response_serializer: api.serializers.PostsResponse
         responseMessages:
             - code: 400
@@ -1941,7 +2129,7 @@ class Posts(ViewSet):
         '''
         return Response(
             data=serializers.PostsResponse(
-                self.get_queryset(user_id=request.user.id),
+                get_paginated(request, self.get_queryset(user_id=request.user.id)),
                 context={
                     'request': request,
                 },
@@ -2363,33 +2551,41 @@ class Posts(ViewSet):
         if category_ids:
             queryset = queryset.filter(category_id__in=map(int, category_ids.split(',')))
         if network_ids:
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(
+            queryset = queryset.extra(
+                where=[
                     '''
-                    SELECT post_id
-                    FROM api_posts_tellzones
-                    WHERE tellzone_id IN (
-                        SELECT tellzone_id
-                        FROM api_networks_tellzones
-                        WHERE network_id IN %s
+                    EXISTS (
+                        SELECT 1
+                        FROM api_posts_tellzones
+                        INNER JOIN api_networks_tellzones
+                            ON api_networks_tellzones.tellzone_id = api_posts_tellzones.tellzone_id
+                        WHERE
+                            api_posts_tellzones.post_id = api_posts.id
+                            AND
+                            api_networks_tellzones.network_id = ANY(%s)
                     )
                     ''',
-                    (tuple(map(int, network_ids.split(','))),),
-                )
-                queryset = queryset.filter(id__in=[record[0] for record in cursor.fetchall()])
+                ],
+                params=(map(int, network_ids.split(',')),),
+            )
         if tellzone_ids:
-            with closing(connection.cursor()) as cursor:
-                cursor.execute(
+            queryset = queryset.extra(
+                where=[
                     '''
-                    SELECT post_id
-                    FROM api_posts_tellzones
-                    WHERE tellzone_id IN %s
+                    EXISTS (
+                        SELECT 1
+                        FROM api_posts_tellzones
+                        WHERE
+                            api_posts_tellzones.post_id = api_posts.id
+                            AND
+                            api_posts_tellzones.tellzone_id = ANY(%s)
+                    )
                     ''',
-                    (tuple(map(int, tellzone_ids.split(','))),),
-                )
-                queryset = queryset.filter(id__in=[record[0] for record in cursor.fetchall()])
+                ],
+                params=(map(int, tellzone_ids.split(',')),),
+            )
         if keywords:
-            queryset = queryset.filter(Q(title__icontains=keywords) | Q(contents__icontains=keywords))
+            queryset = search.get_posts(queryset, keywords)
         return queryset
 
 
@@ -2460,7 +2656,8 @@ class Radar(ViewSet):
             serializer.validated_data['radius'] * 0.3048,
             True,
         )
-        users = {key: value for key, value in users.items() if not models.is_blocked(request.user.id, key)}
+        blocked_ids = models.get_blocked_ids(request.user.id)
+        users = {key: value for key, value in users.items() if key not in blocked_ids}
         return Response(
             data=serializers.RadarGetResponse(
                 [
@@ -2637,12 +2834,49 @@ class SharesUsers(ViewSet):
                 - Source (shared by me; default)
                 - Destination (shared by others)
 
+        + since_id
+            - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+              (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+            - Type: integer
+            - Status: optional
+
+        + max_id
+            - Type: integer
+            - Status: optional
+
+        + limit
+            - Type: integer (default = 100; maximum = 1000)
+            - Status: optional
+
+        + offset
+            - Type: integer (default = 0)
+            - Status: optional
+
         Output
         ======
 
         (see below; "Response Class" -> "Model Schema")
         </pre>
         ---
+        omit_parameters:
+            - form
+        parameters:
+            - name: since_id
+              paramType: query
+              required: false
+              type: integer
+            - name: max_id
+              paramType: query
+              required: false
+              type: integer
+            - name: limit
+              paramType: query
+              required: false
+              type: integer
+            - name: offset
+              paramType: query
+              required: false
+              type: integer
         response_serializer: api.serializers.SharesUsersGet
         responseMessages:
             - code: 400
@@ -2658,7 +2892,7 @@ class SharesUsers(ViewSet):
             )
         return Response(
             data=serializers.SharesUsersGet(
-                self.get_queryset(),
+                get_paginated(request, self.get_queryset()),
                 context={
                     'request': request,
                 },
@@ -2765,6 +2999,24 @@ class SlaveTells(ViewSet):
             - Type: datetime
             - Status: optional
 
+        + since_id
+            - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+              (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+            - Type: integer
+            - Status: optional
+
+        + max_id
+            - Type: integer
+            - Status: optional
+
+        + limit
+            - Type: integer (default = 100; maximum = 1000)
+            - Status: optional
+
+        + offset
+            - Type: integer (default = 0)
+            - Status: optional
+
         Output
         ======
 
@@ -2782,6 +3034,22 @@ class SlaveTells(ViewSet):
               paramType: query
               required: false
               type: datetime
+            - name: since_id
+              paramType: query
+              required: false
+              type: integer
+            - name: max_id
+              paramType: query
+              required: false
+              type: integer
+            - name: limit
+              paramType: query
+              required: false
+              type: integer
+            - name: offset
+              paramType: query
+              required: false
+              type: integer
         response_serializer: api.serializers.SlaveTellsGetResponse
         responseMessages:
             - code: 400
@@ -2796,13 +3064,16 @@ class SlaveTells(ViewSet):
         serializer.is_valid(raise_exception=True)
         return Response(
             data=serializers.SlaveTellsResponse(
-                self.get_queryset(
-                    inserted_at=serializer.validated_data[
-                        'inserted_at'
-                    ] if 'inserted_at' in serializer.validated_data else None,
-                    updated_at=serializer.validated_data[
-                        'updated_at'
-                    ] if 'updated_at' in serializer.validated_data else None,
+                get_paginated(
+                    request,
+                    self.get_queryset(
+                        inserted_at=serializer.validated_data[
+                            'inserted_at'
+                        ] if 'inserted_at' in serializer.validated_data else None,
+                        updated_at=serializer.validated_data[
+                            'updated_at'
+                        ] if 'updated_at' in serializer.validated_data else None,
+                    ),
                 ),
                 context={
                     'request': request,
@@ -3207,6 +3478,24 @@ class Tellcards(ViewSet):
                 - Source (saved by me; default)
                 - Destination (saved by others)
 
+        + since_id
+            - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+              (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+            - Type: integer
+            - Status: optional
+
+        + max_id
+            - Type: integer
+            - Status: optional
+
+        + limit
+            - Type: integer (default = 100; maximum = 1000)
+            - Status: optional
+
+        + offset
+            - Type: integer (default = 0)
+            - Status: optional
+
         Output
         ======
 
@@ -3220,22 +3509,49 @@ class Tellcards(ViewSet):
               paramType: query
               required: true
               type: string
-        response_serializer: api.serializers.TellcardsResponse
-        responseMessages:
-            - code: 400
-              message: Invalid Input
-        '''
-        type = request.QUERY_PARAMS['type'] if 'type' in request.QUERY_PARAMS else ''
-        if not type or type not in ['Source', 'Destination']:
-            return Response(
-                data={
-                    'error': ugettext_lazy('Invalid `type`'),
-                },
-                status=HTTP_400_BAD_REQUEST,
+            - name: since_id
+              paramType: query
+              required: false
+              type: integer
+            - name: max_id
+              paramType: query
+              required: false
+              type: integer
+            - name: limit
+              paramType: query
+              required: false
+              type: integer
+            - name: offset
+              paramType: query
+              required: false
+              type: integer
+        response_serializer: api.serializers.TellcardsResponse
+        responseMessages:
+            - code: 304
+              message: Not Modified (If-None-Match matches the ETag)
+            - code: 400
+              message: Invalid Input
+        '''
+        type = request.QUERY_PARAMS['type'] if 'type' in request.QUERY_PARAMS else ''
+        if not type or type not in ['Source', 'Destination']:
+            return Response(
+                data={
+                    'error': ugettext_lazy('Invalid `type`'),
+                },
+                status=HTTP_400_BAD_REQUEST,
             )
-        return Response(
+        etag = caches.get_etag(
+            request,
+            'messages:{user_id:d}',
+            'tellcards:{user_id:d}',
+            *models.get_tellcards_versions(self.get_queryset())
+        )
+        response = caches.get_not_modified(request, etag)
+        if response:
+            return response
+        response = Response(
             data=serializers.TellcardsResponse(
-                self.get_queryset(),
+                get_paginated(request, self.get_queryset()),
                 context={
                     'request': request,
                 },
@@ -3243,6 +3559,8 @@ class Tellcards(ViewSet):
             ).data,
             status=HTTP_200_OK,
         )
+        response['ETag'] = etag
+        return response
 
     def post(self, request):
         '''
@@ -3299,7 +3617,7 @@ class Tellcards(ViewSet):
             data=request.data,
         )
         serializer.is_valid(raise_exception=True)
-        if models.is_blocked(request.user.id, serializer.validated_data['user_destination_id']):
+        if serializer.validated_data['user_destination_id'] in models.get_blocked_ids(request.user.id):
             return Response(
                 data={
                     'error': ugettext_lazy('Invalid `user_destination_id`'),
@@ -3439,7 +3757,6 @@ class Tellzones(ViewSet):
             data=request.QUERY_PARAMS,
         )
         serializer.is_valid(raise_exception=True)
-        records = {}
         network_ids = request.query_params.get('network_ids', None)
         point = 'POINT({longitude} {latitude})'.format(
             latitude=serializer.validated_data['latitude'],
@@ -3521,38 +3838,12 @@ class Tellzones(ViewSet):
             api_slave_tells.updated_at AS slave_tells_updated_at
         FROM api_tellzones
         LEFT JOIN api_users ON api_tellzones.user_id = api_users.id
-        LEFT OUTER JOIN api_blocks AS api_blocks_tellzones
-            ON
-                (
-                    api_blocks_tellzones.user_source_id = %s
-                    AND
-                    api_blocks_tellzones.user_destination_id = api_tellzones.user_id
-                )
-                OR
-                (
-                    api_blocks_tellzones.user_source_id = api_tellzones.user_id
-                    AND
-                    api_blocks_tellzones.user_destination_id = %s
-                )
         LEFT JOIN api_tellzones_types ON api_tellzones.type_id = api_tellzones_types.id
         LEFT JOIN api_tellzones_statuses ON api_tellzones.status_id = api_tellzones_statuses.id
         LEFT OUTER JOIN api_networks_tellzones ON api_networks_tellzones.tellzone_id = api_tellzones.id
         LEFT OUTER JOIN api_master_tells_tellzones ON api_master_tells_tellzones.tellzone_id = api_tellzones.id
         LEFT JOIN api_master_tells ON api_master_tells.id = api_master_tells_tellzones.master_tell_id
         LEFT JOIN api_users AS api_users_created_by ON api_users_created_by.id = api_master_tells.created_by_id
-        LEFT OUTER JOIN api_blocks as api_blocks_master_tells
-            ON
-                (
-                    api_blocks_master_tells.user_source_id = %s
-                    AND
-                    api_blocks_master_tells.user_destination_id = api_master_tells.owned_by_id
-                )
-                OR
-                (
-                    api_blocks_master_tells.user_source_id = api_master_tells.owned_by_id
-                    AND
-                    api_blocks_master_tells.user_destination_id = %s
-                )
         LEFT JOIN api_categories ON api_categories.id = api_master_tells.category_id
         LEFT OUTER JOIN api_slave_tells ON api_slave_tells.master_tell_id = api_master_tells.id
         WHERE
@@ -3566,21 +3857,20 @@ class Tellzones(ViewSet):
                 api_master_tells.owned_by_id = %s
             )
             AND
-            api_blocks_tellzones.id IS NULL
+            (api_tellzones.user_id IS NULL OR api_tellzones.user_id != ALL(%s))
             AND
-            api_blocks_master_tells.id IS NULL
+            (api_master_tells.owned_by_id IS NULL OR api_master_tells.owned_by_id != ALL(%s))
         '''
+        blocked_ids = list(models.get_blocked_ids(self.request.user.id))
         parameters = [
             point,
-            self.request.user.id,
-            self.request.user.id,
-            self.request.user.id,
-            self.request.user.id,
             point,
             serializer.validated_data['radius'] * 0.3048,
             'open',
             'published',
             self.request.user.id,
+            blocked_ids,
+            blocked_ids,
         ]
         network_ids = tuple(filter(None, map(int, network_ids.split(',') if network_ids else '')))
         if network_ids:
@@ -3588,158 +3878,75 @@ class Tellzones(ViewSet):
             parameters.append(network_ids)
         with closing(connection.cursor()) as cursor:
             cursor.execute(query, parameters)
-            columns = [column.name for column in cursor.description]
-            for record in cursor.fetchall():
-                record = dict(zip(columns, record))
-                if record['id'] not in records:
-                    records[record['id']] = {
-                        'type': {},
-                        'status': {},
-                        'master_tells': {},
-                        'is_favorited': False,
-                        'is_pinned': False,
-                        'is_viewed': False,
-                    }
-                records[record['id']]['id'] = record['id']
-                records[record['id']]['description'] = record['description']
-                records[record['id']]['distance'] = record['distance']
-                records[record['id']]['hours'] = loads(record['hours']) if record['hours'] else {}
-                records[record['id']]['location'] = record['location']
-                records[record['id']]['name'] = record['name']
-                records[record['id']]['phone'] = record['phone']
-                records[record['id']]['photo'] = record['photo']
-                if record['social_profiles']:
-                    records[record['id']]['social_profiles'] = loads(record['social_profiles'])
-                else:
-                    records[record['id']]['social_profiles'] = []
-                point = loads(record['point'])
-                records[record['id']]['point'] = {
-                    'latitude': str(point['coordinates'][1]),
-                    'longitude': str(point['coordinates'][0]),
-                }
-                records[record['id']]['url'] = record['url']
-                records[record['id']]['ended_at'] = record['ended_at']
-                records[record['id']]['inserted_at'] = record['inserted_at']
-                records[record['id']]['started_at'] = record['started_at']
-                records[record['id']]['updated_at'] = record['updated_at']
-                if record['users_id']:
-                    if 'user' not in records[record['id']]:
-                        records[record['id']]['user'] = {
-                            'id': record['users_id'],
-                            'first_name': record['users_first_name'],
-                            'last_name': record['users_last_name'],
-                            'location': record['users_location'],
-                            'photo_original': record['users_photo_original'],
-                            'photo_preview': record['users_photo_preview'],
-                            'settings': loads(record['users_settings']),
-                        }
-                if record['tellzones_types_id']:
-                    records[record['id']]['type'] = {
-                        'id': record['tellzones_types_id'],
-                        'name': record['tellzones_types_name'],
-                        'title': record['tellzones_types_title'],
-                        'icon': record['tellzones_types_icon'],
-                        'description': record['tellzones_types_description'],
-                        'position': record['tellzones_types_position'],
-                    }
-                if record['tellzones_statuses_id']:
-                    records[record['id']]['status'] = {
-                        'id': record['tellzones_statuses_id'],
-                        'name': record['tellzones_statuses_name'],
-                        'title': record['tellzones_statuses_title'],
-                        'icon': record['tellzones_statuses_icon'],
-                        'description': record['tellzones_statuses_description'],
-                        'position': record['tellzones_statuses_position'],
-                    }
-                if record['master_tells_id']:
-                    if record['master_tells_id'] not in records[record['id']]['master_tells']:
-                        records[record['id']]['master_tells'][record['master_tells_id']] = {
-                            'id': record['master_tells_id'],
-                            'contents': record['master_tells_contents'],
-                            'description': record['master_tells_description'],
-                            'position': record['master_tells_position'],
-                            'is_visible': record['master_tells_is_visible'],
-                            'inserted_at': record['master_tells_inserted_at'],
-                            'updated_at': record['master_tells_updated_at'],
-                            'slave_tells': {},
-                        }
-                    if record['master_tells_category_id']:
-                        records[record['id']]['master_tells'][record['master_tells_id']]['category'] = {
-                            'id': record['master_tells_category_id'],
-                            'name': record['master_tells_category_name'],
-                            'photo': record['master_tells_category_photo'],
-                            'display_type': record['master_tells_category_display_type'],
-                            'description': record['master_tells_category_description'],
-                            'position': record['master_tells_category_position'],
-                        }
-                    if record['master_tells_created_by_id']:
-                        if 'created_by' not in records[record['id']]['master_tells'][record['master_tells_id']]:
-                            records[record['id']]['master_tells'][record['master_tells_id']]['created_by'] = {
-                                'id': record['master_tells_created_by_id'],
-                                'first_name': record['master_tells_created_by_first_name'],
-                                'last_name': record['master_tells_created_by_last_name'],
-                                'location': record['master_tells_created_by_location'],
-                                'photo_original': record['master_tells_created_by_photo_original'],
-                                'photo_preview': record['master_tells_created_by_photo_preview'],
-                                'settings': loads(record['master_tells_created_by_settings'])
-                            }
-                    if record['slave_tells_id']:
-                        if (
-                            record['slave_tells_id'] not in
-                            records[record['id']]['master_tells'][record['master_tells_id']]['slave_tells']
-                        ):
-                            records[
-                                record['id']
-                            ]['master_tells'][record['master_tells_id']]['slave_tells'][record['slave_tells_id']] = {
-                                'id': record['slave_tells_id'],
-                                'created_by_id': record['slave_tells_created_by_id'],
-                                'owned_by_id': record['slave_tells_owned_by_id'],
-                                'photo': record['slave_tells_photo'],
-                                'first_name': record['slave_tells_first_name'],
-                                'last_name': record['slave_tells_last_name'],
-                                'type': record['slave_tells_type'],
-                                'contents_original': record['slave_tells_contents_original'],
-                                'contents_preview': record['slave_tells_contents_preview'],
-                                'description': record['slave_tells_description'],
-                                'position': record['slave_tells_position'],
-                                'is_editable': record['slave_tells_is_editable'],
-                                'inserted_at': record['slave_tells_inserted_at'],
-                                'updated_at': record['slave_tells_updated_at'],
-                            }
-        for key, value in records.items():
-            if 'user' not in records[key]:
-                records[key]['user'] = {}
-            if records[key]['user']:
-                records[key]['user']['photo_original'] = (
-                    records[key]['user']['photo_original']
-                    if records[key]['user']['settings']['show_photo'] == 'True' else None
-                )
-                records[key]['user']['photo_preview'] = (
-                    records[key]['user']['photo_preview']
-                    if records[key]['user']['settings']['show_photo'] == 'True' else None
-                )
-                records[key]['user']['last_name'] = (
-                    records[key]['user']['last_name']
-                    if records[key]['user']['settings']['show_last_name'] == 'True' else None
-                )
-                del records[key]['user']['settings']
-            for k, v in records[key]['master_tells'].items():
-                records[key]['master_tells'][k]['created_by']['photo_original'] = (
-                    records[key]['master_tells'][k]['created_by']['photo_original']
-                    if records[key]['master_tells'][k]['created_by']['settings']['show_photo'] == 'True' else None
-                )
-                records[key]['master_tells'][k]['created_by']['photo_preview'] = (
-                    records[key]['master_tells'][k]['created_by']['photo_preview']
-                    if records[key]['master_tells'][k]['created_by']['settings']['show_photo'] == 'True' else None
-                )
-                records[key]['master_tells'][k]['created_by']['last_name'] = (
-                    records[key]['master_tells'][k]['created_by']['last_name']
-                    if records[key]['master_tells'][k]['created_by']['settings']['show_last_name'] == 'True' else None
-                )
-                del records[key]['master_tells'][k]['created_by']['settings']
-                records[key]['master_tells'][k]['slave_tells'] = v['slave_tells'].values()
-            records[key]['master_tells'] = records[key]['master_tells'].values()
-        return Response(data=records.values(), status=HTTP_200_OK)
+            records = assembler.assemble(
+                assembler.Node(
+                    '',
+                    (
+                        'id',
+                        'description',
+                        'distance',
+                        ('hours', assembler.get_loads(dict),),
+                        'location',
+                        'name',
+                        'phone',
+                        'photo',
+                        ('social_profiles', assembler.get_loads(list),),
+                        ('point', assembler.get_coordinates,),
+                        'url',
+                        'ended_at',
+                        'inserted_at',
+                        'started_at',
+                        'updated_at',
+                    ),
+                    nodes=(
+                        (
+                            'user',
+                            assembler.Node(
+                                'users_',
+                                ('id', 'first_name', 'last_name', 'location', 'photo_original', 'photo_preview',),
+                                default=dict,
+                                privacy=('settings', models.PRIVACY,),
+                            ),
+                        ),
+                        ('type', assembler.Node('tellzones_types_', assembler.TELLZONES_TYPES, default=dict),),
+                        ('status', assembler.Node('tellzones_statuses_', assembler.TELLZONES_STATUSES, default=dict),),
+                        (
+                            'master_tells',
+                            assembler.Node(
+                                'master_tells_',
+                                assembler.MASTER_TELLS,
+                                many=True,
+                                nodes=(
+                                    ('category', assembler.Node('master_tells_category_', assembler.CATEGORIES),),
+                                    (
+                                        'created_by',
+                                        assembler.Node(
+                                            'master_tells_created_by_',
+                                            (
+                                                'id',
+                                                'first_name',
+                                                'last_name',
+                                                'location',
+                                                'photo_original',
+                                                'photo_preview',
+                                            ),
+                                            privacy=('settings', models.PRIVACY,),
+                                        ),
+                                    ),
+                                    ('slave_tells', assembler.Node('slave_tells_', assembler.SLAVE_TELLS, many=True),),
+                                ),
+                            ),
+                        ),
+                    ),
+                ),
+                [column.name for column in cursor.description],
+                cursor.fetchall(),
+            )
+        for record in records:
+            record['is_favorited'] = False
+            record['is_pinned'] = False
+            record['is_viewed'] = False
+        return Response(data=records, status=HTTP_200_OK)
 
     def get_2(self, request, id):
         '''
@@ -3773,7 +3980,7 @@ class Tellzones(ViewSet):
                 status=HTTP_400_BAD_REQUEST,
             )
         if instance.user_id:
-            if models.is_blocked(request.user.id, instance.user_id):
+            if instance.user_id in models.get_blocked_ids(request.user.id):
                 return Response(
                     data={
                         'error': ugettext_lazy('Invalid `id`'),
@@ -4868,18 +5075,21 @@ def versions(request):
     ---
     response_serializer: api.serializers.Versions
     responseMessages:
+        - code: 304
+          message: Not Modified (If-None-Match matches the ETag)
         - code: 400
           message: Invalid Input
     '''
-    return Response(
-        data=serializers.Versions(
+    return caches.get_response(
+        request,
+        'versions',
+        lambda: serializers.Versions(
             models.Version.objects.get_queryset(),
             context={
                 'request': request,
             },
             many=True,
         ).data,
-        status=HTTP_200_OK,
     )
 
 
@@ -4903,18 +5113,21 @@ def ads(request):
     ---
     response_serializer: api.serializers.Ads
     responseMessages:
+        - code: 304
+          message: Not Modified (If-None-Match matches the ETag)
         - code: 400
           message: Invalid Input
     '''
-    return Response(
-        data=serializers.Ads(
+    return caches.get_response(
+        request,
+        'ads',
+        lambda: serializers.Ads(
             models.Ad.objects.get_queryset(),
             context={
                 'request': request,
             },
             many=True,
         ).data,
-        status=HTTP_200_OK,
     )
 
 
@@ -5135,18 +5348,21 @@ def categories(request):
     ---
     response_serializer: api.serializers.Categories
     responseMessages:
+        - code: 304
+          message: Not Modified (If-None-Match matches the ETag)
         - code: 400
           message: Invalid Input
     '''
-    return Response(
-        data=serializers.Categories(
+    return caches.get_response(
+        request,
+        'categories',
+        lambda: serializers.Categories(
             models.Category.objects.get_queryset(),
             context={
                 'request': request,
             },
             many=True,
         ).data,
-        status=HTTP_200_OK,
     )
 
 
@@ -5259,7 +5475,7 @@ def forgot_password(request):
             },
             status=HTTP_400_BAD_REQUEST,
         )
-    current_app.send_task(
+    broker.send_task(
         'api.tasks.email_notifications',
         (user.id, 'reset_password',),
         queue='api.tasks.email_notifications',
@@ -5496,6 +5712,8 @@ def home_master_tells(request):
           type: string
     response_serializer: api.serializers.HomeMasterTellsResponse
     responseMessages:
+        - code: 304
+          message: Not Modified (If-None-Match matches the ETag)
         - code: 400
           message: Invalid Input
     '''
@@ -5506,7 +5724,11 @@ def home_master_tells(request):
         data=request.query_params,
     )
     serializer.is_valid(raise_exception=True)
-    return Response(
+    etag = caches.get_etag(request, 'blocks:{user_id:d}', 'home:{user_id:d}', seconds=caches.HOME)
+    response = caches.get_not_modified(request, etag)
+    if response:
+        return response
+    response = Response(
         data=models.get_master_tells(
             request.user.id,
             serializer.validated_data['tellzone_id'],
@@ -5515,6 +5737,8 @@ def home_master_tells(request):
         ),
         status=HTTP_200_OK,
     )
+    response['ETag'] = etag
+    return response
 
 
 @api_view(('GET',))
@@ -5897,6 +6121,8 @@ def home_tellzones(request):
           type: string
     response_serializer: api.serializers.HomeTellzonesResponse
     responseMessages:
+        - code: 304
+          message: Not Modified (If-None-Match matches the ETag)
         - code: 400
           message: Invalid Input
     '''
@@ -5907,6 +6133,14 @@ def home_tellzones(request):
         data=request.query_params,
     )
     serializer.is_valid(raise_exception=True)
+    etag = None
+    if not serializer.validated_data['dummy'] == 'Yes':
+        etag = caches.get_etag(
+            request, 'blocks:{user_id:d}', 'home:{user_id:d}', 'user_tellzones:{user_id:d}', seconds=caches.HOME,
+        )
+        response = caches.get_not_modified(request, etag)
+        if response:
+            return response
     point = models.get_point(serializer.validated_data['latitude'], serializer.validated_data['longitude'])
     if serializer.validated_data['dummy'] == 'Yes':
         tellzones = models.Tellzone.objects.get_queryset().distance(point).order_by('?')[0:5]
@@ -5919,7 +6153,7 @@ def home_tellzones(request):
             'distance',
             '-id',
         )
-    return Response(
+    response = Response(
         data=serializers.HomeTellzonesResponse(
             tellzones,
             context={
@@ -5929,6 +6163,9 @@ def home_tellzones(request):
         ).data,
         status=HTTP_200_OK,
     )
+    if etag:
+        response['ETag'] = etag
+    return response
 
 
 @api_view(('GET',))
@@ -5959,6 +6196,24 @@ def master_tells_all(request, *args, **kwargs):
         - Type: integer
         - Status: optional
 
+    + since_id
+        - Description: If any of `since_id`, `max_id` or `limit` is supplied, the results are ordered by `id`
+          (descending) and paginated (similar to how it works in all major APIs; Example: twitter.com)
+        - Type: integer
+        - Status: optional
+
+    + max_id
+        - Type: integer
+        - Status: optional
+
+    + limit
+        - Type: integer (default = 100; maximum = 1000)
+        - Status: optional
+
+    + offset
+        - Type: integer (default = 0)
+        - Status: optional
+
     Output
     ======
 
@@ -5975,6 +6230,22 @@ def master_tells_all(request, *args, **kwargs):
         - name: tellzone_id
           paramType: query
           type: integer
+        - name: since_id
+          paramType: query
+          required: false
+          type: integer
+        - name: max_id
+          paramType: query
+          required: false
+          type: integer
+        - name: limit
+          paramType: query
+          required: false
+          type: integer
+        - name: offset
+          paramType: query
+          required: false
+          type: integer
     response_serializer: api.serializers.MasterTellsAllResponse
     responseMessages:
         - code: 400
@@ -5987,8 +6258,62 @@ def master_tells_all(request, *args, **kwargs):
         data=request.query_params,
     )
     serializer.is_valid(raise_exception=True)
-    master_tells = {}
+    page = get_page(request)
+    where = '''
+        api_master_tells.owned_by_id != %s
+        AND
+        api_master_tells_tellzones.tellzone_id IN (
+            SELECT tellzone_id
+            FROM api_users_tellzones
+            WHERE
+                user_id = %s
+                AND
+                tellzone_id != %s
+                AND
+                (pinned_at IS NOT NULL OR favorited_at IS NOT NULL)
+            UNION
+            SELECT tellzone_id
+            FROM api_master_tells_tellzones
+            INNER JOIN api_master_tells ON api_master_tells.id = api_master_tells_tellzones.master_tell_id
+            WHERE
+                api_master_tells_tellzones.tellzone_id != %s
+                AND
+                api_master_tells.owned_by_id = %s
+        )
+        AND
+        api_master_tells_tellzones.status = %s
+        AND
+        api_master_tells.owned_by_id != ALL(%s)
+    '''
+    parameters = [
+        serializer.validated_data['user_id'],
+        serializer.validated_data['user_id'],
+        serializer.validated_data['tellzone_id'],
+        serializer.validated_data['tellzone_id'],
+        serializer.validated_data['user_id'],
+        'Published',
+        list(models.get_blocked_ids(serializer.validated_data['user_id'])),
+    ]
     with closing(connection.cursor()) as cursor:
+        if page:
+            query = '''
+            SELECT DISTINCT api_master_tells.id
+            FROM api_master_tells_tellzones
+            INNER JOIN api_master_tells ON api_master_tells.id = api_master_tells_tellzones.master_tell_id
+            WHERE {where:s}
+            '''.format(where=where)
+            ids = list(parameters)
+            if 'since_id' in page:
+                query = '{query:s} AND api_master_tells.id > %s'.format(query=query)
+                ids.append(page['since_id'])
+            if 'max_id' in page:
+                query = '{query:s} AND api_master_tells.id < %s'.format(query=query)
+                ids.append(page['max_id'])
+            query = '{query:s} ORDER BY api_master_tells.id DESC LIMIT %s OFFSET %s'.format(query=query)
+            ids.extend([page['limit'], page['offset']])
+            cursor.execute(query, ids)
+            where = '{where:s} AND api_master_tells.id = ANY(%s)'.format(where=where)
+            parameters.append([record[0] for record in cursor.fetchall()])
         cursor.execute(
             '''
             SELECT
@@ -6043,160 +6368,38 @@ def master_tells_all(request, *args, **kwargs):
             INNER JOIN api_users AS api_users_created_by ON api_users_created_by.id = api_master_tells.created_by_id
             INNER JOIN api_users AS api_users_owned_by ON api_users_owned_by.id = api_master_tells.owned_by_id
             INNER JOIN api_categories ON api_categories.id = api_master_tells.category_id
-            LEFT OUTER JOIN api_blocks ON
-                (api_blocks.user_source_id = %s AND api_blocks.user_destination_id = api_master_tells.owned_by_id)
-                OR
-                (api_blocks.user_source_id = api_master_tells.owned_by_id AND api_blocks.user_destination_id = %s)
-            WHERE
-                api_master_tells.owned_by_id != %s
-                AND
-                api_master_tells_tellzones.tellzone_id IN (
-                    SELECT tellzone_id
-                    FROM api_users_tellzones
-                    WHERE
-                        user_id = %s
-                        AND
-                        tellzone_id != %s
-                        AND
-                        (pinned_at IS NOT NULL OR favorited_at IS NOT NULL)
-                    UNION
-                    SELECT tellzone_id
-                    FROM api_master_tells_tellzones
-                    INNER JOIN api_master_tells ON api_master_tells.id = api_master_tells_tellzones.master_tell_id
-                    WHERE
-                        api_master_tells_tellzones.tellzone_id != %s
-                        AND
-                        api_master_tells.owned_by_id = %s
-                )
-                AND
-                api_master_tells_tellzones.status = %s
-                AND
-                api_blocks.id IS NULL
+            WHERE {where:s}
             ORDER BY api_master_tells.id ASC, api_slave_tells.position ASC
-            ''',
-            (
-                serializer.validated_data['user_id'],
-                serializer.validated_data['user_id'],
-                serializer.validated_data['user_id'],
-                serializer.validated_data['user_id'],
-                serializer.validated_data['tellzone_id'],
-                serializer.validated_data['tellzone_id'],
-                serializer.validated_data['user_id'],
-                'Published',
-            )
-        )
-        columns = [column.name for column in cursor.description]
-        for record in cursor.fetchall():
-            record = dict(zip(columns, record))
-            if record['id'] not in master_tells:
-                master_tells[record['id']] = {}
-            if 'id' not in master_tells[record['id']]:
-                master_tells[record['id']]['id'] = record['id']
-            if 'contents' not in master_tells[record['id']]:
-                master_tells[record['id']]['contents'] = record['contents']
-            if 'description' not in master_tells[record['id']]:
-                master_tells[record['id']]['description'] = record['description']
-            if 'position' not in master_tells[record['id']]:
-                master_tells[record['id']]['position'] = record['position']
-            if 'is_visible' not in master_tells[record['id']]:
-                master_tells[record['id']]['is_visible'] = record['is_visible']
-            if 'inserted_at' not in master_tells[record['id']]:
-                master_tells[record['id']]['inserted_at'] = record['inserted_at']
-            if 'updated_at' not in master_tells[record['id']]:
-                master_tells[record['id']]['updated_at'] = record['updated_at']
-            if 'is_pinned' not in master_tells[record['id']]:
-                master_tells[record['id']]['is_pinned'] = record['is_pinned']
-            if 'slave_tells' not in master_tells[record['id']]:
-                master_tells[record['id']]['slave_tells'] = {}
-            if record['slave_tell_id']:
-                if record['slave_tell_id'] not in master_tells[record['id']]['slave_tells']:
-                    master_tells[record['id']]['slave_tells'][record['slave_tell_id']] = {
-                        'id': record['slave_tell_id'],
-                        'created_by_id': record['slave_tell_created_by_id'],
-                        'owned_by_id': record['slave_tell_owned_by_id'],
-                        'photo': record['slave_tell_photo'],
-                        'first_name': record['slave_tell_first_name'],
-                        'last_name': record['slave_tell_last_name'],
-                        'type': record['slave_tell_type'],
-                        'contents_original': record['slave_tell_contents_original'],
-                        'contents_preview': record['slave_tell_contents_preview'],
-                        'description': record['slave_tell_description'],
-                        'position': record['slave_tell_position'],
-                        'is_editable': record['slave_tell_is_editable'],
-                        'inserted_at': record['slave_tell_inserted_at'],
-                        'updated_at': record['slave_tell_updated_at'],
-                    }
-            if 'created_by' not in master_tells[record['id']]:
-                master_tells[record['id']]['created_by'] = {
-                    'id': record['created_by_id'],
-                    'photo_original': record['created_by_photo_original'],
-                    'photo_preview': record['created_by_photo_preview'],
-                    'first_name': record['created_by_first_name'],
-                    'last_name': record['created_by_last_name'],
-                    'description': record['created_by_description'],
-                    'settings': loads(record['created_by_settings']),
-                }
-            if 'owned_by' not in master_tells[record['id']]:
-                master_tells[record['id']]['owned_by'] = {
-                    'id': record['owned_by_id'],
-                    'photo_original': record['owned_by_photo_original'],
-                    'photo_preview': record['owned_by_photo_preview'],
-                    'first_name': record['owned_by_first_name'],
-                    'last_name': record['owned_by_last_name'],
-                    'description': record['owned_by_description'],
-                    'settings': loads(record['owned_by_settings']),
-                }
-            if 'category' not in master_tells[record['id']]:
-                master_tells[record['id']]['category'] = {
-                    'id': record['category_id'],
-                    'name': record['category_name'],
-                    'photo': record['category_photo'],
-                    'display_type': record['category_display_type'],
-                    'description': record['category_description'],
-                    'position': record['category_position'],
-                }
-            if 'tellzones' not in master_tells[record['id']]:
-                master_tells[record['id']]['tellzones'] = {}
-            if (
-                'tellzone_id' in record and record['tellzone_id'] and
-                'tellzone_name' in record and record['tellzone_name']
-            ):
-                master_tells[record['id']]['tellzones'][record['tellzone_id']] = {
-                    'id': record['tellzone_id'],
-                    'name': record['tellzone_name'],
-                }
-    master_tells = sorted(master_tells.values(), key=lambda item: item['id'])
-    for key, value in enumerate(master_tells):
-        master_tells[key]['created_by']['photo_original'] = (
-            master_tells[key]['created_by']['photo_original']
-            if master_tells[key]['created_by']['settings']['show_photo'] == 'True' else None
-        )
-        master_tells[key]['created_by']['photo_preview'] = (
-            master_tells[key]['created_by']['photo_preview']
-            if master_tells[key]['created_by']['settings']['show_photo'] == 'True' else None
+            '''.format(where=where),
+            parameters,
         )
-        master_tells[key]['created_by']['last_name'] = (
-            master_tells[key]['created_by']['last_name']
-            if master_tells[key]['created_by']['settings']['show_last_name'] == 'True' else None
-        )
-        master_tells[key]['owned_by']['photo_original'] = (
-            master_tells[key]['owned_by']['photo_original']
-            if master_tells[key]['owned_by']['settings']['show_photo'] == 'True' else None
-        )
-        master_tells[key]['owned_by']['photo_preview'] = (
-            master_tells[key]['owned_by']['photo_preview']
-            if master_tells[key]['owned_by']['settings']['show_photo'] == 'True' else None
-        )
-        master_tells[key]['owned_by']['last_name'] = (
-            master_tells[key]['owned_by']['last_name']
-            if master_tells[key]['owned_by']['settings']['show_last_name'] == 'True' else None
-        )
-        del master_tells[key]['created_by']['settings']
-        del master_tells[key]['owned_by']['settings']
-        master_tells[key]['slave_tells'] = sorted(
-            master_tells[key]['slave_tells'].values(), key=lambda item: item['position'],
+        master_tells = assembler.assemble(
+            assembler.Node(
+                '',
+                assembler.MASTER_TELLS + ('is_pinned',),
+                order='id',
+                nodes=(
+                    (
+                        'slave_tells',
+                        assembler.Node('slave_tell_', assembler.SLAVE_TELLS, many=True, order='position'),
+                    ),
+                    (
+                        'created_by',
+                        assembler.Node('created_by_', assembler.USERS, privacy=('settings', models.PRIVACY,)),
+                    ),
+                    (
+                        'owned_by',
+                        assembler.Node('owned_by_', assembler.USERS, privacy=('settings', models.PRIVACY,)),
+                    ),
+                    ('category', assembler.Node('category_', assembler.CATEGORIES),),
+                    ('tellzones', assembler.Node('tellzone_', ('id', 'name',), many=True, order='id'),),
+                ),
+            ),
+            [column.name for column in cursor.description],
+            cursor.fetchall(),
         )
-        master_tells[key]['tellzones'] = sorted(master_tells[key]['tellzones'].values(), key=lambda item: item['id'])
+    if page:
+        master_tells.reverse()
     return Response(data=master_tells, status=HTTP_200_OK)
 
 
@@ -6296,6 +6499,87 @@ def master_tells_positions(request, *args, **kwargs):
     )
 
 
+@api_view(('GET',))
+@permission_classes((IsAuthenticated,))
+def master_tells_search(request, *args, **kwargs):
+    '''
+    SEARCH Master Tells
+
+    <pre>
+    Input
+    =====
+
+    + keywords
+        - Description: Substring and fuzzy (trigram) search over `contents`. The results are ordered by similarity and
+          paginated with `limit` and `offset`.
+        - Type: string
+        - Status: mandatory
+
+    + limit
+        - Type: integer (default = 100; maximum = 1000)
+        - Status: optional
+
+    + offset
+        - Type: integer (default = 0)
+        - Status: optional
+
+    Output
+    ======
+
+    (see below; "Response Class" -> "Model Schema")
+    </pre>
+    ---
+    omit_parameters:
+        - form
+    parameters:
+        - name: keywords
+          paramType: query
+          required: true
+          type: string
+        - name: limit
+          paramType: query
+          required: false
+          type: integer
+        - name: offset
+          paramType: query
+          required: false
+          type: integer
+    response_serializer: api.serializers.SearchMasterTellsResponse
+    responseMessages:
+        - code: 400
+          message: Invalid Input
+    '''
+    serializer = serializers.SearchRequest(
+        context={
+            'request': request,
+        },
+        data=request.query_params,
+    )
+    serializer.is_valid(raise_exception=True)
+    return Response(
+        data=serializers.SearchMasterTellsResponse(
+            get_ranked(
+                request,
+                search.get_master_tells(
+                    models.MasterTell.objects.get_queryset().select_related(
+                        'category',
+                    ).filter(
+                        is_visible=True,
+                    ).exclude(
+                        owned_by_id__in=models.get_blocked_ids(request.user.id),
+                    ),
+                    serializer.validated_data['keywords'],
+                ),
+            ),
+            context={
+                'request': request,
+            },
+            many=True,
+        ).data,
+        status=HTTP_200_OK,
+    )
+
+
 @api_view(('POST',))
 @permission_classes((IsAuthenticated,))
 def messages_bulk_is_hidden(request):
@@ -6385,7 +6669,7 @@ def messages_bulk_is_hidden(request):
         message.save()
         if not message.is_suppressed:
             messages.append(message)
-    current_app.send_task(
+    broker.send_task(
         'api.tasks.push_notifications',
         (
             request.user.id,
@@ -6554,7 +6838,7 @@ def networks_master_tells(request, id):
             serializer.validated_data['tellzone_id'],
             [
                 (network_tellzone.tellzone.id, network_tellzone.tellzone.point.x, network_tellzone.tellzone.point.y,)
-                for network_tellzone in network.networks_tellzones.get_queryset()
+                for network_tellzone in network.networks_tellzones.get_queryset().select_related('tellzone')
             ],
             models.Tellzone.radius() * 0.3048,
         ),
@@ -6653,10 +6937,11 @@ def profiles(request):
                 user
                 for user in models.User.objects.get_queryset().filter(
                     id__in=serializer.validated_data['ids'],
+                ).exclude(
+                    id__in=models.get_blocked_ids(request.user.id),
                 ).order_by(
                     'id',
                 )
-                if not models.is_blocked(request.user.id, user.id)
             ],
             context={
                 'request': request,
@@ -6700,6 +6985,8 @@ def recommended_tells(request, type):
           type: string
     response_serializer: api.serializers.RecommendedTellsResponse
     responseMessages:
+        - code: 304
+          message: Not Modified (If-None-Match matches the ETag)
         - code: 400
           message: Invalid Input
     '''
@@ -6712,9 +6999,70 @@ def recommended_tells(request, type):
         },
     )
     serializer.is_valid(raise_exception=True)
+    return caches.get_response(
+        request,
+        'recommended_tells',
+        lambda type: serializers.RecommendedTellsResponse(
+            models.RecommendedTell.objects.get_queryset().filter(type=type),
+            context={
+                'request': request,
+            },
+            many=True,
+        ).data,
+        serializer.validated_data['type'],
+    )
+
+
+@api_view(('GET',))
+@permission_classes((IsAuthenticated,))
+def renditions(request):
+    '''
+    SELECT Renditions
+    <br>
+    <br>
+    This endpoint will return the alternate (progressive JPEG/WebP) renditions of the given sources, where they are
+    smaller than the default ones (`large_{name}`/`small_{name}`).
+
+    <pre>
+    Input
+    =====
+
+    + names
+        - Type: string (comma-separated list of sources)
+        - Status: mandatory
+
+    Output
+    ======
+
+    (see below; "Response Class" -> "Model Schema")
+    </pre>
+    ---
+    omit_parameters:
+        - form
+    parameters:
+        - name: names
+          paramType: query
+          required: true
+          type: string
+    response_serializer: api.serializers.RenditionsResponse
+    responseMessages:
+        - code: 400
+          message: Invalid Input
+    '''
+    serializer = serializers.RenditionsRequest(
+        context={
+            'request': request,
+        },
+        data=request.query_params,
+    )
+    serializer.is_valid(raise_exception=True)
     return Response(
-        data=serializers.RecommendedTellsResponse(
-            models.RecommendedTell.objects.get_queryset().filter(type=serializer.validated_data['type']),
+        data=serializers.RenditionsResponse(
+            models.Rendition.objects.get_queryset().filter(
+                source__in=[
+                    name.split('/')[-1] for name in serializer.validated_data['names'].split(',') if name.strip()
+                ],
+            ),
             context={
                 'request': request,
             },
@@ -7125,28 +7473,14 @@ def tellzones_ids(request):
         data=request.data,
     )
     serializer.is_valid(raise_exception=True)
-    ids = []
-    for block in models.Block.objects.filter(
-        Q(user_source_id=request.user.id) | Q(user_destination_id=request.user.id),
-    ).order_by(
-        '-timestamp',
-    ).all():
-        if block.user_source.id == request.user.id:
-            if block.user_destination.id not in ids:
-                ids.append(block.user_destination.id)
-        if block.user_destination.id == request.user.id:
-            if block.user_source.id not in ids:
-                ids.append(block.user_source.id)
     return Response(
         data=serializers.TellzonesIDsResponse(
             sorted(
-                [
-                    tellzone
-                    for tellzone in models.Tellzone.objects.get_queryset().filter(
-                        id__in=serializer.validated_data['ids'],
-                    )
-                    if tellzone.user_id not in ids
-                ],
+                models.Tellzone.objects.get_queryset().filter(
+                    id__in=serializer.validated_data['ids'],
+                ).exclude(
+                    user_id__in=models.get_blocked_ids(request.user.id),
+                ),
                 key=lambda tellzone: (-tellzone.tellecasters, -tellzone.id),
             ),
             context={
@@ -7202,6 +7536,81 @@ def tellzones_master_tells(request, id):
     )
 
 
+@api_view(('GET',))
+@permission_classes((IsAuthenticated,))
+def tellzones_search(request):
+    '''
+    SEARCH Tellzones
+
+    <pre>
+    Input
+    =====
+
+    + keywords
+        - Description: Substring and fuzzy (trigram) search over `name`. The results are ordered by similarity and
+          paginated with `limit` and `offset`.
+        - Type: string
+        - Status: mandatory
+
+    + limit
+        - Type: integer (default = 100; maximum = 1000)
+        - Status: optional
+
+    + offset
+        - Type: integer (default = 0)
+        - Status: optional
+
+    Output
+    ======
+
+    (see below; "Response Class" -> "Model Schema")
+    </pre>
+    ---
+    omit_parameters:
+        - form
+    parameters:
+        - name: keywords
+          paramType: query
+          required: true
+          type: string
+        - name: limit
+          paramType: query
+          required: false
+          type: integer
+        - name: offset
+          paramType: query
+          required: false
+          type: integer
+    response_serializer: api.serializers.SearchTellzonesResponse
+    responseMessages:
+        - code: 400
+          message: Invalid Input
+    '''
+    serializer = serializers.SearchRequest(
+        context={
+            'request': request,
+        },
+        data=request.query_params,
+    )
+    serializer.is_valid(raise_exception=True)
+    return Response(
+        data=serializers.SearchTellzonesResponse(
+            get_ranked(
+                request,
+                search.get_tellzones(
+                    models.Tellzone.objects.get_queryset().select_related('user', 'type', 'status'),
+                    serializer.validated_data['keywords'],
+                ),
+            ),
+            context={
+                'request': request,
+            },
+            many=True,
+        ).data,
+        status=HTTP_200_OK,
+    )
+
+
 @api_view(('GET',))
 @permission_classes((IsAuthenticated,))
 def tellzones_types(request):
@@ -7222,18 +7631,21 @@ def tellzones_types(request):
     ---
     response_serializer: api.serializers.TellzoneType
     responseMessages:
+        - code: 304
+          message: Not Modified (If-None-Match matches the ETag)
         - code: 400
           message: Invalid Input
     '''
-    return Response(
-        data=serializers.TellzoneType(
+    return caches.get_response(
+        request,
+        'tellzones_types',
+        lambda: serializers.TellzoneType(
             models.TellzoneType.objects.get_queryset(),
             context={
                 'request': request,
             },
             many=True,
         ).data,
-        status=HTTP_200_OK,
     )
 
 
@@ -7257,18 +7669,21 @@ def tellzones_statuses(request):
     ---
     response_serializer: api.serializers.TellzoneStatus
     responseMessages:
+        - code: 304
+          message: Not Modified (If-None-Match matches the ETag)
         - code: 400
           message: Invalid Input
     '''
-    return Response(
-        data=serializers.TellzoneStatus(
+    return caches.get_response(
+        request,
+        'tellzones_statuses',
+        lambda: serializers.TellzoneStatus(
             models.TellzoneStatus.objects.get_queryset(),
             context={
                 'request': request,
             },
             many=True,
         ).data,
-        status=HTTP_200_OK,
     )
 
 
@@ -7372,8 +7787,9 @@ def users_messages(request, id):
         user_ids = sorted(set(request.DATA))
     except Exception:
         pass
+    blocked_ids = models.get_blocked_ids(request.user.id)
     for user_id in user_ids:
-        if not models.is_blocked(request.user.id, user_id):
+        if user_id not in blocked_ids:
             items.append({
                 'id': user_id,
                 'messages': request.user.get_messages(user_id),
@@ -7479,7 +7895,7 @@ def users_profile(request, id):
           message: Invalid Input
     '''
     if request.user.is_authenticated():
-        if models.is_blocked(request.user.id, id):
+        if int(id) in models.get_blocked_ids(request.user.id):
             return Response(
                 data={
                     'error': ugettext_lazy('Invalid `id`'),
@@ -7505,6 +7921,85 @@ def users_profile(request, id):
     )
 
 
+@api_view(('GET',))
+@permission_classes((IsAuthenticated,))
+def users_search(request):
+    '''
+    SEARCH Users
+
+    <pre>
+    Input
+    =====
+
+    + keywords
+        - Description: Substring and fuzzy (trigram) search over `first_name`, `last_name` and `email` (the latter
+          two only if the user has made them visible). The results are ordered by similarity and paginated with
+          `limit` and `offset`.
+        - Type: string
+        - Status: mandatory
+
+    + limit
+        - Type: integer (default = 100; maximum = 1000)
+        - Status: optional
+
+    + offset
+        - Type: integer (default = 0)
+        - Status: optional
+
+    Output
+    ======
+
+    (see below; "Response Class" -> "Model Schema")
+    </pre>
+    ---
+    omit_parameters:
+        - form
+    parameters:
+        - name: keywords
+          paramType: query
+          required: true
+          type: string
+        - name: limit
+          paramType: query
+          required: false
+          type: integer
+        - name: offset
+          paramType: query
+          required: false
+          type: integer
+    response_serializer: api.serializers.SearchUsersResponse
+    responseMessages:
+        - code: 400
+          message: Invalid Input
+    '''
+    serializer = serializers.SearchRequest(
+        context={
+            'request': request,
+        },
+        data=request.query_params,
+    )
+    serializer.is_valid(raise_exception=True)
+    return Response(
+        data=serializers.SearchUsersResponse(
+            get_ranked(
+                request,
+                search.get_users(
+                    models.User.objects.get_queryset().exclude(
+                        id__in=models.get_blocked_ids(request.user.id),
+                    ),
+                    serializer.validated_data['keywords'],
+                    is_private=True,
+                ),
+            ),
+            context={
+                'request': request,
+            },
+            many=True,
+        ).data,
+        status=HTTP_200_OK,
+    )
+
+
 @api_view(('GET',))
 @permission_classes((IsAuthenticated,))
 def users_tellzones_all(request, id):
@@ -7644,7 +8139,7 @@ def verify_1(request, email):
             },
             status=HTTP_400_BAD_REQUEST,
         )
-    current_app.send_task(
+    broker.send_task(
         'api.tasks.email_notifications',
         (user.id, 'verify',),
         queue='api.tasks.email_notifications',
@@ -7766,6 +8261,38 @@ def handler500(request):
     )
 
 
+def get_page(request):
+    serializer = serializers.PageRequest(
+        context={
+            'request': request,
+        },
+        data=request.query_params,
+    )
+    serializer.is_valid(raise_exception=True)
+    page = dict(serializer.validated_data)
+    if page:
+        page.setdefault('limit', api_settings.PAGE_SIZE)
+        page.setdefault('offset', 0)
+    return page
+
+
+def get_paginated(request, queryset):
+    page = get_page(request)
+    if not page:
+        return queryset
+    if 'since_id' in page:
+        queryset = queryset.filter(id__gt=page['since_id'])
+    if 'max_id' in page:
+        queryset = queryset.filter(id__lt=page['max_id'])
+    return queryset.order_by('-id')[page['offset']:page['offset'] + page['limit']]
+
+
+def get_ranked(request, queryset):
+    page = get_page(request)
+    offset = page.get('offset', 0)
+    return queryset[offset:offset + page.get('limit', api_settings.PAGE_SIZE)]
+
+
 def get_days(today):
     return [(today - timedelta(days=index + 1)).isoformat() for index in range(0, 7)]
 
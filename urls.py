@@ -85,6 +85,7 @@ urlpatterns = patterns(
     url(r'^api/master-tells/all/$', views.master_tells_all),
     url(r'^api/master-tells/ids/$', views.master_tells_ids),
     url(r'^api/master-tells/positions/$', views.master_tells_positions),
+    url(r'^api/master-tells/search/$', views.master_tells_search),
     url(
         r'^api/master-tells/(?P<id>[0-9]+)/$',
         views.MasterTells.as_view({
@@ -173,6 +174,7 @@ urlpatterns = patterns(
     ),
     url(r'^api/recommended-tells/(?P<type>[^/]+)/$', views.recommended_tells),
     url(r'^api/register/$', views.register),
+    url(r'^api/renditions/$', views.renditions),
     url(
         r'^api/shares/users/$',
         views.SharesUsers.as_view({
@@ -215,6 +217,7 @@ urlpatterns = patterns(
     url(r'^api/tellzones/statuses/$', views.tellzones_statuses),
     url(r'^api/tellzones/(?P<id>[0-9]+)/master-tells/$', views.tellzones_master_tells),
     url(r'^api/tellzones/ids/$', views.tellzones_ids),
+    url(r'^api/tellzones/search/$', views.tellzones_search),
     url(
         r'^api/tellzones/(?P<id>[0-9]+)/$',
         views.Tellzones.as_view({
@@ -231,6 +234,7 @@ urlpatterns = patterns(
             'post': 'post',
         }),
     ),
+    url(r'^api/users/search/$', views.users_search),
     url(r'^api/users/(?P<id>[0-9]+)/messages/$', views.users_messages),
     url(r'^api/users/(?P<id>[0-9]+)/password/$', views.users_password),
     url(r'^api/users/(?P<id>[0-9]+)/profile/$', views.users_profile),